@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta
+from typing import Optional
+import base64
+import binascii
+import uuid
+
+from spatial import spatial_fields
+from strokes import (
+    STROKES_FORMAT,
+    SVG_FORMAT,
+    check_point_limits,
+    decode_strokes,
+    encode_strokes,
+    parse_svg_path,
+    strokes_extent,
+    strokes_from_json,
+    strokes_to_svg,
+)
+
+# Yeni annotation alanları ve varsayılanları
+ANNOTATION_DEFAULTS = {
+    "type": "text",  # text, highlight, drawing
+    "x": 0,
+    "y": 0,
+    "width": 0,
+    "height": 0,
+    "page": 1,
+    "content": "",
+    "color": "#FFFF00",
+    "text_content": "",  # Highlighted text
+    "start_offset": 0,
+    "end_offset": 0,
+    "stroke_width": 2,  # Drawing stroke width
+    "drawing_data": "",  # SVG path veya strokes-v1 kodlu çizim
+    "drawing_format": SVG_FORMAT,
+    "tool": "pen",  # pen, highlighter, eraser
+}
+
+# Metin çizimlerde (SVG path, strokes-v1) nokta sayısı karakterden tahmin edilir
+CHARS_PER_POINT = 4
+
+# Güncellemede değiştirilebilen alanlar
+ANNOTATION_UPDATE_FIELDS = ("content", "x", "y", "color")
+
+
+def normalize_drawing(data: dict, tolerance: float = 0.0) -> dict:
+    """Çizimi kompakt biçimde sakla; eğri içeren SVG path'ler olduğu gibi kalır
+
+    Girdi "strokes" nokta listeleri, strokes-v1 kodlu metin veya SVG path
+    olabilir. Geçersiz veride ValueError.
+    """
+    if data.get("strokes") is not None:
+        strokes = strokes_from_json(data["strokes"])
+    elif data.get("drawing_format") == STROKES_FORMAT:
+        # İstemci zaten kodlamış; doğrulayıp sadeleştirme uygulamadan sakla
+        encoded = data.get("drawing_data") or ""
+        if not isinstance(encoded, str):
+            raise ValueError("drawing_data metin olmalı")
+        check_point_limits(decode_strokes(encoded))
+        return {"drawing_data": encoded, "drawing_format": STROKES_FORMAT}
+    else:
+        path = data.get("drawing_data") or ""
+        if not isinstance(path, str):
+            raise ValueError("drawing_data metin olmalı")
+        strokes = parse_svg_path(path) if path else None
+        if not strokes:
+            return {"drawing_data": path, "drawing_format": SVG_FORMAT}
+        check_point_limits(strokes)
+    return {"drawing_data": encode_strokes(strokes, tolerance), "drawing_format": STROKES_FORMAT}
+
+
+def drawing_point_count(data: dict) -> int:
+    """Çizimin ayrıştırılmadan tahmin edilen nokta sayısı; istek sınırı ve iş yeri kararı için"""
+    strokes = data.get("strokes")
+    if isinstance(strokes, list):
+        total = 0
+        for item in strokes:
+            points = item.get("points") if isinstance(item, dict) else item
+            total += len(points) if isinstance(points, list) else 0
+        return total
+    drawing = data.get("drawing_data")
+    return len(drawing) // CHARS_PER_POINT if isinstance(drawing, str) else 0
+
+
+def build_annotation(
+    pdf_id: str,
+    data: dict,
+    annotation_id: Optional[str] = None,
+    now: Optional[str] = None,
+    stroke_tolerance: float = 0.0,
+) -> dict:
+    """İstemciden gelen veriden annotation dokümanı oluştur"""
+    now = now or datetime.now().isoformat()
+    annotation = {
+        "id": annotation_id or str(uuid.uuid4()),
+        "pdf_id": pdf_id,
+        **{field: data.get(field, default) for field, default in ANNOTATION_DEFAULTS.items()},
+        **normalize_drawing(data, stroke_tolerance),
+        "created_at": now,
+        "updated_at": now,
+    }
+    annotation.update(spatial_fields(annotation, drawing_extent(annotation)))
+    return annotation
+
+
+def drawing_extent(annotation: dict):
+    """Kompakt saklanan çizimin kapladığı alan; diğer annotation'larda None"""
+    if annotation.get("drawing_format") != STROKES_FORMAT:
+        return None
+    return strokes_extent(decode_strokes(annotation["drawing_data"]))
+
+
+# Sadece sunucunun kullandığı, yanıtlara girmeyen alanlar
+INTERNAL_FIELDS = ("_id", "spatial")
+ANNOTATION_PROJECTION = {field: 0 for field in INTERNAL_FIELDS}
+
+
+def present_annotation(annotation: dict, drawing_format: str = SVG_FORMAT) -> dict:
+    """Yanıt için kopya; kompakt çizim istenen biçime çevrilir (varsayılan SVG path)"""
+    presented = {key: value for key, value in annotation.items() if key not in INTERNAL_FIELDS}
+    if drawing_format == SVG_FORMAT and presented.get("drawing_format") == STROKES_FORMAT:
+        presented.update(
+            drawing_data=strokes_to_svg(decode_strokes(presented["drawing_data"])),
+            drawing_format=SVG_FORMAT
+        )
+    return presented
+
+
+def annotation_update_fields(data: dict) -> dict:
+    """Güncelleme verisinden sadece değiştirilebilir alanları al"""
+    return {field: data[field] for field in ANNOTATION_UPDATE_FIELDS if field in data}
+
+
+# Eşzamanlı yazmalarda saati geride kalan kayıtları kaçırmamak için since
+# değerinden bu kadar geriye bakılır; istemci id bazında birleştirir
+SYNC_OVERLAP = timedelta(seconds=5)
+# Silinen annotation izleri bu süre saklanır; daha eski cursor'lar tam senkron alır
+TOMBSTONE_RETENTION = timedelta(days=30)
+
+
+def encode_sync_cursor(timestamp: datetime) -> str:
+    return base64.urlsafe_b64encode(timestamp.isoformat().encode()).decode().rstrip("=")
+
+
+def decode_sync_cursor(cursor: str) -> datetime:
+    """Cursor'ı çöz; geçersizse ValueError"""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        timestamp = datetime.fromisoformat(base64.urlsafe_b64decode(padded).decode())
+    except (UnicodeDecodeError, binascii.Error) as e:
+        raise ValueError(str(e))
+    # Sunucunun ürettiği cursor'lar saat dilimsizdir; dilimli olan naive zamanla karşılaştırılamaz
+    if timestamp.tzinfo is not None:
+        raise ValueError("Saat dilimli cursor")
+    return timestamp
+
+
+def sync_lower_bound(since: datetime) -> str:
+    """updated_at ile karşılaştırılacak (örtüşme payı düşülmüş) alt sınır"""
+    return (since - SYNC_OVERLAP).isoformat()
+
+
+def build_tombstone(pdf_id: str, annotation_id: str, now: str) -> dict:
+    return {
+        "pdf_id": pdf_id,
+        "id": annotation_id,
+        "updated_at": now,
+        "deletedAt": datetime.utcnow(),  # TTL indeksi için
+    }
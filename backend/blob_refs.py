@@ -0,0 +1,97 @@
+from datetime import datetime
+import asyncio
+
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+# Her blob için {"_id": blobKey, "refs": n, "size": bayt}. Son referans
+# bırakılınca doküman "deleting" ile işaretlenir; dosya silinene kadar aynı
+# içerik için yeni referans alınamaz, böylece silme ile yeniden yükleme
+# yarışında dosya kaybolmaz.
+ACQUIRE_RETRY_DELAY = 0.05
+ACQUIRE_ATTEMPTS = 100
+
+
+async def acquire_blob_ref(blob_refs_collection, key: str, size: int) -> bool:
+    """Blob için referans al; içerik zaten kayıtlıysa True (tekilleştirildi)"""
+    for _ in range(ACQUIRE_ATTEMPTS):
+        try:
+            previous = await blob_refs_collection.find_one_and_update(
+                {"_id": key, "deleting": {"$exists": False}},
+                {"$inc": {"refs": 1}, "$setOnInsert": {"size": size, "createdAt": datetime.utcnow()}},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            )
+            return previous is not None
+        except DuplicateKeyError:
+            # Aynı içerik şu an siliniyor; bitmesini bekle
+            await asyncio.sleep(ACQUIRE_RETRY_DELAY)
+    raise RuntimeError(f"Blob referansı alınamadı: {key}")
+
+
+async def release_blob_ref(blob_refs_collection, key: str) -> bool:
+    """Referansı bırak; son referanssa silme için işaretleyip True döner
+
+    True dönerse çağıran dosyayı silip finish_blob_release'i çağırmalıdır.
+    """
+    remaining = await blob_refs_collection.find_one_and_update(
+        {"_id": key, "deleting": {"$exists": False}},
+        {"$inc": {"refs": -1}},
+        return_document=ReturnDocument.AFTER
+    )
+    if remaining is None or remaining["refs"] > 0:
+        return False
+    # Araya yeni bir referans girdiyse işaretleme eşleşmez ve blob kalır
+    marked = await blob_refs_collection.update_one(
+        {"_id": key, "refs": {"$lte": 0}, "deleting": {"$exists": False}},
+        {"$set": {"deleting": datetime.utcnow()}}
+    )
+    return marked.modified_count == 1
+
+
+async def finish_blob_release(blob_refs_collection, key: str):
+    await blob_refs_collection.delete_one({"_id": key, "deleting": {"$exists": True}})
+
+
+async def backfill_blob_refs(pdfs_collection, blob_refs_collection) -> int:
+    """Referans kayıtları yoksa mevcut PDF'lerden say (tek seferlik geçiş)"""
+    if await blob_refs_collection.find_one({}, {"_id": 1}) is not None:
+        return 0
+    refs = await pdfs_collection.aggregate([
+        {"$match": {"blobKey": {"$type": "string"}}},
+        {"$group": {"_id": "$blobKey", "refs": {"$sum": 1}, "size": {"$first": "$size"}}},
+    ]).to_list(None)
+    if refs:
+        try:
+            await blob_refs_collection.insert_many(
+                [{**ref, "createdAt": datetime.utcnow()} for ref in refs],
+                ordered=False
+            )
+        except BulkWriteError:
+            # Başka bir worker aynı anda doldurduysa çakışan kayıtlar atlanır
+            pass
+    return len(refs)
+
+
+async def pending_blob_releases(blob_refs_collection) -> list:
+    """Silme işaretli kalmış (ör. süreç çöktüğü için) blob anahtarları"""
+    cursor = blob_refs_collection.find({"deleting": {"$exists": True}}, {"_id": 1})
+    return [doc["_id"] async for doc in cursor]
+
+
+async def storage_stats(blob_refs_collection) -> dict:
+    """Saklanan ve referans verilen bayt miktarı; fark tekilleştirme kazancıdır"""
+    result = await blob_refs_collection.aggregate([
+        {"$match": {"deleting": {"$exists": False}}},
+        {"$group": {
+            "_id": None,
+            "blobs": {"$sum": 1},
+            "references": {"$sum": "$refs"},
+            "storedBytes": {"$sum": "$size"},
+            "referencedBytes": {"$sum": {"$multiply": ["$size", "$refs"]}},
+        }},
+    ]).to_list(1)
+    row = result[0] if result else {}
+    stats = {field: row.get(field, 0) for field in ("blobs", "references", "storedBytes", "referencedBytes")}
+    stats["savedBytes"] = stats["referencedBytes"] - stats["storedBytes"]
+    return stats
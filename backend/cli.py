@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Üretim başlatıcısı
+
+    python backend/cli.py serve --workers 4 --max-pool-size 50
+    python backend/cli.py bench --workers 1 --workers 2 --workers 4 --duration 15
+
+serve, uygulamayı N uvicorn worker'ıyla (kuruluysa uvloop + httptools)
+çalıştırır. Havuz ayarları ortam değişkenlerine yazılır ve her worker
+kendi Motor havuzunu bu ayarlarla açar. bench, her worker sayısı için
+sunucuyu ayrı bir süreçte başlatır, sabit süre boyunca eşzamanlı istek
+gönderir ve throughput'un worker sayısıyla nasıl ölçeklendiğini JSON
+olarak yazar. Ölçüm için MONGO_URL'deki veritabanı erişilebilir olmalıdır.
+
+Varsayılan tek worker'dır. WebSocket annotation yayını (AnnotationHub) ve
+yazma tamponu süreç içidir: birden çok worker'da istemciler yalnızca kendi
+worker'larında yapılan düzenlemeleri canlı görür. PDF varlık önbelleği de
+worker başınadır; metadata önbelleği METADATA_CACHE_URL verilmezse öyledir
+ve diğer worker'ların yazmalarından sonra TTL süresince eski kalabilir.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+import asyncio
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import typer
+
+BACKEND_DIR = Path(__file__).resolve().parent
+
+cli = typer.Typer(add_completion=False, help="PDF görüntüleyici backend'i")
+
+
+def default_workers() -> int:
+    # Canlı yayın süreç içi olduğundan birden çok worker açıkça istenmeli
+    return int(os.environ.get("WEB_CONCURRENCY") or 1)
+
+
+def multi_worker_warnings() -> List[str]:
+    warnings = [
+        "WebSocket annotation yayını süreç içidir; istemciler sadece kendi worker'larındaki düzenlemeleri canlı görür",
+        "PDF varlık önbelleği worker başınadır; silinen bir PDF diğer worker'larda PDF_EXISTS_TTL "
+        f"({os.environ.get('PDF_EXISTS_TTL') or 60} sn) boyunca var görünebilir",
+    ]
+    if not os.environ.get("METADATA_CACHE_URL"):
+        warnings.append(
+            "METADATA_CACHE_URL verilmedi; PDF metadata önbelleği worker başına tutulur ve TTL süresince eski kalabilir"
+        )
+    return warnings
+
+
+def event_loop_choice() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_choice() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def pool_environment(
+    max_pool_size: Optional[int], min_pool_size: Optional[int], wait_queue_timeout_ms: Optional[int]
+) -> dict:
+    """server.MONGO_POOL_ENV ile aynı adlar; worker'lar bu değişkenleri devralır"""
+    values = {
+        "MONGO_MAX_POOL_SIZE": max_pool_size,
+        "MONGO_MIN_POOL_SIZE": min_pool_size,
+        "MONGO_WAIT_QUEUE_TIMEOUT_MS": wait_queue_timeout_ms,
+    }
+    return {name: str(value) for name, value in values.items() if value is not None}
+
+
+def prepare_metrics_dir(workers: int):
+    """Birden çok worker'da Prometheus sayaçları paylaşılan dizinde birleştirilir"""
+    if workers < 2:
+        return
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        # Önceki çalıştırmadan kalan sayaç dosyaları yeni süreçlere karışmasın;
+        # operatörün verdiği dizindeki başka dosyalara dokunulmaz
+        for stale in Path(directory).glob("*.db"):
+            stale.unlink(missing_ok=True)
+    else:
+        directory = tempfile.mkdtemp(prefix="pdf-metrics-")
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory
+
+
+@cli.command()
+def serve(
+    host: str = typer.Option("0.0.0.0", envvar="HOST"),
+    port: int = typer.Option(8001, envvar="PORT"),
+    workers: int = typer.Option(default_workers(), envvar="WEB_CONCURRENCY", min=1, help="Worker süreç sayısı"),
+    max_pool_size: Optional[int] = typer.Option(
+        None, envvar="MONGO_MAX_POOL_SIZE", min=1, help="Worker başına en fazla Mongo bağlantısı"
+    ),
+    min_pool_size: Optional[int] = typer.Option(
+        None, envvar="MONGO_MIN_POOL_SIZE", min=0, help="Worker başına açık tutulan bağlantı"
+    ),
+    wait_queue_timeout_ms: Optional[int] = typer.Option(
+        None, envvar="MONGO_WAIT_QUEUE_TIMEOUT_MS", min=1,
+        help="Havuz doluyken bağlantı bekleme sınırı; aşılınca istek hata alır"
+    ),
+    log_level: str = typer.Option("info", envvar="LOG_LEVEL"),
+    forwarded_allow_ips: str = typer.Option("127.0.0.1", envvar="FORWARDED_ALLOW_IPS"),
+    timeout_keep_alive: int = typer.Option(5, help="Boştaki keep-alive bağlantılarının saniye sınırı"),
+    backlog: int = typer.Option(2048),
+):
+    """Uygulamayı üretim ayarlarıyla çalıştır"""
+    import uvicorn
+
+    if min_pool_size is not None and max_pool_size is not None and min_pool_size > max_pool_size:
+        raise typer.BadParameter("min-pool-size, max-pool-size'dan büyük olamaz")
+    os.environ.update(pool_environment(max_pool_size, min_pool_size, wait_queue_timeout_ms))
+    prepare_metrics_dir(workers)
+    if workers > 1:
+        for warning in multi_worker_warnings():
+            typer.echo(f"Uyarı: {warning}", err=True)
+    loop, http = event_loop_choice(), http_choice()
+    typer.echo(
+        f"{workers} worker, loop={loop}, http={http}, "
+        f"havuz={max_pool_size or 'varsayılan'}/worker",
+        err=True,
+    )
+    uvicorn.run(
+        "server:app",
+        app_dir=str(BACKEND_DIR),
+        host=host,
+        port=port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        log_level=log_level,
+        proxy_headers=True,
+        forwarded_allow_ips=forwarded_allow_ips,
+        timeout_keep_alive=timeout_keep_alive,
+        backlog=backlog,
+    )
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def drive_load(base_url: str, paths: List[str], concurrency: int, duration: float) -> dict:
+    """Tek yük sürecinde sabit süre boyunca eşzamanlı istek gönder"""
+    import httpx
+
+    async def run():
+        latencies: List[float] = []
+        errors = 0
+        deadline = time.perf_counter() + duration
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            async def user(offset: int):
+                nonlocal errors
+                index = offset
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        response = await client.get(paths[index % len(paths)])
+                        if response.status_code >= 400:
+                            errors += 1
+                    except httpx.HTTPError:
+                        errors += 1
+                    latencies.append(time.perf_counter() - started)
+                    index += 1
+
+            await asyncio.gather(*(user(offset) for offset in range(concurrency)))
+        return {"latencies": latencies, "errors": errors}
+
+    return asyncio.run(run())
+
+
+def wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float = 60.0):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Sunucu başlatılamadı (çıkış kodu {process.returncode})")
+        try:
+            if httpx.get(f"{base_url}/readyz", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError("Sunucu zamanında hazır olmadı")
+
+
+@cli.command()
+def bench(
+    workers: List[int] = typer.Option([1, 2, 4], help="Denenecek worker sayıları (tekrarlanabilir)"),
+    path: List[str] = typer.Option(
+        ["/api/pdfs?limit=50", "/api/stats"], help="İstek gönderilecek yollar (tekrarlanabilir)"
+    ),
+    concurrency: int = typer.Option(64, help="Yük süreci başına eşzamanlı istek"),
+    load_processes: int = typer.Option(2, min=1, help="Yük üreten süreç sayısı"),
+    duration: float = typer.Option(10.0, help="Her worker sayısı için ölçüm süresi (saniye)"),
+    warmup: float = typer.Option(2.0, help="Ölçüm öncesi ısınma süresi (saniye)"),
+    port: int = typer.Option(8101),
+    max_pool_size: Optional[int] = typer.Option(None, envvar="MONGO_MAX_POOL_SIZE"),
+    output: Optional[Path] = typer.Option(None, help="Raporu bu dosyaya da yaz"),
+):
+    """Worker sayısına göre throughput ölçeklenmesini ölç"""
+    base_url = f"http://127.0.0.1:{port}"
+    results = []
+    for count in workers:
+        command = [
+            sys.executable, str(Path(__file__).resolve()), "serve",
+            "--host", "127.0.0.1", "--port", str(port), "--workers", str(count), "--log-level", "warning",
+        ]
+        if max_pool_size is not None:
+            command += ["--max-pool-size", str(max_pool_size)]
+        process = subprocess.Popen(command, env={**os.environ, "STATS_RECONCILE_INTERVAL": "0"})
+        try:
+            wait_until_ready(base_url, process)
+            drive_load(base_url, path, concurrency, warmup)
+            with ProcessPoolExecutor(load_processes) as pool:
+                runs = list(pool.map(
+                    drive_load,
+                    [base_url] * load_processes,
+                    [path] * load_processes,
+                    [concurrency] * load_processes,
+                    [duration] * load_processes,
+                ))
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+        latencies = sorted(latency for run in runs for latency in run["latencies"])
+        result = {
+            "workers": count,
+            "requests": len(latencies),
+            "errors": sum(run["errors"] for run in runs),
+            "throughput": round(len(latencies) / duration, 1),
+            "p50Ms": round(_percentile(latencies, 0.50) * 1000, 2),
+            "p95Ms": round(_percentile(latencies, 0.95) * 1000, 2),
+            "p99Ms": round(_percentile(latencies, 0.99) * 1000, 2),
+            "meanMs": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        }
+        results.append(result)
+        typer.echo(f"{count} worker: {result['throughput']} istek/sn, p95 {result['p95Ms']} ms", err=True)
+
+    baseline = results[0]["throughput"] if results and results[0]["throughput"] else None
+    for result in results:
+        result["speedup"] = round(result["throughput"] / baseline, 2) if baseline else None
+    report = {
+        "config": {
+            "cpuCount": os.cpu_count(),
+            "paths": path,
+            "concurrency": concurrency,
+            "loadProcesses": load_processes,
+            "duration": duration,
+            "loop": event_loop_choice(),
+            "http": http_choice(),
+            "maxPoolSize": max_pool_size,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    typer.echo(text)
+    if output:
+        output.write_text(text)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,245 @@
+"""
+Accept-Encoding ile anlaşılan yanıt sıkıştırması (zstd, br, gzip)
+
+brotli ve zstandard paketleri isteğe bağlıdır; kurulu değilse o kodlama
+sunulmaz, gzip her zaman vardır. Zaten sıkıştırılmış içerik türleri (PDF,
+görseller) ve küçük yanıtlar olduğu gibi geçer. Büyük tek parça gövdeler
+iş parçacığında dilim dilim sıkıştırılıp akış halinde gönderilir; event
+loop birkaç MB'lık JSON'u sıkıştırırken bloklanmaz.
+"""
+from typing import Callable, Dict, Iterable, Optional
+import asyncio
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - kurulum ortamına bağlı
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - kurulum ortamına bağlı
+    zstandard = None
+
+# Varsayılan seviyeler hız/oran dengesi için seçildi; en yüksek seviyeler
+# JSON'da birkaç yüzde daha küçültür ama CPU maliyeti katlanır
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+MINIMUM_SIZE = 1024
+# Bu boyutun üstündeki tek parça gövdeler iş parçacığında, dilimler halinde sıkıştırılır
+STREAM_THRESHOLD = 256 * 1024
+STREAM_SLICE_SIZE = 64 * 1024
+
+# Sıkıştırması anlamsız ya da aralık istekleriyle sunulan içerik türleri
+SKIP_CONTENT_TYPES = ("application/pdf", "image/", "video/", "audio/", "application/zip", "application/gzip")
+
+
+class Encoder:
+    """Tek bir yanıt gövdesi için artımlı sıkıştırıcı"""
+
+    def compress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def finish(self) -> bytes:
+        raise NotImplementedError
+
+
+class GzipEncoder(Encoder):
+    def __init__(self, level: int = GZIP_LEVEL):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder(Encoder):
+    def __init__(self, quality: int = BROTLI_QUALITY):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder(Encoder):
+    def __init__(self, level: int = ZSTD_LEVEL):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_encoders() -> Dict[str, Callable[[], Encoder]]:
+    """Kodlama adı -> sıkıştırıcı; eşit tercihte sıra sunucu önceliğidir"""
+    encoders: Dict[str, Callable[[], Encoder]] = {}
+    if zstandard is not None:
+        encoders["zstd"] = ZstdEncoder
+    if brotli is not None:
+        encoders["br"] = BrotliEncoder
+    encoders["gzip"] = GzipEncoder
+    return encoders
+
+
+def negotiate(accept_encoding: str, supported: Iterable[str]) -> Optional[str]:
+    """Accept-Encoding'e göre en uygun kodlama; sıkıştırmasız gönderilecekse None"""
+    supported = list(supported)
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[name] = quality
+    wildcard = weights.get("*")
+    best, best_quality = None, 0.0
+    for name in supported:
+        quality = weights.get(name, wildcard if wildcard is not None else 0.0)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def is_compressible(headers: Headers, status: int) -> bool:
+    if status < 200 or status in (204, 206, 304):
+        return False
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").lower()
+    return not content_type.startswith(SKIP_CONTENT_TYPES)
+
+
+class CompressionMiddleware:
+    """Yanıtları istemcinin kabul ettiği en iyi kodlamayla sıkıştır"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = MINIMUM_SIZE,
+        stream_threshold: int = STREAM_THRESHOLD,
+        encoders: Optional[Dict[str, Callable[[], Encoder]]] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.stream_threshold = stream_threshold
+        self.encoders = encoders if encoders is not None else available_encoders()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encoders)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start: Optional[Message] = None
+        self.encoder: Optional[Encoder] = None
+        # None: karar verilmedi, False: olduğu gibi geçir, True: sıkıştır
+        self.compressing: Optional[bool] = None
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Başlıklar gövdenin ilk parçası görülene kadar bekletilir
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._flush_start()
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressing is None:
+            self.compressing = self._should_compress(body, more_body)
+            if not self.compressing:
+                await self._flush_start()
+        if not self.compressing:
+            await self._send(message)
+            return
+
+        if self.encoder is None:
+            self.encoder = self.middleware.encoders[self.encoding]()
+            if not more_body and len(body) < self.middleware.stream_threshold:
+                compressed = self.encoder.compress(body) + self.encoder.finish()
+                self._set_headers(len(compressed))
+                await self._flush_start()
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            self._set_headers(None)
+            await self._flush_start()
+            if not more_body:
+                await self._send_large(body)
+                return
+
+        chunk = self.encoder.compress(body)
+        if not more_body:
+            chunk += self.encoder.finish()
+        if chunk or not more_body:
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def _should_compress(self, body: bytes, more_body: bool) -> bool:
+        headers = Headers(raw=self.start["headers"])
+        if not is_compressible(headers, self.start["status"]):
+            return False
+        if more_body:
+            # Akan yanıtın toplam boyutu bilinmez; Content-Length varsa ona bakılır
+            length = headers.get("content-length")
+            return not (length and length.isdigit() and int(length) < self.middleware.minimum_size)
+        return len(body) >= self.middleware.minimum_size
+
+    def _set_headers(self, length: Optional[int]):
+        headers = MutableHeaders(raw=list(self.start["headers"]))
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(length)
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # Sıkıştırılmış gövde bayt bayt aynı değil; güçlü ETag zayıflatılır
+            headers["ETag"] = f"W/{etag}"
+        self.start["headers"] = headers.raw
+
+    async def _send_large(self, body: bytes):
+        # Her dilim iş parçacığında sıkıştırılır ve hazır olan çıktı hemen gönderilir
+        view = memoryview(body)
+        for start in range(0, len(body), STREAM_SLICE_SIZE):
+            chunk = await asyncio.to_thread(self.encoder.compress, view[start:start + STREAM_SLICE_SIZE])
+            if chunk:
+                await self._send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await self._send({"type": "http.response.body", "body": self.encoder.finish()})
+
+    async def _flush_start(self):
+        if self.start is not None:
+            start, self.start = self.start, None
+            await self._send(start)
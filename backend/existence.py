@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from typing import Awaitable, Callable, Tuple
+import time
+
+
+class ExistenceCache:
+    """PDF id'lerinin var/yok bilgisini tutan LRU; negatif sonuçlar da saklanır
+
+    Diğer süreçlerdeki silme/eklemeler buraya yansımadığından girdiler süre
+    sonunda düşer; negatif girdiler daha kısa yaşar.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 60.0, negative_ttl: float = 5.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[str, Tuple[bool, float]]" = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _set(self, key: str, exists: bool):
+        ttl = self.ttl if exists else self.negative_ttl
+        self._entries[key] = (exists, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def mark_present(self, key: str):
+        self._set(key, True)
+
+    def mark_absent(self, key: str):
+        self._set(key, False)
+
+    def invalidate(self, key: str):
+        self._entries.pop(key, None)
+
+    async def exists(self, key: str, lookup: Callable[[str], Awaitable[bool]]) -> bool:
+        """Önbellekte yoksa lookup ile sor ve sonucu sakla"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            exists, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                if exists:
+                    self.hits += 1
+                else:
+                    self.negative_hits += 1
+                return exists
+            del self._entries[key]
+        self.misses += 1
+        exists = await lookup(key)
+        self._set(key, exists)
+        return exists
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            "hits": self.hits,
+            "negativeHits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hitRatio": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+        }
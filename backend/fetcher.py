@@ -0,0 +1,228 @@
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit
+import asyncio
+import ipaddress
+import socket
+
+import httpx
+
+from storage import PDF_HEADER_WINDOW, BlobInfo, BlobStore, BlobTooLarge, BlobWriter, is_pdf_header
+
+
+# Yönlendirmeler elle izlenir; her adımın adresi ayrıca kontrol edilir
+MAX_REDIRECTS = 5
+
+
+class FetchError(Exception):
+    pass
+
+
+class BlockedAddress(FetchError):
+    """URL iç ağa (loopback, özel, link-local...) çözülüyor"""
+
+
+def is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+async def resolve_public_host(url: str) -> str:
+    """URL'nin host'unu çöz; adreslerden biri bile herkese açık değilse reddet"""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise FetchError("Sadece http/https URL'leri desteklenir")
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)
+    except socket.gaierror:
+        raise FetchError("Uzak sunucu adresi çözülemedi")
+    if not infos or not all(is_public_address(info[4][0]) for info in infos):
+        raise BlockedAddress("İç ağ adreslerine istek gönderilemez")
+    return infos[0][4][0]
+
+
+class PinnedTransport(httpx.AsyncBaseTransport):
+    """Bağlantıyı kontrol edilen adrese açar; kontrol ile bağlantı arasında DNS değişemez"""
+
+    def __init__(self, **options):
+        self._transport = httpx.AsyncHTTPTransport(**options)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        address = await resolve_public_host(str(request.url))
+        # Host başlığı istekte kalır; TLS doğrulaması ve SNI özgün ada göre yapılır
+        pinned = httpx.Request(
+            request.method,
+            request.url.copy_with(host=address),
+            headers=request.headers,
+            stream=request.stream,
+            extensions={**request.extensions, "sni_hostname": request.url.host},
+        )
+        return await self._transport.handle_async_request(pinned)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+@dataclass
+class FetchResult:
+    blob: Optional[BlobInfo]  # 304 yanıtında None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.blob is None
+
+
+class URLFetcher:
+    """Paylaşılan bağlantı havuzu ile uzak PDF'leri blob deposuna indirir"""
+
+    def __init__(
+        self,
+        blob_store: BlobStore,
+        max_size: int,
+        max_concurrency: int = 8,
+        per_host_concurrency: int = 2,
+        timeout: float = 30.0,
+        commit: Optional[Callable[[BlobWriter], Awaitable[BlobInfo]]] = None,
+        allow_private: bool = False,
+    ):
+        self.blob_store = blob_store
+        # Sadece testler ve yerel geliştirme için; sunucu iç ağa istek atmamalı
+        self.allow_private = allow_private
+        # Blob'u yerine taşımadan önce referans almak isteyenler için
+        self.commit = commit or (lambda writer: writer.commit())
+        self.max_size = max_size
+        self.per_host_concurrency = per_host_concurrency
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._client: Optional[httpx.AsyncClient] = None
+        self._global_limit = asyncio.Semaphore(max_concurrency)
+        # Kullanıcının verdiği host'lar sınırsızdır; semafor yalnızca kullanımdayken tutulur
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._host_users: Dict[str, int] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            limits = httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency
+            )
+            transport = httpx.AsyncHTTPTransport if self.allow_private else PinnedTransport
+            self._client = httpx.AsyncClient(
+                transport=transport(limits=limits),
+                follow_redirects=False,
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 10.0)),
+                headers={"User-Agent": "pdf-viewer-fetcher/1.0"},
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @asynccontextmanager
+    async def _host_slot(self, host: str):
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.per_host_concurrency)
+        self._host_users[host] = self._host_users.get(host, 0) + 1
+        try:
+            async with limit:
+                yield
+        finally:
+            self._host_users[host] -= 1
+            if not self._host_users[host]:
+                del self._host_users[host]
+                del self._host_limits[host]
+
+    async def check_url(self, url: str):
+        if not self.allow_private:
+            await resolve_public_host(url)
+
+    async def _send(self, method: str, url: str, headers: Optional[dict] = None) -> httpx.Response:
+        """İsteği gönder; yönlendirmeleri izle (her adımın adresini transport kontrol eder)"""
+        request = self.client.build_request(method, url, headers=headers)
+        for _ in range(MAX_REDIRECTS + 1):
+            response = await self.client.send(request, stream=True)
+            if response.next_request is None:
+                return response
+            await response.aclose()
+            request = response.next_request
+        raise FetchError("Çok fazla yönlendirme")
+
+    async def _check_size(self, url: str):
+        # HEAD desteklemeyen sunucular olabilir; sadece bilinen boyut sınırı aşıyorsa reddet
+        try:
+            response = await self._send("HEAD", url)
+            await response.aclose()
+        except httpx.HTTPError:
+            return
+        length = response.headers.get("content-length")
+        if response.is_success and length and length.isdigit() and int(length) > self.max_size:
+            raise FetchError("Dosya boyutu sınırı aşıldı")
+
+    async def fetch(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> FetchResult:
+        """URL'yi indir; ETag/Last-Modified verildiyse değişmemişse 304 ile döner"""
+        host = urlsplit(url).netloc.lower()
+        async with self._global_limit, self._host_slot(host):
+            try:
+                await self._check_size(url)
+                headers = {}
+                if etag:
+                    headers["If-None-Match"] = etag
+                if last_modified:
+                    headers["If-Modified-Since"] = last_modified
+                response = await self._send("GET", url, headers)
+                try:
+                    if response.status_code == 304:
+                        return FetchResult(blob=None, etag=etag, last_modified=last_modified)
+                    if not response.is_success:
+                        raise FetchError(f"Uzak sunucu {response.status_code} döndü")
+                    blob = await self._store(response)
+                    return FetchResult(
+                        blob=blob,
+                        etag=response.headers.get("etag"),
+                        last_modified=response.headers.get("last-modified"),
+                    )
+                finally:
+                    await response.aclose()
+            except httpx.TimeoutException:
+                raise FetchError("Uzak sunucu zaman aşımına uğradı")
+            except httpx.HTTPError as e:
+                raise FetchError(f"İndirme hatası: {e}")
+
+    async def _store(self, response: httpx.Response) -> BlobInfo:
+        writer = self.blob_store.writer(max_size=self.max_size)
+        try:
+            # İmza kontrolü için ilk baytları biriktir; parçalar çok küçük gelebilir
+            head = b""
+            checked = False
+            async for chunk in response.aiter_bytes():
+                if not checked:
+                    head += chunk
+                    if len(head) < PDF_HEADER_WINDOW:
+                        continue
+                    if not is_pdf_header(head):
+                        raise FetchError("İndirilen dosya PDF değil")
+                    checked, chunk = True, head
+                await writer.write(chunk)
+            if not checked:
+                if not head:
+                    raise FetchError("İndirilen dosya boş")
+                if not is_pdf_header(head):
+                    raise FetchError("İndirilen dosya PDF değil")
+                await writer.write(head)
+            return await self.commit(writer)
+        except BlobTooLarge:
+            await writer.abort()
+            raise FetchError("Dosya boyutu sınırı aşıldı")
+        except BaseException:
+            await writer.abort()
+            raise
@@ -0,0 +1,174 @@
+from email.utils import formatdate
+from typing import List, Mapping, Optional, Tuple
+import os
+import secrets
+
+import anyio
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+# Aşırı parçalı Range istekleri ile kaynak tüketimini engelle
+MAX_RANGES = 32
+
+ByteRange = Tuple[int, int]  # [start, end] kapalı aralık
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range_header(value: str, size: int) -> Optional[List[ByteRange]]:
+    """Range başlığını çöz; anlaşılmayan başlıkta None (tam dosya gönderilir)"""
+    unit, _, specs = value.partition("=")
+    if unit.strip().lower() != "bytes" or not specs:
+        return None
+    ranges = []
+    for spec in specs.split(","):
+        spec = spec.strip()
+        if not spec:
+            continue
+        first, sep, last = spec.partition("-")
+        first, last = first.strip(), last.strip()
+        if not sep or (first and not first.isdigit()) or (last and not last.isdigit()):
+            return None
+        if not first:
+            # "-n": son n bayt
+            if not last:
+                return None
+            suffix = int(last)
+            if suffix == 0:
+                continue
+            ranges.append((max(size - suffix, 0), size - 1))
+            continue
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start >= size:
+            continue
+        end = min(int(last), size - 1) if last else size - 1
+        ranges.append((start, end))
+    if len(ranges) > MAX_RANGES:
+        return None
+    if not ranges:
+        raise RangeNotSatisfiable()
+    # Çakışan ve bitişik aralıkları birleştir
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _etag_matches(header: str, etag: str, weak: bool) -> bool:
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            if not weak:
+                continue
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class RangeFileResponse(Response):
+    """Dosyanın bir veya birden çok bayt aralığını 206 olarak gönder"""
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path, ranges: List[ByteRange], size: int, media_type: str, headers: Mapping[str, str]):
+        self.path = path
+        self.ranges = ranges
+        self.status_code = 206
+        self.background = None
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            self.parts = [(b"", start, end)]
+            self.trailer = b""
+            self.media_type = media_type
+            headers = {**headers, "Content-Range": f"bytes {start}-{end}/{size}"}
+        else:
+            boundary = secrets.token_hex(16)
+            # Her parçanın başına CRLF konur; ilk sınırdan önceki CRLF geçerli bir önsözdür
+            self.parts = [
+                (
+                    f"\r\n--{boundary}\r\n"
+                    f"Content-Type: {media_type}\r\n"
+                    f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n".encode("latin-1"),
+                    start,
+                    end,
+                )
+                for start, end in ranges
+            ]
+            self.trailer = f"\r\n--{boundary}--\r\n".encode("latin-1")
+            self.media_type = f"multipart/byteranges; boundary={boundary}"
+        content_length = sum(len(head) + end - start + 1 for head, start, end in self.parts) + len(self.trailer)
+        self.init_headers({**headers, "Content-Length": str(content_length)})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            for head, start, end in self.parts:
+                if head:
+                    await send({"type": "http.response.body", "body": head, "more_body": True})
+                await file.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": self.trailer, "more_body": False})
+
+
+def conditional_file_response(
+    request_headers: Mapping[str, str],
+    path,
+    stat_result: os.stat_result,
+    etag: str,
+    media_type: str,
+    headers: Optional[Mapping[str, str]] = None,
+    cache_control: str = "private, max-age=3600",
+) -> Response:
+    """ETag/If-None-Match/If-Range ve Range kurallarına göre uygun yanıtı üret"""
+    size = stat_result.st_size
+    base_headers = {
+        **(headers or {}),
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag, weak=True):
+        return Response(status_code=304, headers={
+            key: value for key, value in base_headers.items()
+            if key in ("ETag", "Last-Modified", "Cache-Control")
+        })
+
+    range_header = request_headers.get("range")
+    if_range = request_headers.get("if-range")
+    # If-Range sadece güçlü ETag eşleşirse aralığa izin verir; tarih değerleri tam dosyaya düşer
+    if range_header and (not if_range or _etag_matches(if_range, etag, weak=False)):
+        try:
+            ranges = parse_range_header(range_header, size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={
+                **base_headers, "Content-Range": f"bytes */{size}"
+            })
+        if ranges is not None:
+            return RangeFileResponse(path, ranges, size, media_type, base_headers)
+
+    # Tam dosya: sunucu destekliyorsa http.response.pathsend ile sıfır kopya gönderilir
+    return FileResponse(path, media_type=media_type, headers=base_headers, stat_result=stat_result)
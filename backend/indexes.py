@@ -0,0 +1,70 @@
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+from annotations import TOMBSTONE_RETENTION
+import logging
+
+# Endpoint sorgularının ihtiyaç duyduğu indeksler; yeni sorgu eklerken buraya da ekleyin
+PDF_INDEXES = [
+    IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+    # get_pdfs: dateAdded/id keyset sayfalama
+    IndexModel([("dateAdded", DESCENDING), ("id", DESCENDING)], name="dateAdded_id"),
+    # get_favorite_pdfs: favori filtresi + aynı sıralama
+    IndexModel(
+        [("isFavorite", ASCENDING), ("dateAdded", DESCENDING), ("id", DESCENDING)],
+        name="isFavorite_dateAdded_id"
+    ),
+    # Aynı blob'u paylaşan PDF'ler: küçük resim durumu ve önbellek temizliği
+    IndexModel([("blobKey", ASCENDING)], name="blobKey", sparse=True),
+    # Başlangıçta yarıda kalan URL indirmelerini bulmak için
+    IndexModel([("fetchStatus", ASCENDING)], name="fetchStatus", sparse=True),
+]
+
+ANNOTATION_INDEXES = [
+    IndexModel([("pdf_id", ASCENDING), ("id", ASCENDING)], unique=True, name="pdf_id_id"),
+    IndexModel([("pdf_id", ASCENDING), ("updated_at", ASCENDING)], name="pdf_id_updated_at"),
+    # get_pdf_annotations: page/bbox filtresi, ızgara hücreleri multikey
+    IndexModel(
+        [("pdf_id", ASCENDING), ("page", ASCENDING), ("spatial.cells", ASCENDING)],
+        name="pdf_id_page_cells"
+    ),
+]
+
+PAGE_TEXT_INDEXES = [
+    # /api/search: dil bağımsız (kök bulma yok) tam metin indeksi
+    IndexModel([("text", TEXT)], name="text", default_language="none"),
+    IndexModel([("pdf_id", ASCENDING), ("page", ASCENDING)], unique=True, name="pdf_id_page"),
+]
+
+ANNOTATION_TOMBSTONE_INDEXES = [
+    IndexModel([("pdf_id", ASCENDING), ("updated_at", ASCENDING)], name="pdf_id_updated_at"),
+    IndexModel(
+        [("deletedAt", ASCENDING)],
+        name="deletedAt_ttl",
+        expireAfterSeconds=int(TOMBSTONE_RETENTION.total_seconds())
+    ),
+]
+
+IDEMPOTENCY_INDEXES = [
+    # Toplu annotation isteklerinin kayıtlı yanıtları bir gün sonra silinir
+    IndexModel([("createdAt", ASCENDING)], name="createdAt_ttl", expireAfterSeconds=24 * 3600),
+]
+
+COLLECTION_INDEXES = {
+    "pdfs": PDF_INDEXES,
+    "annotations": ANNOTATION_INDEXES,
+    "annotation_tombstones": ANNOTATION_TOMBSTONE_INDEXES,
+    "pdf_pages": PAGE_TEXT_INDEXES,
+    "idempotency_keys": IDEMPOTENCY_INDEXES,
+}
+
+
+async def ensure_indexes(db):
+    """Tanımlı indeksleri oluştur; var olanlar için Mongo işlem yapmaz"""
+    for collection_name, indexes in COLLECTION_INDEXES.items():
+        try:
+            names = await db[collection_name].create_indexes(indexes)
+            logging.info(f"{collection_name} indeksleri hazır: {', '.join(names)}")
+        except OperationFailure as e:
+            # Örn. mevcut verideki tekrar eden id'ler; servis yine de ayağa kalksın
+            logging.error(f"{collection_name} indeksleri oluşturulamadı: {e}")
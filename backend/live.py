@@ -0,0 +1,207 @@
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import logging
+import uuid
+
+# Bekleyen annotation güncellemelerinin anahtarı
+BufferKey = Tuple[str, str]  # (pdf_id, annotation_id)
+
+# Her güncellemeye eklenen zaman damgası; tek başına yazılacak bir değişiklik sayılmaz
+TIMESTAMP_FIELD = "updated_at"
+
+
+class LiveConnection:
+    """Tek bir WebSocket istemcisi; mesajlar kuyruk üzerinden sırayla gönderilir"""
+
+    def __init__(self, websocket, max_queue: int):
+        self.id = str(uuid.uuid4())
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self._sender: Optional[asyncio.Task] = None
+        self._closer: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._sender = asyncio.create_task(self._send_loop())
+
+    async def _send_loop(self):
+        while True:
+            message = await self.queue.get()
+            try:
+                await self.websocket.send_json(message)
+            except Exception as e:
+                # Soket kapanmış; alıcı döngüsü bağlantıyı odadan çıkarır
+                logging.debug(f"Canlı mesaj gönderilemedi ({self.id}): {e}")
+                return
+
+    def offer(self, message: dict) -> bool:
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def stop(self):
+        if self._sender is not None:
+            self._sender.cancel()
+
+    def close_slow_consumer(self):
+        # Yetişemeyen istemci kopartılır; yeniden bağlanıp tam liste alması beklenir
+        self.stop()
+        if self._closer is None:
+            self._closer = asyncio.create_task(self.websocket.close(code=1013))
+
+
+class AnnotationHub:
+    """PDF başına bağlı istemcilere annotation değişikliklerini yayınlar
+
+    Her PDF için artan bir seq tutulur; mesajlar her bağlantıya yayın
+    sırasıyla ulaşır. İstemci seq'te boşluk görürse yeniden senkron olmalıdır.
+    """
+
+    def __init__(self, max_queue: int = 256):
+        self.max_queue = max_queue
+        self._rooms: Dict[str, Dict[str, LiveConnection]] = defaultdict(dict)
+        self._seq: Dict[str, int] = defaultdict(int)
+
+    def join(self, pdf_id: str, websocket) -> LiveConnection:
+        connection = LiveConnection(websocket, self.max_queue)
+        connection.start()
+        self._rooms[pdf_id][connection.id] = connection
+        connection.offer({"type": "hello", "connection": connection.id, "seq": self._seq[pdf_id]})
+        return connection
+
+    def leave(self, pdf_id: str, connection: LiveConnection):
+        connection.stop()
+        room = self._rooms.get(pdf_id)
+        if room is not None:
+            room.pop(connection.id, None)
+            if not room:
+                del self._rooms[pdf_id]
+                self._seq.pop(pdf_id, None)
+
+    def publish(self, pdf_id: str, message: dict, exclude: Optional[str] = None) -> int:
+        """Mesajı odadaki herkese kuyruğa koy; dinleyen yoksa no-op"""
+        room = self._rooms.get(pdf_id)
+        if not room:
+            return 0
+        self._seq[pdf_id] += 1
+        message = {**message, "pdf_id": pdf_id, "seq": self._seq[pdf_id]}
+        for connection in list(room.values()):
+            if connection.id == exclude:
+                continue
+            if not connection.offer(message):
+                logging.warning(f"Yavaş WebSocket istemcisi kopartıldı: {connection.id}")
+                room.pop(connection.id, None)
+                connection.close_slow_consumer()
+        return self._seq[pdf_id]
+
+    def connection_count(self) -> int:
+        return sum(len(room) for room in self._rooms.values())
+
+
+class WriteBehindBuffer:
+    """Aynı annotation'a art arda gelen güncellemeleri birleştirip toplu yazar
+
+    Aralık dolunca veya bekleyen anahtar sayısı sınıra ulaşınca flush
+    çağrılır. Flush'lar sırayla çalışır; bir flush sürerken gelen değişiklikler
+    bir sonrakine kalır, böylece aynı alan için eski değer yenisini ezemez.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[Dict[BufferKey, dict]], Awaitable[None]],
+        interval: float = 0.5,
+        max_entries: int = 500,
+    ):
+        self._flush = flush
+        self.interval = interval
+        self.max_entries = max_entries
+        self._pending: Dict[BufferKey, dict] = {}
+        self._lock = asyncio.Lock()
+        self._closed = asyncio.Event()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._full_flush: Optional[asyncio.Task] = None
+        self.updates = 0
+        self.flushes = 0
+        self.written = 0
+
+    def start(self):
+        if self._loop_task is None:
+            # Kapatılıp aynı süreçte yeniden başlatılabilsin (örn. testler)
+            self._closed = asyncio.Event()
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        # İptal yerine olayla durur; yarıda kesilen flush değişiklik kaybettirmesin
+        while not self._closed.is_set():
+            try:
+                await asyncio.wait_for(self._closed.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    def __contains__(self, key: BufferKey) -> bool:
+        return key in self._pending
+
+    def add(self, key: BufferKey, fields: dict):
+        """Alanları bekleyen değişikliğe ekle; sonra gelen değer kazanır"""
+        self._pending.setdefault(key, {}).update(fields)
+        self.updates += 1
+        if len(self._pending) >= self.max_entries and (self._full_flush is None or self._full_flush.done()):
+            self._full_flush = asyncio.create_task(self.flush())
+
+    def pending_for(self, pdf_id: str) -> Dict[str, dict]:
+        """Henüz yazılmamış değişiklikler; okumalar bunları üstüne uygular"""
+        return {
+            annotation_id: fields
+            for (key_pdf_id, annotation_id), fields in self._pending.items()
+            if key_pdf_id == pdf_id
+        }
+
+    async def discard(self, key: BufferKey, fields=None):
+        """Doğrudan yazmadan önce çağrılır: eski bekleyen alanları at
+
+        Süren bir flush varsa bitmesi beklenir; eski değerler doğrudan
+        yazmanın ardından veritabanına ulaşamaz.
+        """
+        async with self._lock:
+            pending = self._pending.get(key)
+            if pending is None:
+                return
+            for field in (list(pending) if fields is None else fields):
+                pending.pop(field, None)
+            # Sadece zaman damgası kaldıysa yazılırsa doğrudan yazmanın damgasını geri alır
+            if fields is None or not pending.keys() - {TIMESTAMP_FIELD}:
+                del self._pending[key]
+
+    async def flush(self):
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            try:
+                await self._flush(batch)
+                self.flushes += 1
+                self.written += len(batch)
+            except Exception as e:
+                logging.error(f"Bekleyen annotation güncellemeleri yazılamadı: {e}")
+                # Bu arada gelen daha yeni değerler korunur, eskiler geri eklenir
+                for key, fields in batch.items():
+                    self._pending[key] = {**fields, **self._pending.get(key, {})}
+
+    async def close(self):
+        """Döngüyü durdur ve kalan her şeyi yaz (kapanışta çağrılır)"""
+        self._closed.set()
+        if self._loop_task is not None:
+            await self._loop_task
+            self._loop_task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "updates": self.updates,
+            "flushes": self.flushes,
+            "written": self.written,
+        }
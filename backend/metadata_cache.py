@@ -0,0 +1,179 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+import asyncio
+import logging
+import time
+
+import orjson
+
+
+class MemoryBackend:
+    """Süreç içi TTL'li LRU"""
+
+    def __init__(self, max_entries: int = 5000, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: dict):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    async def aclose(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Redis protokolü konuşan herhangi bir sunucu (Redis, Valkey, KeyDB...) ile paylaşılan önbellek
+
+    client; get/set(ex=)/delete coroutine'leri olan bir nesnedir, testlerde
+    yerel bir yedekle değiştirilebilir. Tahliye sunucunun maxmemory
+    politikasına bırakılır.
+    """
+
+    evictions = 0
+
+    def __init__(self, client, ttl: float = 30.0, prefix: str = "pdfmeta:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, ttl: float = 30.0) -> "RedisBackend":
+        import redis.asyncio as redis
+
+        return cls(redis.from_url(url), ttl)
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self.client.get(self.prefix + key)
+        return orjson.loads(raw) if raw else None
+
+    async def set(self, key: str, value: dict):
+        await self.client.set(self.prefix + key, orjson.dumps(value), ex=max(1, int(self.ttl)))
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    async def aclose(self):
+        close = getattr(self.client, "aclose", None) or getattr(self.client, "close", None)
+        if close is not None:
+            await close()
+
+
+class MetadataCache:
+    """Okumada doldurulan, yazmada geçersiz kılınan PDF metadata önbelleği
+
+    Aynı anahtar için eşzamanlı kaçırmalar tek bir yüklemeyi bekler. Yükleme
+    sürerken anahtar geçersiz kılınırsa yüklenen (artık eski) değer saklanmaz.
+    Önbellek hatalarında doğrudan veritabanına düşülür.
+    """
+
+    def __init__(self, backend, cacheable: Callable[[dict], bool] = lambda value: True):
+        self.backend = backend
+        self.cacheable = cacheable
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.errors = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stale: Set[str] = set()
+
+    async def _load(self, key: str, loader: Callable[[str], Awaitable[Optional[dict]]]) -> Optional[dict]:
+        value = await loader(key)
+        if value is not None and key not in self._stale and self.cacheable(value):
+            try:
+                await self.backend.set(key, value)
+            except Exception as e:
+                self.errors += 1
+                logging.warning(f"Metadata önbelleğine yazılamadı: {e}")
+        return value
+
+    def _finish(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        self._stale.discard(key)
+        if not task.cancelled():
+            task.exception()
+
+    async def get(self, key: str, loader: Callable[[str], Awaitable[Optional[dict]]]) -> Optional[dict]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logging.warning(f"Metadata önbelleği okunamadı: {e}")
+            value = None
+        if value is not None:
+            self.hits += 1
+            return value
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.create_task(self._load(key, loader))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def put(self, key: str, value: dict):
+        """Yazma sonrası güncel değeri doğrudan yerleştir"""
+        if key in self._inflight:
+            self._stale.add(key)
+        if not self.cacheable(value):
+            await self.invalidate(key)
+            return
+        try:
+            await self.backend.set(key, value)
+        except Exception as e:
+            self.errors += 1
+            logging.warning(f"Metadata önbelleğine yazılamadı: {e}")
+
+    async def invalidate(self, key: str):
+        self.invalidations += 1
+        if key in self._inflight:
+            self._stale.add(key)
+        try:
+            await self.backend.delete(key)
+        except Exception as e:
+            self.errors += 1
+            logging.warning(f"Metadata önbelleğinden silinemedi: {e}")
+
+    async def aclose(self):
+        await self.backend.aclose()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        stats = {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "evictions": self.backend.evictions,
+            "errors": self.errors,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+        if isinstance(self.backend, MemoryBackend):
+            stats["entries"] = len(self.backend)
+        return stats
@@ -0,0 +1,149 @@
+from typing import Dict, Sequence
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from pymongo import monitoring
+from starlette.responses import Response
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+# Eşleşmeyen yollar tek etikette toplanır; id içeren ham yollar etiket sayısını patlatmasın
+UNMATCHED_ROUTE = "unmatched"
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Tamamlanan HTTP istekleri", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "İstek süresi (yanıtın son baytına kadar)",
+    ["method", "route"], buckets=LATENCY_BUCKETS
+)
+HTTP_REQUEST_SIZE = Histogram(
+    "http_request_size_bytes", "Okunan istek gövdesi boyutu", ["method", "route"], buckets=SIZE_BUCKETS
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Gönderilen yanıt gövdesi boyutu", ["method", "route"], buckets=SIZE_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Şu an işlenen istekler", ["method", "route"], multiprocess_mode="livesum"
+)
+MONGO_COMMAND_DURATION = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB komut süresi", ["command", "collection"], buckets=MONGO_BUCKETS
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongodb_command_failures_total", "Başarısız MongoDB komutları", ["command", "collection"]
+)
+
+
+def route_label(routes: Sequence[BaseRoute], scope: Scope) -> str:
+    """İsteğin eşleştiği route şablonu (örn. /api/pdfs/{pdf_id}/view)"""
+    partial = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+        if match == Match.PARTIAL and partial is None:
+            partial = getattr(route, "path", None)
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Route bazında istek sayısı, süre, gövde boyutları ve eşzamanlı istek ölçümü"""
+
+    def __init__(self, app: ASGIApp, routes: Sequence[BaseRoute]):
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_label(self.routes, scope)
+        status = 500
+        request_bytes = 0
+        response_bytes = 0
+        content_length = None
+
+        async def counting_receive() -> Message:
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message: Message):
+            nonlocal status, response_bytes, content_length
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-length" and value.isdigit():
+                        content_length = int(value)
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        in_flight = HTTP_IN_FLIGHT.labels(method, route)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            in_flight.dec()
+            HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+            HTTP_REQUEST_SIZE.labels(method, route).observe(request_bytes)
+            # pathsend ile gönderilen dosyalarda gövde buradan geçmez; başlık esas alınır
+            HTTP_RESPONSE_SIZE.labels(method, route).observe(
+                content_length if content_length is not None and method != "HEAD" else response_bytes
+            )
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Motor istemcisine event_listeners ile verilir; komut sürelerini koleksiyon bazında ölçer"""
+
+    def __init__(self):
+        # request_id -> koleksiyon; başlama ve bitiş olayları farklı iş parçacıklarında gelebilir
+        self._collections: Dict[int, str] = {}
+
+    @staticmethod
+    def _collection(event) -> str:
+        command = event.command
+        name = command.get("collection") if event.command_name == "getMore" else command.get(event.command_name)
+        return name if isinstance(name, str) else ""
+
+    def started(self, event):
+        self._collections[event.request_id] = self._collection(event)
+
+    def succeeded(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        MONGO_COMMAND_DURATION.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        MONGO_COMMAND_DURATION.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(event.command_name, collection).inc()
+
+
+def metrics_response() -> Response:
+    """Prometheus metin biçimi; çok süreçli çalışmada tüm worker'lar birleştirilir"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,49 @@
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Multipart sarmalayıcı (sınırlar, part başlıkları) için bırakılan pay
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """Sınırı aşan yüklemeleri 413 ile reddet
+
+    Content-Length varsa gövde okunmadan reddedilir. Yoksa (chunked yükleme)
+    gelen baytlar sayılır ve sınır aşıldığı anda okuma kesilir; multipart
+    ayrıştırıcı gövdenin geri kalanını diske yazmaz.
+    """
+
+    def __init__(self, app: ASGIApp, paths: tuple, max_size: int):
+        self.app = app
+        self.paths = set(paths)
+        self.max_size = max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if not (scope["type"] == "http" and scope["method"] == "POST" and scope["path"] in self.paths):
+            await self.app(scope, receive, send)
+            return
+        limit = self.max_size + MULTIPART_OVERHEAD
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > limit:
+                    response = JSONResponse(
+                        {"detail": "Dosya boyutu sınırı aşıldı"}, status_code=413
+                    )
+                    await response(scope, receive, send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # FastAPI gövde ayrıştırırken HTTPException'ı olduğu gibi iletir
+                    raise HTTPException(status_code=413, detail="Dosya boyutu sınırı aşıldı")
+            return message
+
+        await self.app(scope, limited_receive, send)
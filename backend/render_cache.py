@@ -0,0 +1,154 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import os
+import tempfile
+import time
+
+# Aynı dizini paylaşan worker'ların dosyalarını görmek için defter bu aralıkla diskten yenilenir
+SYNC_INTERVAL = 30.0
+
+
+class RenderCache:
+    """Boyutu sınırlı, LRU tahliyeli disk önbelleği; aynı anahtar için tek render
+
+    Dizin birden çok worker tarafından paylaşılabilir. Her worker kendi
+    defterini tutar ama defteri belirli aralıklarla diskten yeniler; sınır
+    dizinin toplamına uygulanır. Erişilen dosyanın mtime'ı güncellenir, LRU
+    sırası worker'lar arasında da korunur.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, sync_interval: float = SYNC_INTERVAL):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.sync_interval = sync_interval
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._load()
+
+    def _scan(self) -> Tuple["OrderedDict[str, int]", int]:
+        # Dosyalar son erişim (mtime) sırasıyla; en eski başta
+        files = []
+        for path in self.root.iterdir():
+            try:
+                if path.is_file() and not path.name.startswith("."):
+                    stat_result = path.stat()
+                    files.append((stat_result.st_mtime, path.name, stat_result.st_size))
+            except FileNotFoundError:
+                continue
+        entries: "OrderedDict[str, int]" = OrderedDict()
+        for _, name, size in sorted(files):
+            entries[name] = size
+        return entries, sum(entries.values())
+
+    def _load(self):
+        # Yeniden başlatmada diskteki dosyaları son erişim sırasıyla geri al
+        self._entries, self.total_bytes = self._scan()
+        self._last_sync = time.monotonic()
+        self._unlink(self._pop_evicted())
+
+    async def _sync(self, newest: str):
+        entries, total = await asyncio.to_thread(self._scan)
+        if newest in entries:
+            entries.move_to_end(newest)
+        self._entries, self.total_bytes = entries, total
+        self._last_sync = time.monotonic()
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key
+
+    def get(self, key: str) -> Optional[Path]:
+        if key not in self._entries:
+            return None
+        path = self.path_for(key)
+        try:
+            # Erişim zamanı diğer worker'ların LRU sırası için dosyaya da yazılır
+            os.utime(path)
+        except FileNotFoundError:
+            # Başka bir worker tahliye etmiş; yeniden render edilsin
+            self.total_bytes -= self._entries.pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return path
+
+    def _write(self, key: str, data: bytes):
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, prefix=".")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_name, self.path_for(key))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def _pop_evicted(self) -> List[str]:
+        # Defter tutma event loop'ta, dosya silme iş parçacığında yapılır
+        evicted = []
+        # En son eklenen girdi her zaman kalır; tek başına sınırı aşsa bile sunulabilsin
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            evicted.append(key)
+        return evicted
+
+    def _unlink(self, keys: List[str]):
+        for key in keys:
+            self.path_for(key).unlink(missing_ok=True)
+
+    async def put(self, key: str, data: bytes) -> Path:
+        await asyncio.to_thread(self._write, key, data)
+        if key in self._entries:
+            self.total_bytes -= self._entries.pop(key)
+        self._entries[key] = len(data)
+        self.total_bytes += len(data)
+        if time.monotonic() - self._last_sync >= self.sync_interval:
+            await self._sync(key)
+        evicted = self._pop_evicted()
+        if evicted:
+            await asyncio.to_thread(self._unlink, evicted)
+        return self.path_for(key)
+
+    async def _render_and_store(self, key: str, render: Callable[[], Awaitable[bytes]]) -> Path:
+        return await self.put(key, await render())
+
+    def _finish(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        # Bekleyen kalmadıysa "exception was never retrieved" uyarısını engelle
+        if not task.cancelled():
+            task.exception()
+
+    async def get_or_render(self, key: str, render: Callable[[], Awaitable[bytes]]) -> Path:
+        """Önbellekte yoksa render et; eşzamanlı istekler aynı render'ı bekler"""
+        path = self.get(key)
+        if path is not None:
+            self.hits += 1
+            return path
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.create_task(self._render_and_store(key, render))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        # İstemci bağlantıyı kesse de render diğer bekleyenler için sürsün
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "maxBytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
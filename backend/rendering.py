@@ -0,0 +1,88 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+import os
+
+# PyMuPDF sadece işçi süreçlerde import edilir; sunucu modülü onsuz da yüklenebilir
+RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', 2))
+
+# Küçük resim adı -> hedef genişlik (piksel)
+THUMBNAIL_SIZES = {
+    "small": 160,
+    "medium": 320,
+}
+THUMBNAIL_MEDIA_TYPE = "image/jpeg"
+THUMBNAIL_QUALITY = 75
+
+# Tek bir çizimin piksel sınırı (~48 MB RGB); büyük MediaBox'lı sayfalar işçiyi bellekten düşürmesin
+MAX_RENDER_PIXELS = int(os.environ.get('MAX_RENDER_PIXELS', 4096 * 4096))
+
+_render_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """Render işleri için paylaşılan süreç havuzu (ilk kullanımda oluşturulur)"""
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+    return _render_pool
+
+
+def shutdown_render_pool():
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(wait=False, cancel_futures=True)
+        _render_pool = None
+
+
+def capped_zoom(rect, zoom: float) -> float:
+    """Çıktı MAX_RENDER_PIXELS'ı aşacaksa ölçeği en-boy oranını koruyarak küçült"""
+    area = rect.width * rect.height
+    if area <= 0:
+        return zoom
+    return min(zoom, (MAX_RENDER_PIXELS / area) ** 0.5)
+
+
+def render_thumbnails(pdf_path: str, sizes: Dict[str, int]) -> Dict[str, bytes]:
+    """İlk sayfayı her boyut için JPEG olarak çiz (işçi süreçte çalışır)"""
+    import pymupdf
+
+    with pymupdf.open(pdf_path, filetype="pdf") as document:
+        page = document[0]
+        thumbnails = {}
+        for name, width in sizes.items():
+            zoom = capped_zoom(page.rect, width / page.rect.width)
+            pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+            thumbnails[name] = pixmap.tobytes("jpeg", jpg_quality=THUMBNAIL_QUALITY)
+        return thumbnails
+
+
+class PageOutOfRange(Exception):
+    pass
+
+
+def render_page(pdf_path: str, page_number: int, scale: float) -> bytes:
+    """Tek bir sayfayı (1'den başlayarak) verilen ölçekte PNG olarak çiz"""
+    import pymupdf
+
+    with pymupdf.open(pdf_path, filetype="pdf") as document:
+        if not 1 <= page_number <= document.page_count:
+            raise PageOutOfRange(page_number)
+        page = document[page_number - 1]
+        zoom = capped_zoom(page.rect, scale)
+        pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+        return pixmap.tobytes("png")
+
+
+# Çok büyük sayfaların indeksi şişirmesini engelle
+MAX_PAGE_TEXT_CHARS = 20000
+
+
+def extract_page_texts(pdf_path: str) -> List[str]:
+    """Her sayfanın düz metnini sırayla çıkar (işçi süreçte çalışır)"""
+    import pymupdf
+
+    with pymupdf.open(pdf_path, filetype="pdf") as document:
+        return [
+            " ".join(page.get_text("text").split())[:MAX_PAGE_TEXT_CHARS]
+            for page in document
+        ]
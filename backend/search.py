@@ -0,0 +1,49 @@
+from typing import List
+import re
+
+# Sonuç başına döndürülen en fazla sayfa ve snippet uzunluğu
+MAX_PAGES_PER_RESULT = 3
+MAX_MATCHED_PAGES = 500
+SNIPPET_RADIUS = 80
+
+
+def search_terms(query: str) -> List[str]:
+    """Sorgudaki kelimeleri ve tırnak içindeki ifadeleri ayıkla"""
+    phrases = re.findall(r'"([^"]+)"', query)
+    words = re.sub(r'"[^"]*"', " ", query).split()
+    return [term for term in [*phrases, *words] if not term.startswith("-")]
+
+
+def build_search_pipeline(query: str, limit: int) -> list:
+    """Sayfa metinlerinde $text araması yapıp PDF bazında gruplayan pipeline"""
+    return [
+        {"$match": {"$text": {"$search": query}}},
+        {"$project": {"_id": 0, "pdf_id": 1, "page": 1, "text": 1, "score": {"$meta": "textScore"}}},
+        {"$sort": {"score": -1}},
+        {"$limit": MAX_MATCHED_PAGES},
+        {"$group": {
+            "_id": "$pdf_id",
+            "score": {"$max": "$score"},
+            "pages": {"$push": {"page": "$page", "score": "$score", "text": "$text"}},
+        }},
+        {"$sort": {"score": -1, "_id": 1}},
+        {"$limit": limit},
+        {"$project": {"score": 1, "pages": {"$slice": ["$pages", MAX_PAGES_PER_RESULT]}}},
+    ]
+
+
+def make_snippet(text: str, terms: List[str]) -> str:
+    """İlk eşleşen terimin çevresinden kısa bir alıntı üret"""
+    lowered = text.casefold()
+    positions = [lowered.find(term.casefold()) for term in terms]
+    positions = [position for position in positions if position >= 0]
+    if not positions:
+        return text[:2 * SNIPPET_RADIUS].strip()
+    start = max(min(positions) - SNIPPET_RADIUS, 0)
+    end = min(min(positions) + SNIPPET_RADIUS, len(text))
+    snippet = text[start:end].strip()
+    if start > 0:
+        snippet = "…" + snippet
+    if end < len(text):
+        snippet += "…"
+    return snippet
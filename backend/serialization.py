@@ -0,0 +1,31 @@
+from typing import Iterable, List, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+__all__ = ["ORJSONResponse", "model_projection", "trusted_rows"]
+
+
+def model_projection(model: Type[BaseModel]) -> dict:
+    """Sadece modelin alanlarını okuyan Mongo projection'ı"""
+    return {"_id": 0, **{field: 1 for field in model.model_fields}}
+
+
+def _static_defaults(model: Type[BaseModel]) -> dict:
+    # default_factory alanları (id, dateAdded) okunan dokümanda zaten vardır
+    return {
+        name: field.default
+        for name, field in model.model_fields.items()
+        if not field.is_required() and field.default_factory is None
+    }
+
+
+def trusted_rows(model: Type[BaseModel], docs: Iterable[dict]) -> List[dict]:
+    """Yazarken doğrulanmış dokümanları yeniden doğrulamadan yanıt satırına çevir
+
+    Çıktı, model(**doc).model_dump() ile aynı anahtarları aynı sırada taşır;
+    eksik alanlar modelin varsayılanıyla doldurulur.
+    """
+    defaults = _static_defaults(model)
+    fields = list(model.model_fields)
+    return [{field: doc.get(field, defaults.get(field)) for field in fields} for doc in docs]
@@ -1,5 +1,8 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import (
+    FastAPI, APIRouter, HTTPException, UploadFile, File, Header, Query, Request, Response,
+    WebSocket, WebSocketDisconnect
+)
+from fastapi.responses import RedirectResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -7,9 +10,68 @@ import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from pymongo import DeleteOne, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from typing import Dict, List, Literal, Optional, Tuple
+from storage import BlobInfo, BlobStore, BlobTooLarge, BlobWriter, is_pdf_header
+from middleware import UploadSizeLimitMiddleware
+from metrics import MetricsMiddleware, MongoCommandMetrics, metrics_response
+from http_ranges import conditional_file_response
+from indexes import ensure_indexes
+from serialization import ORJSONResponse, model_projection, trusted_rows
+from annotations import (
+    ANNOTATION_PROJECTION,
+    TOMBSTONE_RETENTION,
+    annotation_update_fields,
+    build_annotation,
+    build_tombstone,
+    decode_sync_cursor,
+    drawing_extent,
+    drawing_point_count,
+    present_annotation,
+    encode_sync_cursor,
+    sync_lower_bound,
+)
+from blob_refs import (
+    acquire_blob_ref,
+    backfill_blob_refs,
+    finish_blob_release,
+    pending_blob_releases,
+    release_blob_ref,
+    storage_stats,
+)
+from compression import CompressionMiddleware
+from existence import ExistenceCache
+from fetcher import FetchError, URLFetcher
+from live import AnnotationHub, BufferKey, LiveConnection, WriteBehindBuffer
+from metadata_cache import MemoryBackend, MetadataCache, RedisBackend
+from render_cache import RenderCache
+from spatial import moved_spatial_fields, parse_bbox, spatial_fields, spatial_query, spatial_update_stage
+from search import build_search_pipeline, make_snippet, search_terms
+from rendering import (
+    THUMBNAIL_MEDIA_TYPE,
+    THUMBNAIL_SIZES,
+    PageOutOfRange,
+    extract_page_texts,
+    get_render_pool,
+    render_page,
+    render_thumbnails,
+    shutdown_render_pool,
+)
+from stats import (
+    aggregate_stats,
+    apply_counter_delta,
+    counter_delta,
+    read_stats,
+    reconcile_periodically,
+)
 import uuid
-from datetime import datetime
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from functools import partial
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
 import base64
 import json
 
@@ -17,24 +79,140 @@ import json
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'pdf_viewer_db')]
+# Bağlantı havuzu ayarları; her worker kendi havuzunu açtığından
+# Mongo'ya toplam bağlantı worker sayısı x maxPoolSize kadar olabilir
+MONGO_POOL_ENV = {
+    "maxPoolSize": "MONGO_MAX_POOL_SIZE",
+    "minPoolSize": "MONGO_MIN_POOL_SIZE",
+    "waitQueueTimeoutMS": "MONGO_WAIT_QUEUE_TIMEOUT_MS",
+    "maxIdleTimeMS": "MONGO_MAX_IDLE_TIME_MS",
+}
+
+def mongo_pool_options() -> dict:
+    """Ortam değişkeniyle verilen havuz ayarları; verilmeyenlerde sürücü varsayılanı geçerli"""
+    return {option: int(os.environ[name]) for option, name in MONGO_POOL_ENV.items() if os.environ.get(name)}
+
+# MongoDB bağlantısı lifespan'de açılır; modülü import etmek (testler, araçlar) bağlantı kurmaz
+DB_NAME = os.environ.get('DB_NAME', 'pdf_viewer_db')
+# Açılışta havuzda hazır tutulacak bağlantı sayısı; ilk istekler TCP/TLS el sıkışması beklemez
+MONGO_WARMUP_CONNECTIONS = int(
+    os.environ.get('MONGO_WARMUP_CONNECTIONS') or os.environ.get('MONGO_MIN_POOL_SIZE') or 4
+)
+client: Optional[AsyncIOMotorClient] = None
+db = None
+
+# Collections (use_database ile bağlanır)
+pdfs_collection = None
+annotations_collection = None
+counters_collection = None
+page_texts_collection = None
+idempotency_collection = None
+tombstones_collection = None
+blob_refs_collection = None
+
+def use_database(database):
+    """Koleksiyonları verilen veritabanına bağla; araçlar sahte bir veritabanı verebilir"""
+    global db, pdfs_collection, annotations_collection, counters_collection, page_texts_collection
+    global idempotency_collection, tombstones_collection, blob_refs_collection
+    db = database
+    pdfs_collection = db.pdfs
+    annotations_collection = db.annotations
+    counters_collection = db.counters
+    page_texts_collection = db.pdf_pages
+    idempotency_collection = db.idempotency_keys
+    tombstones_collection = db.annotation_tombstones
+    blob_refs_collection = db.blob_refs
+
+def connect_database():
+    """İstemciyi ilk çağrıda oluştur; daha önce bağlanmışsa dokunma"""
+    global client
+    if client is None:
+        client = AsyncIOMotorClient(
+            os.environ['MONGO_URL'], event_listeners=[MongoCommandMetrics()], **mongo_pool_options()
+        )
+        use_database(client[DB_NAME])
+    return client
+
+# İstatistikler: sayaç dokümanı (O(1) okuma) veya her istekte aggregation
+USE_STATS_COUNTERS = os.environ.get('USE_STATS_COUNTERS', 'true').lower() == 'true'
+STATS_RECONCILE_INTERVAL = float(os.environ.get('STATS_RECONCILE_INTERVAL', 3600))
 
-# Collections
-pdfs_collection = db.pdfs
-annotations_collection = db.annotations
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup()
+    try:
+        yield
+    finally:
+        await shutdown()
 
 # Create the main app without a prefix
-app = FastAPI()
+# Yanıtlar orjson ile serileştirilir; okuma endpoint'leri satırları doğrudan döndürür
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+# Açılış adımları bitene kadar /readyz 503 döner
+app.state.ready = False
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# Create uploads directory
-UPLOADS_DIR = ROOT_DIR / "uploads"
-UPLOADS_DIR.mkdir(exist_ok=True)
+# Yükleme dizini ve disk depoları lifespan'de (open_storage) hazırlanır
+UPLOADS_DIR = Path(os.environ.get('UPLOADS_DIR', ROOT_DIR / "uploads"))
+
+# Yükleme sınırları
+MAX_UPLOAD_SIZE = int(os.environ.get('MAX_UPLOAD_SIZE', 100 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# İçerik hash'e bağlı olduğundan PDF yanıtları istemcide önbelleklenebilir
+PDF_CACHE_CONTROL = os.environ.get('PDF_CACHE_CONTROL', "private, max-age=86400")
+
+# PDF içerikleri Mongo'da değil, SHA-256 adresli blob deposunda tutulur
+blob_store: Optional[BlobStore] = None
+# URL'den eklenen PDF'ler arka planda paylaşılan HTTP istemcisiyle indirilir
+url_fetcher: Optional[URLFetcher] = None
+# Sunucu tarafında çizilen sayfalar için boyutu sınırlı LRU disk önbelleği
+page_render_cache: Optional[RenderCache] = None
+
+def open_storage():
+    """Yükleme dizinini ve disk depolarını oluştur; birden çok kez çağrılabilir"""
+    global blob_store, url_fetcher, page_render_cache
+    if blob_store is not None:
+        return
+    UPLOADS_DIR.mkdir(parents=True, exist_ok=True)
+    blob_store = BlobStore(UPLOADS_DIR / "blobs")
+    url_fetcher = URLFetcher(
+        blob_store,
+        max_size=MAX_UPLOAD_SIZE,
+        max_concurrency=int(os.environ.get('FETCH_MAX_CONCURRENCY', 8)),
+        per_host_concurrency=int(os.environ.get('FETCH_PER_HOST_CONCURRENCY', 2)),
+        timeout=float(os.environ.get('FETCH_TIMEOUT', 30)),
+        # Varsayılan olarak iç ağ adreslerine (loopback, özel, link-local) istek atılmaz
+        allow_private=os.environ.get('FETCH_ALLOW_PRIVATE_HOSTS', 'false').lower() == 'true',
+        # İndirilen içerik de yüklemeler gibi referans sayılır
+        commit=lambda writer: commit_fetched_blob(writer)
+    )
+    # Açılışta diskteki önbellek dosyaları taranır
+    page_render_cache = RenderCache(
+        UPLOADS_DIR / "render-cache",
+        max_bytes=int(os.environ.get('RENDER_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+    )
+
+# WebSocket kanalından gelen annotation güncellemeleri bu aralıkla toplu yazılır.
+# since senkronu SYNC_OVERLAP kadar geriye baktığından aralık bundan kısa olmalı.
+LIVE_FLUSH_INTERVAL = float(os.environ.get('LIVE_FLUSH_INTERVAL', 0.5))
+LIVE_BUFFER_MAX_ENTRIES = int(os.environ.get('LIVE_BUFFER_MAX_ENTRIES', 500))
+live_hub = AnnotationHub(max_queue=int(os.environ.get('LIVE_QUEUE_SIZE', 256)))
+
+# Çizimler kaydedilirken bu mesafeden (sayfa birimi) yakın noktalar sadeleştirilir; 0 kapatır
+STROKE_SIMPLIFY_TOLERANCE = float(os.environ.get('STROKE_SIMPLIFY_TOLERANCE', 0.5))
+# Yanıtı yazılmamış idempotency sahipliği bu süreden sonra tekrar denemeye devredilir
+# (süreç işlem ortasında kapanmış olabilir); en uzun toplu işlemin birkaç katı olmalı
+IDEMPOTENCY_LEASE = timedelta(seconds=float(os.environ.get('IDEMPOTENCY_LEASE_SECONDS', 120)))
+# Bu kadar noktadan büyük çizimler event loop dışında sadeleştirilip kodlanır
+STROKE_EXECUTOR_POINTS = int(os.environ.get('STROKE_EXECUTOR_POINTS', 2000))
+# Tek istekteki tüm çizimlerin toplam nokta sınırı
+MAX_REQUEST_DRAWING_POINTS = int(os.environ.get('MAX_REQUEST_DRAWING_POINTS', 200_000))
+
+MAX_RENDER_SCALE = 4.0
+MAX_PREFETCH_PAGES = 5
 
 
 # Define Models
@@ -46,7 +224,16 @@ class PDFFile(BaseModel):
     dateAdded: datetime = Field(default_factory=datetime.utcnow)
     isFavorite: bool = False
     type: str = "local"  # local, cloud, url
-    fileData: Optional[str] = None  # base64 encoded file data
+    fileData: Optional[str] = None  # legacy: base64 encoded file data
+    blobKey: Optional[str] = None  # blob store reference
+    sha256: Optional[str] = None  # content hash
+    thumbnailStatus: Optional[str] = None  # pending, ready, failed
+    textStatus: Optional[str] = None  # pending, ready, failed
+    fetchStatus: Optional[str] = None  # url: pending, fetching, ready, failed
+    fetchError: Optional[str] = None
+    fetchedAt: Optional[datetime] = None
+    sourceEtag: Optional[str] = None
+    sourceLastModified: Optional[str] = None
     thumbnailData: Optional[str] = None  # base64 encoded thumbnail
 
 class PDFCreate(BaseModel):
@@ -60,23 +247,461 @@ class PDFUpdate(BaseModel):
     name: Optional[str] = None
     isFavorite: Optional[bool] = None
 
+class PDFSummary(BaseModel):
+    """Liste ekranları için içerik alanları olmadan PDF özeti"""
+    id: str
+    name: str
+    size: int
+    dateAdded: datetime
+    isFavorite: bool = False
+    type: str = "local"
+    sha256: Optional[str] = None
+    thumbnailStatus: Optional[str] = None
+    fetchStatus: Optional[str] = None
+
+class AnnotationOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[str] = Field(None, max_length=64)  # create için isteğe bağlı
+    data: dict = Field(default_factory=dict)
+
+class AnnotationBatch(BaseModel):
+    operations: List[AnnotationOperation] = Field(..., min_length=1, max_length=500)
+    idempotencyKey: Optional[str] = Field(None, max_length=128)
+
+# Listelerde fileData/uri/thumbnailData Mongo'dan hiç okunmaz
+PDF_SUMMARY_PROJECTION = model_projection(PDFSummary)
+PDF_FILE_PROJECTION = model_projection(PDFFile)
+# Yazma yanıtları eski kayıtlardaki base64 içeriği taşımaz
+PDF_MUTATION_PROJECTION = {
+    field: 1 for field in PDF_FILE_PROJECTION if field not in ("fileData", "thumbnailData")
+}
+PDF_MUTATION_PROJECTION["_id"] = 0
+# Favori durumu sunucuda tek atomik işlemle tersine çevrilir; eşzamanlı istekler sırayla uygulanır
+FAVORITE_TOGGLE = [{"$set": {"isFavorite": {"$eq": [{"$ifNull": ["$isFavorite", False]}, False]}}}]
+# Konum güncellemelerinde spatial alanını yeniden hesaplamak için gereken alanlar
+ANNOTATION_GEOMETRY_PROJECTION = {"_id": 0, "id": 1, "x": 1, "y": 1, "width": 1, "height": 1, "spatial.ink": 1}
+PDF_LIST_DEFAULT_LIMIT = 50
+PDF_LIST_MAX_LIMIT = 200
+PDF_LIST_SORT = [("dateAdded", -1), ("id", -1)]
+FAVORITE_PDFS_QUERY = {"isFavorite": True}
+# Başlangıçta yeniden kuyruğa alınan, yarıda kalmış URL indirmeleri
+PENDING_FETCH_QUERY = {"fetchStatus": {"$in": ["pending", "fetching"]}}
+
+# Endpoint sorguları tek yerde üretilir; test_query_plans aynı fonksiyonlarla indeks kullanımını doğrular
+def blob_users_query(blob_key: str) -> dict:
+    return {"blobKey": blob_key}
+
+def annotation_query(
+    pdf_id: str,
+    since_time: Optional[datetime] = None,
+    page: Optional[int] = None,
+    viewport=None
+) -> dict:
+    """Annotation (ve since verildiyse silme izi) sorgusu"""
+    query = {"pdf_id": pdf_id}
+    if since_time is not None:
+        query["updated_at"] = {"$gt": sync_lower_bound(since_time)}
+    query.update(spatial_query(page, viewport))
+    return query
+
+def moved_annotations_query(keys: List[BufferKey]) -> dict:
+    return {"$or": [{"pdf_id": pdf_id, "id": annotation_id} for pdf_id, annotation_id in keys]}
+
+def encode_list_cursor(pdf: dict) -> str:
+    payload = json.dumps({"d": pdf["dateAdded"].isoformat(), "i": pdf["id"]})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_list_cursor(cursor: str) -> dict:
+    """Cursor'dan sonraki (daha eski) kayıtları seçen sorguyu üret"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        date_added = datetime.fromisoformat(payload["d"])
+        pdf_id = str(payload["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Geçersiz cursor")
+    return {"$or": [
+        {"dateAdded": {"$lt": date_added}},
+        {"dateAdded": date_added, "id": {"$lt": pdf_id}},
+    ]}
+
+def pdf_list_query(query: dict, cursor: Optional[str]) -> dict:
+    return {"$and": [query, decode_list_cursor(cursor)]} if cursor else query
+
+async def list_pdf_summaries(query: dict, limit: int, cursor: Optional[str]) -> ORJSONResponse:
+    """dateAdded/id üzerinde keyset sayfalama; sonraki sayfa X-Next-Cursor başlığında
+
+    Satırlar yazarken doğrulandığından PDFSummary'ye yeniden çevrilmez;
+    Response döndürüldüğü için response_model sadece şema içindir.
+    """
+    # Geçersiz cursor sorgu gönderilmeden 400 döner
+    query = pdf_list_query(query, cursor)
+    pdfs = await pdfs_collection.find(query, PDF_SUMMARY_PROJECTION).sort(
+        PDF_LIST_SORT
+    ).limit(limit + 1).to_list(limit + 1)
+    headers = {}
+    if len(pdfs) > limit:
+        pdfs = pdfs[:limit]
+        headers["X-Next-Cursor"] = encode_list_cursor(pdfs[-1])
+    return ORJSONResponse(trusted_rows(PDFSummary, pdfs), headers=headers)
+
+def pdf_view_path(pdf_id: str) -> str:
+    return f"/api/pdfs/{pdf_id}/view"
+
+def attach_blob(pdf_obj: PDFFile, blob: BlobInfo) -> PDFFile:
+    """Dokümana içeriğin kendisi yerine sadece blob referansını koy"""
+    pdf_obj.blobKey = blob.key
+    pdf_obj.sha256 = blob.sha256
+    pdf_obj.size = blob.size
+    pdf_obj.uri = pdf_view_path(pdf_obj.id)
+    pdf_obj.fileData = None
+    pdf_obj.thumbnailStatus = "pending"
+    pdf_obj.textStatus = "pending"
+    return pdf_obj
+
+async def commit_blob(writer: BlobWriter) -> Tuple[BlobInfo, bool]:
+    """Referansı dosya yerine taşınmadan önce al; eşzamanlı bir silme dosyayı kaldıramaz
+
+    İkinci değer, aynı içerik zaten saklanıyorsa (tekilleştirildiyse) True'dur.
+    """
+    deduplicated = await acquire_blob_ref(blob_refs_collection, writer.sha256, writer.size)
+    try:
+        return await writer.commit(), deduplicated
+    except BaseException:
+        await writer.abort()
+        await release_pdf_content(writer.sha256)
+        raise
+
+async def commit_fetched_blob(writer: BlobWriter) -> BlobInfo:
+    blob, _ = await commit_blob(writer)
+    return blob
+
+async def store_pdf_content(pdf_obj: PDFFile, content: bytes) -> bool:
+    """PDF içeriğini blob deposuna yaz; içerik zaten varsa True"""
+    writer = blob_store.writer()
+    try:
+        await writer.write(content)
+    except BaseException:
+        await writer.abort()
+        raise
+    blob, deduplicated = await commit_blob(writer)
+    attach_blob(pdf_obj, blob)
+    return deduplicated
+
+async def stream_upload_to_blob(file: UploadFile) -> Tuple[BlobInfo, bool]:
+    """Yüklemeyi parça parça blob deposuna aktar; hash ve boyut akarken hesaplanır"""
+    writer = blob_store.writer(max_size=MAX_UPLOAD_SIZE)
+    try:
+        first_chunk = True
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            # content_type'a güvenme, PDF imzasını ilk parçadan kontrol et
+            if first_chunk and not is_pdf_header(chunk):
+                raise HTTPException(status_code=400, detail="Sadece PDF dosyaları yüklenebilir")
+            first_chunk = False
+            await writer.write(chunk)
+        if first_chunk:
+            raise HTTPException(status_code=400, detail="Dosya boş")
+    except BlobTooLarge:
+        await writer.abort()
+        raise HTTPException(status_code=413, detail="Dosya boyutu sınırı aşıldı")
+    except BaseException:
+        await writer.abort()
+        raise
+    return await commit_blob(writer)
+
+def thumbnail_name(size: str) -> str:
+    return f"thumb_{size}.jpg"
+
+# Arka planda çalışan görevler (referans tutulmazsa GC tarafından toplanabilir)
+background_tasks = set()
+
+def run_in_background(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+# Aynı içerik için aynı anda tek küçük resim işi çalışsın
+thumbnail_jobs: Dict[str, asyncio.Task] = {}
+
+async def generate_thumbnails(blob_key: str):
+    """İlk sayfanın küçük resimlerini süreç havuzunda üret ve blob'un yanına yaz"""
+    try:
+        missing = [
+            size for size in THUMBNAIL_SIZES
+            if not blob_store.derived_path(blob_key, thumbnail_name(size)).is_file()
+        ]
+        if missing:
+            loop = asyncio.get_running_loop()
+            thumbnails = await loop.run_in_executor(
+                get_render_pool(),
+                render_thumbnails,
+                str(blob_store.path_for(blob_key)),
+                {size: THUMBNAIL_SIZES[size] for size in missing}
+            )
+            for size, data in thumbnails.items():
+                await blob_store.put_derived(blob_key, thumbnail_name(size), data)
+        status = "ready"
+    except Exception as e:
+        logging.error(f"Küçük resim oluşturulurken hata ({blob_key}): {e}")
+        status = "failed"
+    await pdfs_collection.update_many(
+        blob_users_query(blob_key),
+        {"$set": {"thumbnailStatus": status}}
+    )
+    await invalidate_blob_metadata(blob_key)
+
+def schedule_thumbnails(blob_key: str):
+    if blob_key in thumbnail_jobs:
+        return
+    task = asyncio.create_task(generate_thumbnails(blob_key))
+    thumbnail_jobs[blob_key] = task
+    task.add_done_callback(lambda _: thumbnail_jobs.pop(blob_key, None))
+
+async def extract_pdf_text(pdf_id: str, blob_key: str):
+    """Sayfa metinlerini süreç havuzunda çıkar ve arama indeksine yaz"""
+    try:
+        loop = asyncio.get_running_loop()
+        texts = await loop.run_in_executor(
+            get_render_pool(),
+            extract_page_texts,
+            str(blob_store.path_for(blob_key))
+        )
+        await page_texts_collection.delete_many({"pdf_id": pdf_id})
+        pages = [
+            {"pdf_id": pdf_id, "page": index + 1, "text": text}
+            for index, text in enumerate(texts) if text
+        ]
+        if pages:
+            await page_texts_collection.insert_many(pages, ordered=False)
+        status = "ready"
+    except Exception as e:
+        logging.error(f"PDF metni çıkarılırken hata ({pdf_id}): {e}")
+        status = "failed"
+    result = await pdfs_collection.update_one({"id": pdf_id}, {"$set": {"textStatus": status}})
+    await pdf_metadata_cache.invalidate(pdf_id)
+    if result.matched_count == 0:
+        # PDF bu arada silindiyse artık metinleri bırakma
+        await page_texts_collection.delete_many({"pdf_id": pdf_id})
+
+def schedule_ingest_jobs(pdf_id: str, blob_key: Optional[str]):
+    """Yeni içerik için küçük resim ve metin çıkarma işlerini başlat"""
+    if not blob_key:
+        return
+    schedule_thumbnails(blob_key)
+    run_in_background(extract_pdf_text(pdf_id, blob_key))
+
+# Aynı PDF için aynı anda tek indirme
+url_fetch_jobs: Dict[str, asyncio.Task] = {}
+
+async def fetch_remote_pdf(pdf_id: str):
+    """URL'deki PDF'i indirip blob deposuna al; yenilemede ETag/Last-Modified kullan"""
+    pdf = await pdfs_collection.find_one(
+        {"id": pdf_id},
+        {"uri": 1, "blobKey": 1, "sourceEtag": 1, "sourceLastModified": 1}
+    )
+    if not pdf:
+        return
+    await pdfs_collection.update_one({"id": pdf_id}, {"$set": {"fetchStatus": "fetching"}})
+    await pdf_metadata_cache.invalidate(pdf_id)
+    has_content = bool(pdf.get("blobKey"))
+    try:
+        result = await url_fetcher.fetch(
+            pdf["uri"],
+            etag=pdf.get("sourceEtag") if has_content else None,
+            last_modified=pdf.get("sourceLastModified") if has_content else None
+        )
+    except Exception as e:
+        if not isinstance(e, FetchError):
+            logging.error(f"URL'den PDF indirilirken hata ({pdf_id}): {e}")
+        await pdfs_collection.update_one(
+            {"id": pdf_id},
+            {"$set": {"fetchStatus": "failed", "fetchError": str(e) or "İndirilemedi"}}
+        )
+        await pdf_metadata_cache.invalidate(pdf_id)
+        return
+    
+    update = {"fetchStatus": "ready", "fetchError": None, "fetchedAt": datetime.utcnow()}
+    if result.not_modified:
+        await pdfs_collection.update_one({"id": pdf_id}, {"$set": update})
+        await pdf_metadata_cache.invalidate(pdf_id)
+        return
+    
+    content_changed = result.blob.key != pdf.get("blobKey")
+    update.update({
+        "blobKey": result.blob.key,
+        "sha256": result.blob.sha256,
+        "size": result.blob.size,
+        "sourceEtag": result.etag,
+        "sourceLastModified": result.last_modified
+    })
+    if content_changed:
+        update.update({"thumbnailStatus": "pending", "textStatus": "pending"})
+    updated = await pdfs_collection.update_one({"id": pdf_id}, {"$set": update})
+    await pdf_metadata_cache.invalidate(pdf_id)
+    if updated.matched_count == 0:
+        # İndirme sürerken PDF silindi
+        await release_pdf_content(result.blob.key)
+        return
+    if has_content:
+        # İndirme yeni içerik için referans aldı; içerik aynı olsa da eskisi bırakılır
+        await release_pdf_content(pdf["blobKey"])
+    if content_changed:
+        schedule_ingest_jobs(pdf_id, result.blob.key)
+
+def schedule_url_fetch(pdf_id: str):
+    if pdf_id in url_fetch_jobs:
+        return
+    task = asyncio.create_task(fetch_remote_pdf(pdf_id))
+    url_fetch_jobs[pdf_id] = task
+    task.add_done_callback(lambda _: url_fetch_jobs.pop(pdf_id, None))
+
+def page_cache_key(blob_key: str, page_number: int, scale: float) -> str:
+    return f"{blob_key}_{page_number}_{scale:.2f}.png"
+
+async def get_rendered_page(blob_key: str, page_number: int, scale: float) -> Path:
+    """Sayfayı önbellekten getir, yoksa süreç havuzunda çiz"""
+    async def render() -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_render_pool(),
+            render_page,
+            str(blob_store.path_for(blob_key)),
+            page_number,
+            scale
+        )
+    return await page_render_cache.get_or_render(
+        page_cache_key(blob_key, page_number, scale), render
+    )
+
+async def prefetch_pages(blob_key: str, first_page: int, count: int, scale: float):
+    """Sonraki sayfaları önbelleğe ısıt; belge sonu gelince dur"""
+    for page_number in range(first_page, first_page + count):
+        try:
+            await get_rendered_page(blob_key, page_number, scale)
+        except PageOutOfRange:
+            break
+        except Exception as e:
+            logging.warning(f"Sayfa ön yüklenemedi ({blob_key} s.{page_number}): {e}")
+            break
+
+# Annotation endpoint'lerinin her istekte PDF'i Mongo'da aramasını engeller
+pdf_existence_cache = ExistenceCache(
+    max_entries=int(os.environ.get('PDF_EXISTS_CACHE_SIZE', 10000)),
+    ttl=float(os.environ.get('PDF_EXISTS_TTL', 60)),
+    negative_ttl=float(os.environ.get('PDF_EXISTS_NEGATIVE_TTL', 5))
+)
+
+def pdf_metadata_cacheable(pdf: dict) -> bool:
+    # Eski kayıtlardaki base64 içerik önbelleğe alınmaz; bu kayıtlar her seferinde okunur
+    return not pdf.get("fileData") and not pdf.get("thumbnailData")
+
+METADATA_CACHE_TTL = float(os.environ.get('METADATA_CACHE_TTL', 30))
+# Birden çok worker aynı önbelleği paylaşsın diye Redis protokolü konuşan bir sunucu verilebilir
+if os.environ.get('METADATA_CACHE_URL'):
+    metadata_backend = RedisBackend.from_url(os.environ['METADATA_CACHE_URL'], ttl=METADATA_CACHE_TTL)
+else:
+    metadata_backend = MemoryBackend(
+        max_entries=int(os.environ.get('METADATA_CACHE_SIZE', 5000)),
+        ttl=METADATA_CACHE_TTL
+    )
+pdf_metadata_cache = MetadataCache(metadata_backend, cacheable=pdf_metadata_cacheable)
+
+async def load_pdf_metadata(pdf_id: str) -> Optional[dict]:
+    return await pdfs_collection.find_one({"id": pdf_id}, PDF_FILE_PROJECTION)
+
+async def get_pdf_metadata(pdf_id: str) -> Optional[dict]:
+    """PDF dokümanını önbellekten, yoksa Mongo'dan oku"""
+    return await pdf_metadata_cache.get(pdf_id, load_pdf_metadata)
+
+async def invalidate_blob_metadata(blob_key: str):
+    """Aynı blob'u paylaşan tüm PDF'lerin önbellek girdilerini düşür"""
+    async for pdf in pdfs_collection.find(blob_users_query(blob_key), {"_id": 0, "id": 1}):
+        await pdf_metadata_cache.invalidate(pdf["id"])
+
+async def insert_pdf_document(pdf_obj: PDFFile):
+    """PDF dokümanını kaydet; kayıt başarısız olursa alınan blob referansını bırak"""
+    try:
+        await pdfs_collection.insert_one(pdf_obj.dict())
+    except BaseException:
+        if pdf_obj.blobKey:
+            await release_pdf_content(pdf_obj.blobKey)
+        raise
+
+async def find_pdf_id(pdf_id: str) -> bool:
+    return await pdfs_collection.find_one({"id": pdf_id}, {"_id": 1}) is not None
+
+async def pdf_exists(pdf_id: str) -> bool:
+    """PDF'in varlığını içeriği çekmeden kontrol et; sonuç önbelleğe alınır"""
+    return await pdf_existence_cache.exists(pdf_id, find_pdf_id)
+
+async def update_stats_counters(delta: dict):
+    if USE_STATS_COUNTERS:
+        await apply_counter_delta(counters_collection, delta)
+
+async def release_pdf_content(blob_key: str):
+    """Blob referansını bırak; son referanssa diskten sil"""
+    if await release_blob_ref(blob_refs_collection, blob_key):
+        await blob_store.delete(blob_key)
+        await finish_blob_release(blob_refs_collection, blob_key)
+
+async def flush_annotation_updates(batch: Dict[BufferKey, dict]):
+    """Birleştirilmiş canlı güncellemeleri tek sırasız bulk_write ile yaz"""
+    moved = [key for key, fields in batch.items() if "x" in fields or "y" in fields]
+    geometry = {}
+    if moved:
+        # Konumu değişenlerin spatial alanı için geometri tek sorguda alınır
+        async for annotation in annotations_collection.find(
+            moved_annotations_query(moved),
+            {"_id": 0, "pdf_id": 1, "id": 1, "x": 1, "y": 1, "width": 1, "height": 1, "spatial.ink": 1}
+        ):
+            geometry[(annotation["pdf_id"], annotation["id"])] = annotation
+    requests = []
+    for key, fields in batch.items():
+        update = dict(fields)
+        if key in geometry:
+            update.update(moved_spatial_fields(geometry[key], fields))
+        pdf_id, annotation_id = key
+        operations = {}
+        if "updated_at" in update:
+            # Araya giren doğrudan yazmanın daha yeni damgası geri alınmasın (ISO metinler sıralanabilir)
+            operations["$max"] = {"updated_at": update.pop("updated_at")}
+        if update:
+            operations["$set"] = update
+        requests.append(UpdateOne({"id": annotation_id, "pdf_id": pdf_id}, operations))
+    await annotations_collection.bulk_write(requests, ordered=False)
+
+annotation_write_buffer = WriteBehindBuffer(
+    flush_annotation_updates,
+    interval=LIVE_FLUSH_INTERVAL,
+    max_entries=LIVE_BUFFER_MAX_ENTRIES
+)
+
 # PDF Endpoints
-@api_router.get("/pdfs", response_model=List[PDFFile])
-async def get_pdfs():
+@api_router.get("/pdfs", response_model=List[PDFSummary])
+async def get_pdfs(
+    limit: int = Query(PDF_LIST_DEFAULT_LIMIT, ge=1, le=PDF_LIST_MAX_LIMIT),
+    cursor: Optional[str] = None
+):
     """Tüm PDF dosyalarını getir"""
     try:
-        pdfs = await pdfs_collection.find().to_list(1000)
-        return [PDFFile(**pdf) for pdf in pdfs]
+        return await list_pdf_summaries({}, limit, cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"PDF'ler getirilirken hata: {e}")
         raise HTTPException(status_code=500, detail="PDF'ler getirilemedi")
 
-@api_router.get("/pdfs/favorites", response_model=List[PDFFile])
-async def get_favorite_pdfs():
+@api_router.get("/pdfs/favorites", response_model=List[PDFSummary])
+async def get_favorite_pdfs(
+    limit: int = Query(PDF_LIST_DEFAULT_LIMIT, ge=1, le=PDF_LIST_MAX_LIMIT),
+    cursor: Optional[str] = None
+):
     """Favori PDF dosyalarını getir"""
     try:
-        pdfs = await pdfs_collection.find({"isFavorite": True}).to_list(1000)
-        return [PDFFile(**pdf) for pdf in pdfs]
+        return await list_pdf_summaries(FAVORITE_PDFS_QUERY, limit, cursor)
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Favori PDF'ler getirilirken hata: {e}")
         raise HTTPException(status_code=500, detail="Favori PDF'ler getirilemedi")
@@ -85,10 +710,10 @@ async def get_favorite_pdfs():
 async def get_pdf(pdf_id: str):
     """Belirli bir PDF dosyasını getir"""
     try:
-        pdf = await pdfs_collection.find_one({"id": pdf_id})
+        pdf = await get_pdf_metadata(pdf_id)
         if not pdf:
             raise HTTPException(status_code=404, detail="PDF bulunamadı")
-        return PDFFile(**pdf)
+        return ORJSONResponse(trusted_rows(PDFFile, [pdf])[0])
     except HTTPException:
         raise
     except Exception as e:
@@ -100,11 +725,31 @@ async def create_pdf(pdf_data: PDFCreate):
     """Yeni PDF dosyası oluştur"""
     try:
         pdf_dict = pdf_data.dict()
+        file_data = pdf_dict.pop("fileData", None)
         pdf_obj = PDFFile(**pdf_dict)
         
+        # İçerik geldiyse base64 olarak değil, blob deposunda sakla
+        if file_data:
+            try:
+                content = base64.b64decode(file_data, validate=True)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Geçersiz dosya verisi")
+            if len(content) > MAX_UPLOAD_SIZE:
+                raise HTTPException(status_code=413, detail="Dosya boyutu sınırı aşıldı")
+            # Yükleme yolundaki gibi PDF imzası blob yazılmadan kontrol edilir
+            if not is_pdf_header(content):
+                raise HTTPException(status_code=400, detail="Sadece PDF dosyaları yüklenebilir")
+            await store_pdf_content(pdf_obj, content)
+        
         # MongoDB'ye kaydet
-        await pdfs_collection.insert_one(pdf_obj.dict())
+        await insert_pdf_document(pdf_obj)
+        pdf_existence_cache.mark_present(pdf_obj.id)
+        await pdf_metadata_cache.put(pdf_obj.id, pdf_obj.dict())
+        await update_stats_counters(counter_delta(pdf_obj.dict()))
+        schedule_ingest_jobs(pdf_obj.id, pdf_obj.blobKey)
         return pdf_obj
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"PDF oluşturulurken hata: {e}")
         raise HTTPException(status_code=500, detail="PDF oluşturulamadı")
@@ -113,23 +758,20 @@ async def create_pdf(pdf_data: PDFCreate):
 async def toggle_favorite(pdf_id: str):
     """PDF'in favori durumunu değiştir"""
     try:
-        # Önce mevcut PDF'i bul
-        existing_pdf = await pdfs_collection.find_one({"id": pdf_id})
-        if not existing_pdf:
-            raise HTTPException(status_code=404, detail="PDF bulunamadı")
-        
-        # Favori durumunu tersine çevir
-        new_favorite_status = not existing_pdf.get("isFavorite", False)
-        
-        # Güncelle
-        await pdfs_collection.update_one(
+        # Çevir ve güncel dokümanı aynı istekte al
+        updated_pdf = await pdfs_collection.find_one_and_update(
             {"id": pdf_id},
-            {"$set": {"isFavorite": new_favorite_status}}
+            FAVORITE_TOGGLE,
+            projection=PDF_MUTATION_PROJECTION,
+            return_document=ReturnDocument.AFTER
         )
+        if updated_pdf is None:
+            raise HTTPException(status_code=404, detail="PDF bulunamadı")
         
-        # Güncellenmiş PDF'i getir
-        updated_pdf = await pdfs_collection.find_one({"id": pdf_id})
-        return PDFFile(**updated_pdf)
+        # Her çevirme bir değişikliktir; sayaç yeni duruma göre artar/azalır
+        await update_stats_counters({"favoritePdfs": 1 if updated_pdf["isFavorite"] else -1})
+        await pdf_metadata_cache.invalidate(pdf_id)
+        return ORJSONResponse(trusted_rows(PDFFile, [updated_pdf])[0])
     except HTTPException:
         raise
     except Exception as e:
@@ -146,18 +788,23 @@ async def update_pdf(pdf_id: str, pdf_update: PDFUpdate):
         if not update_data:
             raise HTTPException(status_code=400, detail="Güncellenecek veri yok")
         
-        # Güncelle
-        result = await pdfs_collection.update_one(
+        # Güncelle; favori sayacı için önceki doküman alınır, güncel hali
+        # $set alanları üstüne uygulanarak elde edilir (ikinci okuma yok)
+        previous = await pdfs_collection.find_one_and_update(
             {"id": pdf_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            projection=PDF_MUTATION_PROJECTION,
+            return_document=ReturnDocument.BEFORE
         )
         
-        if result.matched_count == 0:
+        if previous is None:
             raise HTTPException(status_code=404, detail="PDF bulunamadı")
         
-        # Güncellenmiş PDF'i getir
-        updated_pdf = await pdfs_collection.find_one({"id": pdf_id})
-        return PDFFile(**updated_pdf)
+        if "isFavorite" in update_data and update_data["isFavorite"] != previous.get("isFavorite", False):
+            await update_stats_counters({"favoritePdfs": 1 if update_data["isFavorite"] else -1})
+        
+        await pdf_metadata_cache.invalidate(pdf_id)
+        return ORJSONResponse(trusted_rows(PDFFile, [{**previous, **update_data}])[0])
     except HTTPException:
         raise
     except Exception as e:
@@ -168,11 +815,23 @@ async def update_pdf(pdf_id: str, pdf_update: PDFUpdate):
 async def delete_pdf(pdf_id: str):
     """PDF dosyasını sil"""
     try:
-        result = await pdfs_collection.delete_one({"id": pdf_id})
+        deleted = await pdfs_collection.find_one_and_delete(
+            {"id": pdf_id},
+            projection={"blobKey": 1, "isFavorite": 1, "type": 1}
+        )
         
-        if result.deleted_count == 0:
+        pdf_existence_cache.mark_absent(pdf_id)
+        await pdf_metadata_cache.invalidate(pdf_id)
+        if not deleted:
             raise HTTPException(status_code=404, detail="PDF bulunamadı")
         
+        await update_stats_counters(counter_delta(deleted, sign=-1))
+        await page_texts_collection.delete_many({"pdf_id": pdf_id})
+        
+        if deleted.get("blobKey"):
+            await release_pdf_content(deleted["blobKey"])
+        
+        live_hub.publish(pdf_id, {"type": "pdf.deleted"})
         return {"message": "PDF başarıyla silindi", "id": pdf_id}
     except HTTPException:
         raise
@@ -184,27 +843,25 @@ async def delete_pdf(pdf_id: str):
 async def upload_pdf_file(file: UploadFile = File(...)):
     """PDF dosyası yükle"""
     try:
-        if file.content_type != "application/pdf":
-            raise HTTPException(status_code=400, detail="Sadece PDF dosyaları yüklenebilir")
-        
-        # Dosyayı oku ve base64'e çevir
-        file_content = await file.read()
-        file_base64 = base64.b64encode(file_content).decode('utf-8')
+        # Dosyayı belleğe almadan blob deposuna aktar; aynı içerik zaten varsa yeniden kullanılır
+        blob, deduplicated = await stream_upload_to_blob(file)
         
         # PDF bilgilerini oluştur
-        pdf_data = PDFCreate(
+        pdf_obj = attach_blob(PDFFile(
             name=file.filename or "Adsız PDF",
-            uri=f"data:application/pdf;base64,{file_base64}",
-            size=len(file_content),
-            type="local",
-            fileData=file_base64
-        )
+            uri="",
+            size=blob.size,
+            type="local"
+        ), blob)
         
         # PDF'i kaydet
-        pdf_obj = PDFFile(**pdf_data.dict())
-        await pdfs_collection.insert_one(pdf_obj.dict())
+        await insert_pdf_document(pdf_obj)
+        pdf_existence_cache.mark_present(pdf_obj.id)
+        await pdf_metadata_cache.put(pdf_obj.id, pdf_obj.dict())
+        await update_stats_counters(counter_delta(pdf_obj.dict()))
+        schedule_ingest_jobs(pdf_obj.id, pdf_obj.blobKey)
         
-        return pdf_obj
+        return {**pdf_obj.dict(), "deduplicated": deduplicated}
     except HTTPException:
         raise
     except Exception as e:
@@ -218,6 +875,13 @@ async def add_pdf_from_url(url_data: dict):
         url = url_data.get("url")
         if not url:
             raise HTTPException(status_code=400, detail="URL gerekli")
+        if urlsplit(url).scheme not in ("http", "https"):
+            raise HTTPException(status_code=400, detail="Sadece http/https URL'leri desteklenir")
+        try:
+            # İndirme arka planda olsa da iç ağ adresleri kayıt oluşturulmadan reddedilir
+            await url_fetcher.check_url(url)
+        except FetchError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         # URL'den dosya adını çıkar
         filename = url.split("/")[-1]
@@ -227,12 +891,18 @@ async def add_pdf_from_url(url_data: dict):
         pdf_data = PDFCreate(
             name=filename,
             uri=url,
-            size=0,  # URL'den boyut bilinmiyor
+            size=0,  # indirme tamamlanınca güncellenir
             type="url"
         )
         
-        pdf_obj = PDFFile(**pdf_data.dict())
+        pdf_obj = PDFFile(**pdf_data.dict(), fetchStatus="pending")
         await pdfs_collection.insert_one(pdf_obj.dict())
+        pdf_existence_cache.mark_present(pdf_obj.id)
+        await pdf_metadata_cache.put(pdf_obj.id, pdf_obj.dict())
+        await update_stats_counters(counter_delta(pdf_obj.dict()))
+        
+        # İçeriği arka planda indir; durum fetchStatus alanından izlenir
+        schedule_url_fetch(pdf_obj.id)
         
         return pdf_obj
     except HTTPException:
@@ -241,23 +911,59 @@ async def add_pdf_from_url(url_data: dict):
         logging.error(f"URL'den PDF eklenirken hata: {e}")
         raise HTTPException(status_code=500, detail="URL'den PDF eklenemedi")
 
+@api_router.post("/pdfs/{pdf_id}/refresh")
+async def refresh_pdf_from_url(pdf_id: str):
+    """URL'den eklenen PDF'i kaynağından yeniden indir (değişmediyse 304 ile atlanır)"""
+    try:
+        pdf = await pdfs_collection.find_one({"id": pdf_id}, {"type": 1})
+        if not pdf:
+            raise HTTPException(status_code=404, detail="PDF bulunamadı")
+        if pdf.get("type") != "url":
+            raise HTTPException(status_code=400, detail="Sadece URL'den eklenen PDF'ler yenilenebilir")
+        
+        schedule_url_fetch(pdf_id)
+        return {"message": "PDF yenileme başlatıldı", "id": pdf_id}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"PDF yenilenirken hata: {e}")
+        raise HTTPException(status_code=500, detail="PDF yenilenemedi")
+
 # Stats endpoint
+# GET ve HEAD ayrı route olarak kaydedilir; OpenAPI'de her birine ayrı operation ID üretilir
 @api_router.get("/pdfs/{pdf_id}/view")
-async def view_pdf(pdf_id: str):
+@api_router.head("/pdfs/{pdf_id}/view")
+async def view_pdf(pdf_id: str, request: Request):
     """PDF'i tarayıcıda görüntüleme için döndür"""
     try:
         pdf = await pdfs_collection.find_one({"id": pdf_id})
         if not pdf:
             raise HTTPException(status_code=404, detail="PDF bulunamadı")
         
-        # Eğer base64 data varsa onu döndür
-        if pdf.get("fileData"):
+        filename = pdf.get('name', 'document').encode('ascii', 'ignore').decode('ascii')
+        
+        # Blob deposundaki dosyayı Range/ETag desteğiyle doğrudan diskten gönder
+        if pdf.get("blobKey"):
+            blob_path = blob_store.path_for(pdf["blobKey"])
+            try:
+                stat_result = blob_path.stat()
+            except FileNotFoundError:
+                raise HTTPException(status_code=404, detail="PDF içeriği bulunamadı")
+            return conditional_file_response(
+                request.headers,
+                blob_path,
+                stat_result,
+                etag=f'"{pdf.get("sha256") or pdf["blobKey"]}"',
+                media_type="application/pdf",
+                headers={
+                    "Content-Disposition": f"inline; filename=\"{filename}.pdf\""
+                },
+                cache_control=PDF_CACHE_CONTROL
+            )
+        # Eski kayıtlar: base64 data varsa onu döndür
+        elif pdf.get("fileData"):
             # Base64 veriyi PDF olarak döndür
-            import base64
-            from fastapi.responses import Response
-            
             pdf_bytes = base64.b64decode(pdf["fileData"])
-            filename = pdf.get('name', 'document').encode('ascii', 'ignore').decode('ascii')
             return Response(
                 content=pdf_bytes,
                 media_type="application/pdf",
@@ -268,12 +974,8 @@ async def view_pdf(pdf_id: str):
             )
         elif pdf.get("uri", "").startswith("data:application/pdf;base64,"):
             # URI'de base64 data varsa onu çıkar ve döndür
-            import base64
-            from fastapi.responses import Response
-            
             base64_data = pdf["uri"].split("data:application/pdf;base64,")[1]
             pdf_bytes = base64.b64decode(base64_data)
-            filename = pdf.get('name', 'document').encode('ascii', 'ignore').decode('ascii')
             return Response(
                 content=pdf_bytes,
                 media_type="application/pdf",
@@ -284,7 +986,6 @@ async def view_pdf(pdf_id: str):
             )
         else:
             # External URL ise redirect et
-            from fastapi.responses import RedirectResponse
             return RedirectResponse(url=pdf["uri"])
             
     except HTTPException:
@@ -293,48 +994,232 @@ async def view_pdf(pdf_id: str):
         logging.error(f"PDF görüntülenirken hata: {e}")
         raise HTTPException(status_code=500, detail="PDF görüntülenemedi")
 
+@api_router.get("/pdfs/{pdf_id}/thumbnail")
+@api_router.head("/pdfs/{pdf_id}/thumbnail")
+async def get_pdf_thumbnail(pdf_id: str, request: Request, size: str = "small"):
+    """PDF'in ilk sayfasının küçük resmini döndür"""
+    try:
+        if size not in THUMBNAIL_SIZES:
+            raise HTTPException(status_code=400, detail="Geçersiz küçük resim boyutu")
+        
+        pdf = await pdfs_collection.find_one(
+            {"id": pdf_id},
+            {"blobKey": 1, "thumbnailStatus": 1}
+        )
+        if not pdf:
+            raise HTTPException(status_code=404, detail="PDF bulunamadı")
+        if not pdf.get("blobKey"):
+            raise HTTPException(status_code=404, detail="Küçük resim yok")
+        
+        thumbnail_path = blob_store.derived_path(pdf["blobKey"], thumbnail_name(size))
+        try:
+            stat_result = thumbnail_path.stat()
+        except FileNotFoundError:
+            # Eski kayıtlar için küçük resmi ilk istekte arka planda üret
+            if pdf.get("thumbnailStatus") != "failed":
+                schedule_thumbnails(pdf["blobKey"])
+            raise HTTPException(status_code=404, detail="Küçük resim henüz hazır değil")
+        
+        return conditional_file_response(
+            request.headers,
+            thumbnail_path,
+            stat_result,
+            etag=f'"{pdf["blobKey"]}-{size}"',
+            media_type=THUMBNAIL_MEDIA_TYPE,
+            cache_control=PDF_CACHE_CONTROL
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Küçük resim getirilirken hata: {e}")
+        raise HTTPException(status_code=500, detail="Küçük resim getirilemedi")
+
+@api_router.get("/pdfs/{pdf_id}/pages/{page_number}.png")
+async def get_pdf_page_image(
+    pdf_id: str,
+    page_number: int,
+    request: Request,
+    scale: float = Query(1.0, gt=0, le=MAX_RENDER_SCALE),
+    prefetch: int = Query(0, ge=0, le=MAX_PREFETCH_PAGES)
+):
+    """PDF sayfasını sunucuda PNG olarak çiz (zayıf cihazlar için)"""
+    try:
+        if page_number < 1:
+            raise HTTPException(status_code=404, detail="Sayfa bulunamadı")
+        
+        pdf = await pdfs_collection.find_one({"id": pdf_id}, {"blobKey": 1})
+        if not pdf:
+            raise HTTPException(status_code=404, detail="PDF bulunamadı")
+        if not pdf.get("blobKey"):
+            raise HTTPException(status_code=404, detail="PDF içeriği sunucuda yok")
+        
+        # Önbellek anahtarlarını sınırlı tutmak için ölçeği yuvarla
+        scale = round(scale, 2)
+        try:
+            page_path = await get_rendered_page(pdf["blobKey"], page_number, scale)
+            try:
+                page_stat = page_path.stat()
+            except FileNotFoundError:
+                # Önbellek dizinini paylaşan başka bir worker dosyayı az önce tahliye etti
+                page_path = await get_rendered_page(pdf["blobKey"], page_number, scale)
+                page_stat = page_path.stat()
+        except PageOutOfRange:
+            raise HTTPException(status_code=404, detail="Sayfa bulunamadı")
+        
+        if prefetch:
+            run_in_background(
+                prefetch_pages(pdf["blobKey"], page_number + 1, prefetch, scale)
+            )
+        
+        return conditional_file_response(
+            request.headers,
+            page_path,
+            page_stat,
+            etag=f'"{pdf["blobKey"]}-{page_number}-{scale:.2f}"',
+            media_type="image/png",
+            cache_control=PDF_CACHE_CONTROL
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Sayfa çizilirken hata: {e}")
+        raise HTTPException(status_code=500, detail="Sayfa çizilemedi")
+
 @api_router.get("/stats")
 async def get_stats():
     """PDF istatistikleri getir"""
     try:
-        total_pdfs = await pdfs_collection.count_documents({})
-        favorite_pdfs = await pdfs_collection.count_documents({"isFavorite": True})
-        local_pdfs = await pdfs_collection.count_documents({"type": "local"})
-        cloud_pdfs = await pdfs_collection.count_documents({"type": "cloud"})
-        url_pdfs = await pdfs_collection.count_documents({"type": "url"})
-        
-        return {
-            "totalPdfs": total_pdfs,
-            "favoritePdfs": favorite_pdfs,
-            "localPdfs": local_pdfs,
-            "cloudPdfs": cloud_pdfs,
-            "urlPdfs": url_pdfs
-        }
+        if USE_STATS_COUNTERS:
+            return await read_stats(pdfs_collection, counters_collection)
+        return await aggregate_stats(pdfs_collection)
     except Exception as e:
         logging.error(f"İstatistikler getirilirken hata: {e}")
         raise HTTPException(status_code=500, detail="İstatistikler getirilemedi")
 
+@api_router.get("/stats/caches")
+async def get_cache_stats():
+    """Süreç içi önbelleklerin isabet/kaçırma sayaçları"""
+    return {
+        "pdfExistence": pdf_existence_cache.stats(),
+        "pdfMetadata": pdf_metadata_cache.stats(),
+        "pageRender": page_render_cache.stats(),
+        "annotationWriteBuffer": annotation_write_buffer.stats(),
+    }
+
+@api_router.get("/stats/storage")
+async def get_storage_stats():
+    """Blob deposu kullanımı ve içerik tekilleştirmesiyle kazanılan alan"""
+    try:
+        return await storage_stats(blob_refs_collection)
+    except Exception as e:
+        logging.error(f"Depolama istatistikleri getirilirken hata: {e}")
+        raise HTTPException(status_code=500, detail="Depolama istatistikleri getirilemedi")
+
+@api_router.get("/search")
+async def search_pdfs(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """PDF içeriklerinde tam metin arama; sayfa numarası ve alıntı ile"""
+    try:
+        terms = search_terms(q)
+        if not terms:
+            raise HTTPException(status_code=400, detail="Arama terimi gerekli")
+        
+        matches = await page_texts_collection.aggregate(
+            build_search_pipeline(q, limit)
+        ).to_list(limit)
+        
+        names = {}
+        async for pdf in pdfs_collection.find(
+            {"id": {"$in": [match["_id"] for match in matches]}},
+            {"_id": 0, "id": 1, "name": 1}
+        ):
+            names[pdf["id"]] = pdf["name"]
+        
+        return {"results": [
+            {
+                "pdfId": match["_id"],
+                "name": names[match["_id"]],
+                "score": round(match["score"], 4),
+                "pages": [
+                    {
+                        "page": page["page"],
+                        "score": round(page["score"], 4),
+                        "snippet": make_snippet(page["text"], terms)
+                    }
+                    for page in match["pages"]
+                ]
+            }
+            for match in matches if match["_id"] in names
+        ]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Arama yapılırken hata: {e}")
+        raise HTTPException(status_code=500, detail="Arama yapılamadı")
+
 # PDF annotations endpoints
 @api_router.get("/pdfs/{pdf_id}/annotations")
-async def get_pdf_annotations(pdf_id: str):
-    """PDF'in tüm annotation'larını getir"""
+async def get_pdf_annotations(
+    pdf_id: str,
+    since: Optional[str] = None,
+    drawing_format: Literal["svg", "strokes-v1"] = "svg",
+    page: Optional[int] = Query(None, ge=1),
+    bbox: Optional[str] = None
+):
+    """PDF'in tüm annotation'larını getir; since verilirse sadece değişenleri
+
+    since ile gelen yanıtta önce "deleted" listesindeki id'ler silinip sonra
+    "annotations" id bazında birleştirilmelidir. Dönen cursor bir sonraki
+    istekte since olarak kullanılır. drawing_format=strokes-v1 çizimleri
+    kompakt biçimde döndürür. page ve bbox=x0,y0,x1,y1 sadece o sayfadaki
+    ve görünüm alanıyla kesişen annotation'ları döndürür.
+    """
     try:
         # PDF var mı kontrol et
-        pdf = await pdfs_collection.find_one({"id": pdf_id})
-        if not pdf:
+        if not await pdf_exists(pdf_id):
             raise HTTPException(status_code=404, detail="PDF bulunamadı")
         
-        # Annotations'ları getir
+        since_time = None
+        if since:
+            try:
+                since_time = decode_sync_cursor(since)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Geçersiz cursor")
+        
+        viewport = None
+        if bbox:
+            try:
+                viewport = parse_bbox(bbox)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Geçersiz bbox")
+        
+        # Cursor, sorgudan önce alınan zaman; örtüşme payı eşzamanlı yazmaları kapsar
+        now = datetime.now()
+        # Silme izleri düşmüş olabilecek eski cursor'lar tam liste alır
+        reset = since_time is not None and now - since_time > TOMBSTONE_RETENTION - timedelta(days=1)
+        query = annotation_query(pdf_id, None if reset else since_time)
+        
+        # Annotations'ları getir; henüz yazılmamış canlı güncellemeler üstüne uygulanır
+        pending = annotation_write_buffer.pending_for(pdf_id)
         annotations = []
         async for annotation in annotations_collection.find(
-            {"pdf_id": pdf_id}
+            annotation_query(pdf_id, None if reset else since_time, page, viewport),
+            ANNOTATION_PROJECTION
         ):
-            # MongoDB _id'sini çıkar
-            if "_id" in annotation:
-                del annotation["_id"]
-            annotations.append(annotation)
+            annotation.update(pending.get(annotation["id"], {}))
+            annotations.append(present_annotation(annotation, drawing_format))
         
-        return {"annotations": annotations}
+        response = {"annotations": annotations, "cursor": encode_sync_cursor(now)}
+        if since_time is not None:
+            deleted = []
+            if not reset:
+                async for tombstone in tombstones_collection.find(query, {"_id": 0, "id": 1}):
+                    deleted.append(tombstone["id"])
+            response.update(deleted=deleted, reset=reset)
+        # Mongo'dan gelen satırlar zaten JSON uyumlu; jsonable_encoder'dan geçirilmez
+        return ORJSONResponse(response)
         
     except HTTPException:
         raise
@@ -342,36 +1227,32 @@ async def get_pdf_annotations(pdf_id: str):
         logging.error(f"Annotations getirme hatası: {str(e)}")
         raise HTTPException(status_code=500, detail="Annotations getirilemedi")
 
+async def build_drawing_annotation(pdf_id: str, data: dict, **options) -> dict:
+    """build_annotation; büyük çizimlerde RDP ve kodlama event loop'u bekletmesin"""
+    build = partial(build_annotation, pdf_id, data, stroke_tolerance=STROKE_SIMPLIFY_TOLERANCE, **options)
+    if drawing_point_count(data) < STROKE_EXECUTOR_POINTS:
+        return build()
+    return await asyncio.get_running_loop().run_in_executor(None, build)
+
+def check_request_drawing_points(datas) -> None:
+    if sum(drawing_point_count(data) for data in datas) > MAX_REQUEST_DRAWING_POINTS:
+        raise HTTPException(status_code=413, detail="İstekteki çizim noktası sınırı aşıldı")
+
 @api_router.post("/pdfs/{pdf_id}/annotations")
 async def add_pdf_annotation(pdf_id: str, annotation_data: dict):
     """PDF'e yeni annotation ekle"""
     try:
+        check_request_drawing_points([annotation_data])
+        
         # PDF var mı kontrol et
-        pdf = await pdfs_collection.find_one({"id": pdf_id})
-        if not pdf:
+        if not await pdf_exists(pdf_id):
             raise HTTPException(status_code=404, detail="PDF bulunamadı")
         
         # Annotation oluştur
-        annotation = {
-            "id": str(uuid.uuid4()),
-            "pdf_id": pdf_id,
-            "type": annotation_data.get("type", "text"),  # text, highlight, drawing
-            "x": annotation_data.get("x", 0),
-            "y": annotation_data.get("y", 0),
-            "width": annotation_data.get("width", 0),
-            "height": annotation_data.get("height", 0),
-            "page": annotation_data.get("page", 1),
-            "content": annotation_data.get("content", ""),
-            "color": annotation_data.get("color", "#FFFF00"),
-            "text_content": annotation_data.get("text_content", ""),  # Highlighted text
-            "start_offset": annotation_data.get("start_offset", 0),
-            "end_offset": annotation_data.get("end_offset", 0),
-            "stroke_width": annotation_data.get("stroke_width", 2),  # Drawing stroke width
-            "drawing_data": annotation_data.get("drawing_data", ""),  # SVG path or drawing data
-            "tool": annotation_data.get("tool", "pen"),  # pen, highlighter, eraser
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat()
-        }
+        try:
+            annotation = await build_drawing_annotation(pdf_id, annotation_data)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Geçersiz çizim verisi: {e}")
         
         # Veritabanına kaydet
         result = await annotations_collection.insert_one(annotation)
@@ -380,7 +1261,9 @@ async def add_pdf_annotation(pdf_id: str, annotation_data: dict):
             # MongoDB _id'sini çıkar
             if "_id" in annotation:
                 del annotation["_id"]
-            return {"message": "Annotation başarıyla eklendi", "annotation": annotation}
+            presented = present_annotation(annotation)
+            live_hub.publish(pdf_id, {"type": "annotation.created", "annotation": presented})
+            return {"message": "Annotation başarıyla eklendi", "annotation": presented}
         else:
             raise HTTPException(status_code=500, detail="Annotation eklenemedi")
             
@@ -390,38 +1273,206 @@ async def add_pdf_annotation(pdf_id: str, annotation_data: dict):
         logging.error(f"Annotation ekleme hatası: {str(e)}")
         raise HTTPException(status_code=500, detail="Annotation eklenemedi")
 
+async def apply_annotation_batch(pdf_id: str, operations: List[AnnotationOperation]) -> dict:
+    """Doğrulanmış işlemleri tek bir sırasız bulk_write ile uygula"""
+    now = datetime.now().isoformat()
+    results: List[dict] = []
+    requests = []
+    request_positions = []
+    changes: Dict[int, dict] = {}
+    
+    # Güncellenecek/silinecek annotation'ları tek sorguda doğrula
+    target_ids = [op.id for op in operations if op.op != "create"]
+    existing: Dict[str, dict] = {}
+    if target_ids:
+        # Konum güncellemelerinde spatial alanı için geometri de gerekir
+        async for annotation in annotations_collection.find(
+            {"pdf_id": pdf_id, "id": {"$in": target_ids}},
+            ANNOTATION_GEOMETRY_PROJECTION
+        ):
+            existing[annotation["id"]] = annotation
+    
+    for index, op in enumerate(operations):
+        result = {"index": index, "op": op.op, "id": op.id}
+        results.append(result)
+        if op.op == "create":
+            try:
+                annotation = await build_drawing_annotation(pdf_id, op.data, annotation_id=op.id, now=now)
+            except ValueError as e:
+                result.update(status="invalid", error=f"Geçersiz çizim verisi: {e}")
+                continue
+            result.update(id=annotation["id"], status="created", annotation=present_annotation(annotation))
+            requests.append(InsertOne(dict(annotation)))
+        elif op.id not in existing:
+            result["status"] = "not_found"
+            continue
+        elif op.op == "update":
+            update_data = annotation_update_fields(op.data)
+            if not update_data:
+                result.update(status="invalid", error="Güncellenecek veri yok")
+                continue
+            result["status"] = "updated"
+            changes[index] = {**update_data, "updated_at": now}
+            await annotation_write_buffer.discard((pdf_id, op.id), update_data.keys())
+            requests.append(UpdateOne(
+                {"id": op.id, "pdf_id": pdf_id},
+                {"$set": {
+                    **update_data,
+                    **moved_spatial_fields(existing[op.id], update_data),
+                    "updated_at": now
+                }}
+            ))
+        else:
+            result["status"] = "deleted"
+            await annotation_write_buffer.discard((pdf_id, op.id))
+            requests.append(DeleteOne({"id": op.id, "pdf_id": pdf_id}))
+        request_positions.append(index)
+    
+    if requests:
+        try:
+            await annotations_collection.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                result = results[request_positions[error["index"]]]
+                result.pop("annotation", None)
+                result.update(
+                    status="exists" if error.get("code") == 11000 else "error",
+                    error=error.get("errmsg", "")
+                )
+    
+    deleted_ids = [result["id"] for result in results if result["status"] == "deleted"]
+    if deleted_ids:
+        await tombstones_collection.insert_many([
+            build_tombstone(pdf_id, annotation_id, now) for annotation_id in deleted_ids
+        ])
+    
+    summary = {"created": 0, "updated": 0, "deleted": 0}
+    for result in results:
+        if result["status"] in summary:
+            summary[result["status"]] += 1
+        if result["status"] == "created":
+            live_hub.publish(pdf_id, {"type": "annotation.created", "annotation": result["annotation"]})
+        elif result["status"] == "updated":
+            live_hub.publish(pdf_id, {
+                "type": "annotation.updated", "id": result["id"], "changes": changes[result["index"]]
+            })
+        elif result["status"] == "deleted":
+            live_hub.publish(pdf_id, {"type": "annotation.deleted", "id": result["id"]})
+    return {"results": results, **summary}
+
+async def claim_idempotency_key(claim_id: str) -> Tuple[Optional[str], Optional[dict]]:
+    """Anahtarı bu istek adına al; (sahiplik, kayıtlı yanıt) döner
+
+    Yanıtı olmayan ve kiralama süresi dolmuş sahiplik devralınır; hâlâ
+    işlenen istek için 409.
+    """
+    owner = uuid.uuid4().hex
+    now = datetime.utcnow()
+    try:
+        await idempotency_collection.insert_one({"_id": claim_id, "createdAt": now, "claimedAt": now, "owner": owner})
+        return owner, None
+    except DuplicateKeyError:
+        pass
+    expired = now - IDEMPOTENCY_LEASE
+    taken = await idempotency_collection.find_one_and_update(
+        {
+            "_id": claim_id,
+            "response": {"$exists": False},
+            "$or": [
+                {"claimedAt": {"$lt": expired}},
+                # claimedAt'ten önce yazılmış kayıtlar
+                {"claimedAt": {"$exists": False}, "createdAt": {"$lt": expired}},
+            ],
+        },
+        {"$set": {"claimedAt": now, "owner": owner}}
+    )
+    if taken is not None:
+        logging.warning(f"Yarım kalan toplu işlem devralındı: {claim_id}")
+        return owner, None
+    stored = await idempotency_collection.find_one({"_id": claim_id})
+    if stored and stored.get("response") is not None:
+        return None, stored["response"]
+    raise HTTPException(status_code=409, detail="Aynı istek hâlâ işleniyor")
+
+@api_router.post("/pdfs/{pdf_id}/annotations:batch")
+async def batch_pdf_annotations(
+    pdf_id: str,
+    batch: AnnotationBatch,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=128)
+):
+    """Birden çok annotation ekleme/güncelleme/silme işlemini tek istekte uygula"""
+    key = batch.idempotencyKey or idempotency_key
+    claim_id = f"{pdf_id}:{key}" if key else None
+    try:
+        for op in batch.operations:
+            if op.op != "create" and not op.id:
+                raise HTTPException(status_code=400, detail="Güncelleme ve silme için id gerekli")
+        ids = [op.id for op in batch.operations if op.id]
+        if len(ids) != len(set(ids)):
+            raise HTTPException(status_code=400, detail="Aynı annotation bir istekte birden çok kez kullanılamaz")
+        check_request_drawing_points(op.data for op in batch.operations if op.op == "create")
+        
+        if not await pdf_exists(pdf_id):
+            raise HTTPException(status_code=404, detail="PDF bulunamadı")
+        
+        # Tekrar denenen istekler kaydedilmiş yanıtı alır
+        owner = None
+        if claim_id:
+            owner, stored_response = await claim_idempotency_key(claim_id)
+            if stored_response is not None:
+                return stored_response
+        
+        # Sahiplik devralındıysa eski isteğin yazmaları yeni sahibin kaydını ezmez
+        try:
+            response = await apply_annotation_batch(pdf_id, batch.operations)
+        except BaseException:
+            if owner:
+                await idempotency_collection.delete_one({"_id": claim_id, "owner": owner})
+            raise
+        
+        if owner:
+            await idempotency_collection.update_one(
+                {"_id": claim_id, "owner": owner}, {"$set": {"response": response}}
+            )
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Toplu annotation hatası: {str(e)}")
+        raise HTTPException(status_code=500, detail="Annotation işlemleri uygulanamadı")
+
 @api_router.put("/pdfs/{pdf_id}/annotations/{annotation_id}")
 async def update_pdf_annotation(pdf_id: str, annotation_id: str, annotation_data: dict):
     """PDF annotation'ını güncelle"""
     try:
-        # Annotation var mı kontrol et
-        existing_annotation = await annotations_collection.find_one({
-            "id": annotation_id, 
-            "pdf_id": pdf_id
-        })
-        
-        if not existing_annotation:
-            raise HTTPException(status_code=404, detail="Annotation bulunamadı")
+        # Bu istekle gelen alanların bekleyen eski canlı değerleri yazılmasın
+        changes = annotation_update_fields(annotation_data)
+        await annotation_write_buffer.discard((pdf_id, annotation_id), changes.keys())
         
-        # Güncellenecek alanlar
-        update_data = {
-            "content": annotation_data.get("content", existing_annotation.get("content")),
-            "x": annotation_data.get("x", existing_annotation.get("x")),
-            "y": annotation_data.get("y", existing_annotation.get("y")),
-            "color": annotation_data.get("color", existing_annotation.get("color")),
-            "updated_at": datetime.now().isoformat()
-        }
-        
-        # Güncelle
-        result = await annotations_collection.update_one(
+        # Varlık kontrolü ve güncelleme tek istekte; gelmeyen alanlara dokunulmaz
+        update_data = {**changes, "updated_at": datetime.now().isoformat()}
+        update = {"$set": update_data}
+        if "x" in changes or "y" in changes:
+            # Taşımada hücreler aynı yazmada yeni konumdan hesaplanır; ızgara hiç eski kalmaz
+            update = [
+                {"$set": {field: {"$literal": value} for field, value in update_data.items()}},
+                spatial_update_stage()
+            ]
+        updated_annotation = await annotations_collection.find_one_and_update(
             {"id": annotation_id, "pdf_id": pdf_id},
-            {"$set": update_data}
+            update,
+            projection={"_id": 0, "id": 1}
         )
         
-        if result.modified_count > 0:
-            return {"message": "Annotation başarıyla güncellendi"}
-        else:
-            raise HTTPException(status_code=500, detail="Annotation güncellenemedi")
+        if updated_annotation is None:
+            raise HTTPException(status_code=404, detail="Annotation bulunamadı")
+        
+        live_hub.publish(pdf_id, {
+            "type": "annotation.updated",
+            "id": annotation_id,
+            "changes": update_data
+        })
+        return {"message": "Annotation başarıyla güncellendi"}
             
     except HTTPException:
         raise
@@ -433,6 +1484,8 @@ async def update_pdf_annotation(pdf_id: str, annotation_id: str, annotation_data
 async def delete_pdf_annotation(pdf_id: str, annotation_id: str):
     """PDF annotation'ını sil"""
     try:
+        await annotation_write_buffer.discard((pdf_id, annotation_id))
+        
         # Annotation var mı kontrol et ve sil
         result = await annotations_collection.delete_one({
             "id": annotation_id, 
@@ -440,6 +1493,11 @@ async def delete_pdf_annotation(pdf_id: str, annotation_id: str):
         })
         
         if result.deleted_count > 0:
+            # Artımlı senkron yapan istemciler için silme izi bırak
+            await tombstones_collection.insert_one(
+                build_tombstone(pdf_id, annotation_id, datetime.now().isoformat())
+            )
+            live_hub.publish(pdf_id, {"type": "annotation.deleted", "id": annotation_id})
             return {"message": "Annotation başarıyla silindi"}
         else:
             raise HTTPException(status_code=404, detail="Annotation bulunamadı")
@@ -450,11 +1508,103 @@ async def delete_pdf_annotation(pdf_id: str, annotation_id: str):
         logging.error(f"Annotation silme hatası: {str(e)}")
         raise HTTPException(status_code=500, detail="Annotation silinemedi")
 
+async def handle_live_message(pdf_id: str, connection: LiveConnection, message):
+    """İstemciden gelen canlı güncellemeyi tampona al ve odaya yayınla"""
+    if not isinstance(message, dict) or message.get("type") != "update":
+        connection.offer({"type": "error", "detail": "Desteklenmeyen mesaj"})
+        return
+    annotation_id = message.get("id")
+    data = message.get("data")
+    update_data = annotation_update_fields(data) if isinstance(data, dict) else {}
+    if not isinstance(annotation_id, str) or not update_data:
+        connection.offer({"type": "error", "id": annotation_id, "detail": "Geçersiz güncelleme"})
+        return
+    
+    key = (pdf_id, annotation_id)
+    # Varlık kontrolü her hareket için değil, tamponlanan ilk değişiklikte yapılır
+    if key not in annotation_write_buffer and await annotations_collection.find_one(
+        {"pdf_id": pdf_id, "id": annotation_id}, {"_id": 1}
+    ) is None:
+        connection.offer({"type": "error", "id": annotation_id, "detail": "Annotation bulunamadı"})
+        return
+    
+    changes = {**update_data, "updated_at": datetime.now().isoformat()}
+    annotation_write_buffer.add(key, changes)
+    # Gönderen de kendi mesajını alır (origin ile ayırt eder); seq boşluksuz kalır
+    live_hub.publish(pdf_id, {
+        "type": "annotation.updated", "id": annotation_id, "changes": changes, "origin": connection.id
+    })
+
+@api_router.websocket("/ws/pdfs/{pdf_id}")
+async def annotation_channel(websocket: WebSocket, pdf_id: str):
+    """PDF'i görüntüleyen herkese annotation değişikliklerini canlı ilet"""
+    if not await pdf_exists(pdf_id):
+        await websocket.close(code=4404)
+        return
+    await websocket.accept()
+    connection = live_hub.join(pdf_id, websocket)
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                message = json.loads(text)
+            except ValueError:
+                connection.offer({"type": "error", "detail": "Geçersiz JSON"})
+                continue
+            await handle_live_message(pdf_id, connection, message)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logging.error(f"WebSocket hatası ({pdf_id}): {e}")
+    finally:
+        live_hub.leave(pdf_id, connection)
+
 # Health check
 @api_router.get("/")
 async def root():
     return {"message": "PDF Görüntüleyici API aktif", "status": "ok"}
 
+# Prometheus kazıyıcısı pod'a doğrudan bağlanır; /api dışında tutulduğundan ingress'ten yayınlanmaz
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return metrics_response()
+
+# Sağlık uçları da /metrics gibi pod'a doğrudan çağrılır; /api dışında durur
+READINESS_TIMEOUT = float(os.environ.get('READINESS_TIMEOUT', 2))
+
+def storage_writable() -> bool:
+    # Blob yazıcısının kullandığı geçici dizine küçük bir dosya yazılıp silinir
+    probe = blob_store.root / "tmp" / f".ready-{uuid.uuid4().hex}"
+    try:
+        probe.write_bytes(b"ok")
+        probe.unlink()
+        return True
+    except OSError:
+        return False
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Süreç ayakta mı (liveness); bağımlılıklara bakmaz"""
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Trafik alınabilir mi (readiness): açılış bitti, Mongo yanıt veriyor, depolama yazılabilir"""
+    checks = {"startup": bool(app.state.ready)}
+    if checks["startup"]:
+        try:
+            await asyncio.wait_for(client.admin.command("ping"), READINESS_TIMEOUT)
+            checks["mongo"] = True
+        except Exception as e:
+            logging.warning(f"Hazırlık kontrolünde Mongo yanıt vermedi: {e}")
+            checks["mongo"] = False
+        checks["storage"] = await asyncio.to_thread(storage_writable)
+    ready = all(checks.values())
+    return ORJSONResponse(
+        {"status": "ready" if ready else "unavailable", "checks": checks},
+        status_code=200 if ready else 503
+    )
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -464,8 +1614,24 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Accept-Ranges", "Content-Range", "ETag"],
 )
 
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    paths=("/api/pdfs/upload",),
+    max_size=MAX_UPLOAD_SIZE,
+)
+
+# JSON yanıtları istemcinin kabul ettiği kodlamayla sıkıştırılır; PDF ve görseller olduğu gibi gider
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.environ.get('COMPRESSION_MINIMUM_SIZE', 1024)),
+)
+
+# En dışta: CORS ve boyut sınırı yanıtları da ölçülür
+app.add_middleware(MetricsMiddleware, routes=app.routes)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -473,6 +1639,84 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+async def warm_connection_pool(connections: int):
+    """Havuzda eşzamanlı ping ile bağlantı aç; ilk istekler bağlantı kurulmasını beklemez"""
+    if connections > 0:
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(connections)))
+
+async def prepare_blob_refs():
+    # Referans sayımından önce yüklenen blob'lar için kayıtlar bir kez oluşturulur
+    await backfill_blob_refs(pdfs_collection, blob_refs_collection)
+    # Süreç silme sırasında kapandıysa yarım kalan silmeleri bitir
+    for blob_key in await pending_blob_releases(blob_refs_collection):
+        await blob_store.delete(blob_key)
+        await finish_blob_release(blob_refs_collection, blob_key)
+
+async def resume_url_fetches():
+    # Yarıda kalan indirmeleri yeniden kuyruğa al
+    async for pdf in pdfs_collection.find(PENDING_FETCH_QUERY, {"id": 1}):
+        schedule_url_fetch(pdf["id"])
+
+async def backfill_spatial_index(batch_size: int = 500):
+    """Spatial alanı olmayan eski annotation'ları ızgaraya ekle"""
+    requests = []
+    try:
+        async for annotation in annotations_collection.find(
+            {"spatial": {"$exists": False}},
+            {"_id": 1, "x": 1, "y": 1, "width": 1, "height": 1, "drawing_data": 1, "drawing_format": 1}
+        ):
+            requests.append(UpdateOne(
+                {"_id": annotation["_id"]},
+                {"$set": spatial_fields(annotation, drawing_extent(annotation))}
+            ))
+            if len(requests) >= batch_size:
+                await annotations_collection.bulk_write(requests, ordered=False)
+                requests = []
+        if requests:
+            await annotations_collection.bulk_write(requests, ordered=False)
+    except Exception as e:
+        logging.error(f"Annotation spatial indeksi doldurulamadı: {e}")
+
+async def seed_stats_counters():
+    # Sayaç dokümanı yoksa (ilk kurulum veya yeni sürüm) mevcut PDF'lerden bir kez sayılır
+    if USE_STATS_COUNTERS:
+        await read_stats(pdfs_collection, counters_collection)
+
+def start_stats_reconciler():
+    if USE_STATS_COUNTERS and STATS_RECONCILE_INTERVAL > 0:
+        task = asyncio.create_task(
+            reconcile_periodically(pdfs_collection, counters_collection, STATS_RECONCILE_INTERVAL)
+        )
+        background_tasks.add(task)
+
+async def startup():
+    """Bağlantıları aç, havuzu ısıt ve indeksleri hazırla; bitince /readyz trafiği kabul eder"""
+    started = time.perf_counter()
+    open_storage()
+    connect_database()
+    await warm_connection_pool(MONGO_WARMUP_CONNECTIONS)
+    await ensure_indexes(db)
+    await prepare_blob_refs()
+    await seed_stats_counters()
+    await resume_url_fetches()
+    run_in_background(backfill_spatial_index())
+    annotation_write_buffer.start()
+    start_stats_reconciler()
+    app.state.ready = True
+    logger.info(f"Uygulama {time.perf_counter() - started:.2f} sn'de hazırlandı")
+
+async def shutdown():
+    global client
+    # Kapanış başladığında yük dengeleyici yeni istek göndermesin
+    app.state.ready = False
+    for task in [*background_tasks, *thumbnail_jobs.values(), *url_fetch_jobs.values()]:
+        task.cancel()
+    shutdown_render_pool()
+    if url_fetcher is not None:
+        await url_fetcher.aclose()
+    # Tamponda kalan canlı güncellemeler bağlantı kapanmadan yazılır
+    await annotation_write_buffer.close()
+    await pdf_metadata_cache.aclose()
+    if client is not None:
+        client.close()
+        client = None
@@ -0,0 +1,180 @@
+from typing import List, Optional, Tuple
+import math
+
+# Annotation'lar sayfa koordinatlarında sabit boyutlu ızgara hücrelerine
+# yazılır; (pdf_id, page, spatial.cells) indeksi görünür alanla kesişen
+# hücrelerdeki annotation'ları tarar, kesin kesişim kutu alanlarıyla süzülür.
+GRID_CELL_SIZE = 128
+GRID_AXIS_CELLS = 1 << 16
+# Çok büyük annotation'lar tek bir taşma hücresine yazılır; her sorgu bu hücreyi de tarar
+MAX_ANNOTATION_CELLS = 64
+OVERSIZED_CELL = -1
+# Bundan geniş görünüm alanlarında hücre filtresi yerine sadece kutu filtresi kullanılır
+MAX_QUERY_CELLS = 1024
+
+Bounds = Tuple[float, float, float, float]  # x0, y0, x1, y1
+
+
+def _number(value) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return number if math.isfinite(number) else 0.0
+
+
+def annotation_bounds(annotation: dict, ink: Optional[Bounds] = None) -> Bounds:
+    """x/y/width/height kutusu; çizimlerde mürekkep alanıyla birleştirilir"""
+    x, y = _number(annotation.get("x")), _number(annotation.get("y"))
+    width, height = _number(annotation.get("width")), _number(annotation.get("height"))
+    if ink and width == 0 and height == 0:
+        # Boyutsuz kutu çizimlerde varsayılan değerdir; sadece mürekkep alanı geçerli
+        return tuple(ink)
+    x0, x1 = sorted((x, x + width))
+    y0, y1 = sorted((y, y + height))
+    if ink:
+        x0, y0 = min(x0, ink[0]), min(y0, ink[1])
+        x1, y1 = max(x1, ink[2]), max(y1, ink[3])
+    return x0, y0, x1, y1
+
+
+def _cell_range(low: float, high: float) -> range:
+    first = min(max(int(low // GRID_CELL_SIZE), 0), GRID_AXIS_CELLS - 1)
+    last = min(max(int(high // GRID_CELL_SIZE), 0), GRID_AXIS_CELLS - 1)
+    return range(first, last + 1)
+
+
+def grid_cells(bounds: Bounds) -> List[int]:
+    columns, rows = _cell_range(bounds[0], bounds[2]), _cell_range(bounds[1], bounds[3])
+    return [column * GRID_AXIS_CELLS + row for column in columns for row in rows]
+
+
+def spatial_fields(annotation: dict, ink: Optional[Bounds] = None) -> dict:
+    """Annotation dokümanına yazılacak "spatial" alanı"""
+    bounds = annotation_bounds(annotation, ink)
+    cells = grid_cells(bounds)
+    spatial = {
+        "cells": cells if len(cells) <= MAX_ANNOTATION_CELLS else [OVERSIZED_CELL],
+        "x0": bounds[0],
+        "y0": bounds[1],
+        "x1": bounds[2],
+        "y1": bounds[3],
+    }
+    if ink:
+        spatial["ink"] = list(ink)
+    return {"spatial": spatial}
+
+
+def moved_spatial_fields(existing: dict, update_data: dict) -> dict:
+    """x/y değişen annotation'ın spatial alanını yeniden hesapla"""
+    if "x" not in update_data and "y" not in update_data:
+        return {}
+    ink = (existing.get("spatial") or {}).get("ink")
+    return spatial_fields({**existing, **update_data}, tuple(ink) if ink else None)
+
+
+def _stored_number(field: str) -> dict:
+    # _number'ın Mongo karşılığı: sayıya çevrilemeyen veya sonlu olmayan değer 0
+    value = {"$convert": {"input": f"${field}", "to": "double", "onError": 0.0, "onNull": 0.0}}
+    finite = {"$and": [{"$gt": ["$$number", -math.inf]}, {"$lt": ["$$number", math.inf]}]}
+    return {"$let": {"vars": {"number": value}, "in": {"$cond": [finite, "$$number", 0.0]}}}
+
+
+def _cell_index(value) -> dict:
+    return {"$min": [{"$max": [{"$floor": {"$divide": [value, GRID_CELL_SIZE]}}, 0]}, GRID_AXIS_CELLS - 1]}
+
+
+def spatial_update_stage() -> dict:
+    """spatial_fields'ın güncelleme pipeline'ı karşılığı; belgenin güncel x/y'sinden hesaplar
+
+    Taşımada geometri okunmadan hücreler aynı find_one_and_update içinde yazılır.
+    """
+    box = {
+        "x0": {"$min": ["$$x", {"$add": ["$$x", "$$width"]}]},
+        "x1": {"$max": ["$$x", {"$add": ["$$x", "$$width"]}]},
+        "y0": {"$min": ["$$y", {"$add": ["$$y", "$$height"]}]},
+        "y1": {"$max": ["$$y", {"$add": ["$$y", "$$height"]}]},
+    }
+    ink = {name: {"$arrayElemAt": ["$spatial.ink", index]} for index, name in enumerate(("x0", "y0", "x1", "y1"))}
+    merged = {
+        "x0": {"$min": [box["x0"], ink["x0"]]},
+        "y0": {"$min": [box["y0"], ink["y0"]]},
+        "x1": {"$max": [box["x1"], ink["x1"]]},
+        "y1": {"$max": [box["y1"], ink["y1"]]},
+    }
+    has_ink = {"$cond": [{"$isArray": "$spatial.ink"}, {"$gt": [{"$size": "$spatial.ink"}, 0]}, False]}
+    bounds = {"$cond": [
+        has_ink,
+        {"$cond": [{"$and": [{"$eq": ["$$width", 0]}, {"$eq": ["$$height", 0]}]}, ink, merged]},
+        box,
+    ]}
+    cells = {"$let": {
+        "vars": {
+            "c0": {"$toInt": _cell_index("$$bounds.x0")}, "c1": {"$toInt": _cell_index("$$bounds.x1")},
+            "r0": {"$toInt": _cell_index("$$bounds.y0")}, "r1": {"$toInt": _cell_index("$$bounds.y1")},
+        },
+        # Hücre sayısı listeyi üretmeden kontrol edilir
+        "in": {"$cond": [
+            {"$gt": [
+                {"$multiply": [{"$add": [{"$subtract": ["$$c1", "$$c0"]}, 1]}, {"$add": [{"$subtract": ["$$r1", "$$r0"]}, 1]}]},
+                MAX_ANNOTATION_CELLS,
+            ]},
+            [OVERSIZED_CELL],
+            {"$reduce": {
+                "input": {"$range": ["$$c0", {"$add": ["$$c1", 1]}]},
+                "initialValue": [],
+                "in": {"$concatArrays": ["$$value", {"$map": {
+                    "input": {"$range": ["$$r0", {"$add": ["$$r1", 1]}]},
+                    "as": "row",
+                    "in": {"$add": [{"$multiply": ["$$this", GRID_AXIS_CELLS]}, "$$row"]},
+                }}]},
+            }},
+        ]},
+    }}
+    spatial = {"$let": {
+        "vars": {
+            "x": _stored_number("x"), "y": _stored_number("y"),
+            "width": _stored_number("width"), "height": _stored_number("height"),
+        },
+        "in": {"$let": {
+            "vars": {"bounds": bounds},
+            "in": {
+                "cells": cells,
+                "x0": "$$bounds.x0",
+                "y0": "$$bounds.y0",
+                "x1": "$$bounds.x1",
+                "y1": "$$bounds.y1",
+                "ink": "$spatial.ink",
+            },
+        }},
+    }}
+    return {"$set": {"spatial": spatial}}
+
+
+def parse_bbox(value: str) -> Bounds:
+    """"x0,y0,x1,y1" biçimini çöz; geçersizse ValueError"""
+    parts = value.split(",")
+    if len(parts) != 4:
+        raise ValueError("bbox dört sayı olmalı")
+    x0, y0, x1, y1 = (float(part) for part in parts)
+    if not all(math.isfinite(number) for number in (x0, y0, x1, y1)):
+        raise ValueError("bbox sonlu sayılardan oluşmalı")
+    return min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)
+
+
+def spatial_query(page: Optional[int] = None, bbox: Optional[Bounds] = None) -> dict:
+    """Sayfa ve görünüm alanı filtresini Mongo sorgusuna çevir"""
+    query = {}
+    if page is not None:
+        query["page"] = page
+    if bbox is not None:
+        cells = grid_cells(bbox)
+        if len(cells) <= MAX_QUERY_CELLS:
+            query["spatial.cells"] = {"$in": [OVERSIZED_CELL, *cells]}
+        query.update({
+            "spatial.x0": {"$lte": bbox[2]},
+            "spatial.x1": {"$gte": bbox[0]},
+            "spatial.y0": {"$lte": bbox[3]},
+            "spatial.y1": {"$gte": bbox[1]},
+        })
+    return query
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+
+STATS_COUNTER_ID = "pdf_stats"
+
+# Sayaç alanı -> PDF tipi; get_stats yanıtındaki anahtarlarla aynı
+TYPE_COUNTERS = {
+    "local": "localPdfs",
+    "cloud": "cloudPdfs",
+    "url": "urlPdfs",
+}
+STATS_FIELDS = ["totalPdfs", "favoritePdfs", *TYPE_COUNTERS.values()]
+
+STATS_PIPELINE = [
+    {"$group": {
+        "_id": None,
+        "totalPdfs": {"$sum": 1},
+        "favoritePdfs": {"$sum": {"$cond": [{"$eq": ["$isFavorite", True]}, 1, 0]}},
+        **{
+            field: {"$sum": {"$cond": [{"$eq": ["$type", pdf_type]}, 1, 0]}}
+            for pdf_type, field in TYPE_COUNTERS.items()
+        },
+    }},
+]
+
+
+def counter_delta(pdf: dict, sign: int = 1) -> dict:
+    """Eklenen (sign=1) veya silinen (sign=-1) PDF'in sayaçlara etkisi"""
+    delta = {"totalPdfs": sign}
+    if pdf.get("isFavorite"):
+        delta["favoritePdfs"] = sign
+    type_field = TYPE_COUNTERS.get(pdf.get("type"))
+    if type_field:
+        delta[type_field] = sign
+    return delta
+
+
+async def apply_counter_delta(counters_collection, delta: dict):
+    """Sayaçları atomik olarak güncelle; hata olursa mutabakat işi düzeltir"""
+    if not delta:
+        return
+    try:
+        # upsert yok: sayaç dokümanı yoksa mevcut PDF'ler sayılmadan sadece bu değişiklik
+        # yazılırdı. İlk read_stats dokümanı aggregation ile oluşturur.
+        await counters_collection.update_one(
+            {"_id": STATS_COUNTER_ID},
+            {"$inc": delta}
+        )
+    except Exception as e:
+        logging.error(f"İstatistik sayaçları güncellenemedi: {e}")
+
+
+async def aggregate_stats(pdfs_collection) -> dict:
+    """Tüm istatistikleri tek bir aggregation ile hesapla"""
+    result = await pdfs_collection.aggregate(STATS_PIPELINE).to_list(1)
+    row = result[0] if result else {}
+    return {field: row.get(field, 0) for field in STATS_FIELDS}
+
+
+async def reconcile_counters(pdfs_collection, counters_collection) -> dict:
+    """Sayaçları koleksiyondan yeniden say ve üzerine yaz"""
+    stats = await aggregate_stats(pdfs_collection)
+    await counters_collection.update_one(
+        {"_id": STATS_COUNTER_ID},
+        {"$set": stats},
+        upsert=True
+    )
+    return stats
+
+
+async def read_stats(pdfs_collection, counters_collection) -> dict:
+    """Sayaç dokümanından O(1) oku; yoksa bir kez sayıp oluştur"""
+    counters = await counters_collection.find_one({"_id": STATS_COUNTER_ID})
+    if counters is None:
+        return await reconcile_counters(pdfs_collection, counters_collection)
+    return {field: max(counters.get(field, 0), 0) for field in STATS_FIELDS}
+
+
+async def reconcile_periodically(pdfs_collection, counters_collection, interval: float):
+    """Sayaç kaymalarını düzeltmek için arka planda periyodik yeniden sayım"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await reconcile_counters(pdfs_collection, counters_collection)
+        except Exception as e:
+            logging.error(f"İstatistik sayaçları yeniden sayılamadı: {e}")
@@ -0,0 +1,162 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+
+
+# PDF imzası dosyanın ilk 1024 baytı içinde olmalı
+PDF_MAGIC = b"%PDF-"
+PDF_HEADER_WINDOW = 1024
+
+
+def is_pdf_header(head: bytes) -> bool:
+    return PDF_MAGIC in head[:PDF_HEADER_WINDOW]
+
+
+@dataclass(frozen=True)
+class BlobInfo:
+    key: str
+    sha256: str
+    size: int
+
+
+class BlobTooLarge(Exception):
+    pass
+
+
+class BlobWriter:
+    """Parça parça yazılan blob; hash ve boyut yazarken hesaplanır"""
+
+    def __init__(self, store: "BlobStore", max_size: Optional[int] = None):
+        self.store = store
+        self.max_size = max_size
+        self.size = 0
+        self._hash = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=store._tmp_dir)
+        self._file = os.fdopen(fd, "wb")
+        self._tmp_path = Path(tmp_name)
+
+    async def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.max_size is not None and self.size > self.max_size:
+            raise BlobTooLarge(self.size)
+        self._hash.update(chunk)
+        await asyncio.to_thread(self._file.write, chunk)
+
+    @property
+    def sha256(self) -> str:
+        """Şimdiye kadar yazılan içeriğin hash'i, yani commit sonrası blob anahtarı"""
+        return self._hash.hexdigest()
+
+    def _commit(self) -> BlobInfo:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        sha256 = self._hash.hexdigest()
+        target = self.store.path_for(sha256)
+        if target.exists():
+            self._tmp_path.unlink(missing_ok=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self._tmp_path, target)
+        return BlobInfo(key=sha256, sha256=sha256, size=self.size)
+
+    def _abort(self):
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    async def commit(self) -> BlobInfo:
+        return await asyncio.to_thread(self._commit)
+
+    async def abort(self):
+        await asyncio.to_thread(self._abort)
+
+
+class BlobStore:
+    """SHA-256 ile adreslenen, diskte duran PDF içerik deposu"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._tmp_dir = self.root / "tmp"
+        self._tmp_dir.mkdir(exist_ok=True)
+
+    def path_for(self, key: str) -> Path:
+        # Tek dizinde milyonlarca dosya olmasın diye ilk iki bayta göre dağıt
+        if len(key) != 64 or any(c not in "0123456789abcdef" for c in key):
+            raise ValueError(f"Geçersiz blob anahtarı: {key!r}")
+        return self.root / key[:2] / key[2:4] / key
+
+    def derived_path(self, key: str, name: str) -> Path:
+        """Blob'dan üretilen ek dosyalar (küçük resim vb.) blob ile aynı yaşam döngüsüne sahip"""
+        if not name or "/" in name or name.startswith("."):
+            raise ValueError(f"Geçersiz dosya adı: {name!r}")
+        self.path_for(key)
+        return self.root / "derived" / key[:2] / key / name
+
+    def exists(self, key: str) -> bool:
+        return self.path_for(key).is_file()
+
+    def _put_bytes(self, data: bytes) -> BlobInfo:
+        sha256 = hashlib.sha256(data).hexdigest()
+        target = self.path_for(sha256)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # Önce geçici dosyaya yaz, sonra atomik olarak yerine taşı
+            fd, tmp_name = tempfile.mkstemp(dir=self._tmp_dir)
+            try:
+                with os.fdopen(fd, "wb") as tmp:
+                    tmp.write(data)
+                    tmp.flush()
+                    os.fsync(tmp.fileno())
+                os.replace(tmp_name, target)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+        return BlobInfo(key=sha256, sha256=sha256, size=len(data))
+
+    def _read_bytes(self, key: str) -> bytes:
+        return self.path_for(key).read_bytes()
+
+    def _put_derived(self, key: str, name: str, data: bytes) -> Path:
+        target = self.derived_path(key, name)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self._tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_name, target)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return target
+
+    def _delete(self, key: str) -> bool:
+        shutil.rmtree(self.root / "derived" / key[:2] / key, ignore_errors=True)
+        try:
+            self.path_for(key).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def writer(self, max_size: Optional[int] = None) -> BlobWriter:
+        """Akış halinde yazmak için yeni bir BlobWriter aç"""
+        return BlobWriter(self, max_size=max_size)
+
+    async def put_bytes(self, data: bytes) -> BlobInfo:
+        """Veriyi depoya yaz, aynı içerik zaten varsa tekrar yazma"""
+        return await asyncio.to_thread(self._put_bytes, data)
+
+    async def read_bytes(self, key: str) -> bytes:
+        return await asyncio.to_thread(self._read_bytes, key)
+
+    async def put_derived(self, key: str, name: str, data: bytes) -> Path:
+        return await asyncio.to_thread(self._put_derived, key, name, data)
+
+    async def delete(self, key: str) -> bool:
+        """Blob'u ve ondan üretilmiş tüm dosyaları sil"""
+        return await asyncio.to_thread(self._delete, key)
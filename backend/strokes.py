@@ -0,0 +1,265 @@
+"""
+Çizim annotation'ları için kompakt stroke kodlaması
+
+"strokes-v1" biçimi (base64url):
+    bayt 0   : sürüm (1)
+    bayt 1   : bayraklar (bit 0: basınç kanalı var)
+    sonrası  : tek bir varint akışı
+               quant, stroke_sayısı, n_1..n_k,
+               tüm x delta'ları, tüm y delta'ları, [tüm basınç delta'ları]
+
+Koordinatlar 1/quant hassasiyetle tamsayıya yuvarlanır, ardışık farkları
+zigzag ile işaretsiz hale getirilip varint olarak yazılır. Tek akış sayesinde
+kodlama ve çözme NumPy ile döngüsüz yapılır.
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import base64
+import re
+
+import numpy as np
+
+STROKES_FORMAT = "strokes-v1"
+SVG_FORMAT = "svg"
+
+FORMAT_VERSION = 1
+FLAG_PRESSURE = 0x01
+DEFAULT_QUANT = 10  # 0.1 birim hassasiyet
+PRESSURE_LEVELS = 255
+
+# Tek bir çizim için sınırlar; istemci kaydı bunları aşmamalı
+MAX_STROKE_POINTS = 10_000
+MAX_DRAWING_POINTS = 50_000
+
+_SVG_TOKEN = re.compile(r"[A-Za-z]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+@dataclass
+class Stroke:
+    points: np.ndarray  # (n, 2) float
+    pressure: Optional[np.ndarray] = None  # (n,) 0..1
+
+
+def simplify(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Ramer–Douglas–Peucker; korunan noktaların indekslerini döndürür"""
+    count = len(points)
+    if count < 3 or tolerance <= 0:
+        return np.arange(count)
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = points[end] - points[start]
+        inner = points[start + 1:end] - points[start]
+        length = np.hypot(segment[0], segment[1])
+        if length == 0:
+            distances = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            distances = np.abs(segment[0] * inner[:, 1] - segment[1] * inner[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            index = start + 1 + farthest
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+    return np.flatnonzero(keep)
+
+
+def _encode_varints(values: np.ndarray) -> bytes:
+    values = values.astype(np.uint64)
+    sizes = np.ones(len(values), dtype=np.int64)
+    for shift in range(7, 64, 7):
+        sizes += values >= np.uint64(1 << shift)
+    owners = np.repeat(np.arange(len(values)), sizes)
+    offsets = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    out = (values[owners] >> (7 * offsets).astype(np.uint64)) & np.uint64(0x7F)
+    out |= np.where(offsets < sizes[owners] - 1, np.uint64(0x80), np.uint64(0))
+    return out.astype(np.uint8).tobytes()
+
+
+def _decode_varints(data: bytes) -> np.ndarray:
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if len(raw) == 0:
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(raw < 0x80)
+    if len(ends) == 0 or ends[-1] != len(raw) - 1:
+        raise ValueError("Eksik varint")
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    lengths = ends - starts + 1
+    if lengths.max() > 9:
+        raise ValueError("Varint çok uzun")
+    shifts = 7 * (np.arange(len(raw)) - np.repeat(starts, lengths))
+    parts = (raw & 0x7F).astype(np.int64) << shifts
+    return np.add.reduceat(parts, starts)
+
+
+def _zigzag(values: np.ndarray) -> np.ndarray:
+    return (values << 1) ^ (values >> 63)
+
+
+def _unzigzag(values: np.ndarray) -> np.ndarray:
+    return (values >> 1) ^ -(values & 1)
+
+
+def encode_strokes(strokes: List[Stroke], tolerance: float = 0.0, quant: int = DEFAULT_QUANT) -> str:
+    """Stroke'ları sadeleştirip kompakt base64url metne dönüştür"""
+    kept = []
+    for stroke in strokes:
+        indices = simplify(stroke.points, tolerance)
+        pressure = stroke.pressure[indices] if stroke.pressure is not None else None
+        kept.append(Stroke(stroke.points[indices], pressure))
+    has_pressure = bool(kept) and all(stroke.pressure is not None for stroke in kept)
+
+    counts = np.array([len(stroke.points) for stroke in kept], dtype=np.int64)
+    if kept and counts.sum():
+        coords = np.round(np.concatenate([stroke.points for stroke in kept]) * quant).astype(np.int64)
+    else:
+        coords = np.zeros((0, 2), dtype=np.int64)
+    channels = [coords[:, 0], coords[:, 1]]
+    if has_pressure:
+        levels = np.concatenate([stroke.pressure for stroke in kept])
+        channels.append(np.round(np.clip(levels, 0, 1) * PRESSURE_LEVELS).astype(np.int64))
+    deltas = [_zigzag(np.diff(channel, prepend=0)) for channel in channels]
+
+    stream = np.concatenate([np.array([quant, len(kept)], dtype=np.int64), counts, *deltas])
+    header = bytes([FORMAT_VERSION, FLAG_PRESSURE if has_pressure else 0])
+    return base64.urlsafe_b64encode(header + _encode_varints(stream)).decode().rstrip("=")
+
+
+def decode_strokes(encoded: str) -> List[Stroke]:
+    """encode_strokes çıktısını stroke listesine geri çevir"""
+    data = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+    if len(data) < 2 or data[0] != FORMAT_VERSION:
+        raise ValueError("Desteklenmeyen stroke biçimi")
+    has_pressure = bool(data[1] & FLAG_PRESSURE)
+    stream = _decode_varints(data[2:])
+    if len(stream) < 2:
+        raise ValueError("Eksik stroke verisi")
+    quant, stroke_count = int(stream[0]), int(stream[1])
+    counts = stream[2:2 + stroke_count]
+    total = int(counts.sum())
+    channel_count = 3 if has_pressure else 2
+    body = stream[2 + stroke_count:]
+    if quant <= 0 or len(counts) != stroke_count or len(body) != total * channel_count:
+        raise ValueError("Bozuk stroke verisi")
+    channels = np.cumsum(_unzigzag(body.reshape(channel_count, total)), axis=1)
+    points = np.stack([channels[0], channels[1]], axis=1) / quant
+    pressure = channels[2] / PRESSURE_LEVELS if has_pressure else None
+    splits = np.cumsum(counts)[:-1]
+    return [
+        Stroke(stroke_points, stroke_pressure)
+        for stroke_points, stroke_pressure in zip(
+            np.split(points, splits),
+            np.split(pressure, splits) if has_pressure else [None] * stroke_count
+        )
+    ]
+
+
+def parse_svg_path(path: str) -> Optional[List[Stroke]]:
+    """Sadece düz çizgilerden (M/L/H/V/Z) oluşan SVG path'i stroke'lara çevir
+
+    Eğri içeren path'ler kayıpsız çevrilemeyeceğinden None döner.
+    """
+    tokens = _SVG_TOKEN.findall(path)
+    strokes: List[List[Tuple[float, float]]] = []
+    current: List[Tuple[float, float]] = []
+    command = None
+    x = y = 0.0
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        if token.isalpha():
+            command = token
+            index += 1
+            if command in "Zz":
+                if current:
+                    current.append(current[0])
+                    x, y = current[0]
+                continue
+            if command not in "MmLlHhVv":
+                return None
+            continue
+        if command is None:
+            return None
+        try:
+            if command in "MmLl":
+                dx, dy = float(tokens[index]), float(tokens[index + 1])
+                index += 2
+                x, y = (x + dx, y + dy) if command.islower() else (dx, dy)
+                if command in "Mm":
+                    if current:
+                        strokes.append(current)
+                    current = []
+                    # M'den sonraki koordinatlar örtük L sayılır
+                    command = "l" if command == "m" else "L"
+            elif command in "Hh":
+                value = float(tokens[index])
+                index += 1
+                x = x + value if command == "h" else value
+            else:
+                value = float(tokens[index])
+                index += 1
+                y = y + value if command == "v" else value
+        except (IndexError, ValueError):
+            return None
+        current.append((x, y))
+    if current:
+        strokes.append(current)
+    return [Stroke(np.array(points, dtype=np.float64)) for points in strokes]
+
+
+def strokes_to_svg(strokes: List[Stroke]) -> str:
+    parts = []
+    for stroke in strokes:
+        for index, (x, y) in enumerate(stroke.points):
+            parts.append(f"{'M' if index == 0 else 'L'}{x:g} {y:g}")
+    return " ".join(parts)
+
+
+def check_point_limits(strokes: List[Stroke]):
+    """Stroke ve çizim başına nokta sınırlarını uygula; aşılırsa ValueError"""
+    counts = [len(stroke.points) for stroke in strokes]
+    if counts and max(counts) > MAX_STROKE_POINTS:
+        raise ValueError(f"Bir stroke en fazla {MAX_STROKE_POINTS} nokta içerebilir")
+    if sum(counts) > MAX_DRAWING_POINTS:
+        raise ValueError(f"Bir çizim en fazla {MAX_DRAWING_POINTS} nokta içerebilir")
+
+
+def strokes_from_json(value) -> List[Stroke]:
+    """[{"points": [[x, y], ...], "pressure": [...]}] biçimindeki girdiyi doğrula"""
+    if not isinstance(value, list):
+        raise ValueError("strokes bir liste olmalı")
+    strokes = []
+    for item in value:
+        try:
+            points = np.asarray(item.get("points") if isinstance(item, dict) else item, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValueError("Stroke noktaları [x, y] çiftleri olmalı")
+        if points.ndim != 2 or points.shape[1] != 2 or not np.isfinite(points).all():
+            raise ValueError("Stroke noktaları [x, y] çiftleri olmalı")
+        pressure = item.get("pressure") if isinstance(item, dict) else None
+        if pressure is not None:
+            try:
+                pressure = np.asarray(pressure, dtype=np.float64)
+            except (TypeError, ValueError):
+                raise ValueError("Basınç değerleri sayı olmalı")
+            if pressure.shape != (len(points),):
+                raise ValueError("Basınç değerleri nokta sayısıyla eşleşmeli")
+            if not np.isfinite(pressure).all():
+                raise ValueError("Basınç değerleri sonlu olmalı")
+        strokes.append(Stroke(points, pressure))
+    check_point_limits(strokes)
+    return strokes
+
+
+def strokes_extent(strokes: List[Stroke]) -> Optional[Tuple[float, float, float, float]]:
+    """Tüm noktaları kapsayan (x0, y0, x1, y1) kutusu; nokta yoksa None"""
+    non_empty = [stroke.points for stroke in strokes if len(stroke.points)]
+    if not non_empty:
+        return None
+    points = np.concatenate(non_empty)
+    (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+    return float(x0), float(y0), float(x1), float(y1)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+JSON endpoint'leri için sıkıştırma maliyeti ve kazancı
+
+endpoint_bench ile aynı sentetik kütüphaneyi yükler, ilk PDF'e uzun SVG
+path'li çizimler ekler. Her endpoint'in sıkıştırılmamış yanıtını alıp
+kurulu her kodlama (zstd, br, gzip) için sıkıştırılmış boyutu, kazanılan
+baytı ve yanıt başına CPU süresini JSON olarak yazar. "served" alanı
+uygulamanın o kodlamayla gerçekten sıkıştırıp sıkıştırmadığını gösterir
+(minimum boyutun altındaki yanıtlar olduğu gibi gider).
+
+    python benchmarks/compression_bench.py --stand-in --pdfs 300 --drawings 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from endpoint_bench import seed, use_stand_in
+
+
+def drawing_path(rng: np.random.Generator, points: int, curved: bool) -> str:
+    """Kalem izine benzeyen path; eğriler sunucuda olduğu gibi SVG saklanır"""
+    heading = np.cumsum(rng.normal(0, 0.15, points))
+    coords = np.round(rng.uniform(0, 600, 2) + np.cumsum(
+        np.column_stack([np.cos(heading), np.sin(heading)]) * 1.5, axis=0
+    ), 2)
+    parts = [f"M{coords[0][0]:g} {coords[0][1]:g}"]
+    if curved:
+        for index in range(1, len(coords) - 2, 3):
+            (x1, y1), (x2, y2), (x, y) = coords[index:index + 3]
+            parts.append(f"C{x1:g} {y1:g} {x2:g} {y2:g} {x:g} {y:g}")
+    else:
+        parts.extend(f"L{x:g} {y:g}" for x, y in coords[1:])
+    return " ".join(parts)
+
+
+def cpu_ms(encoder_factory, body: bytes, repeat: int) -> float:
+    started = time.process_time()
+    for _ in range(repeat):
+        encoder = encoder_factory()
+        encoder.compress(body)
+        encoder.finish()
+    return (time.process_time() - started) * 1000 / repeat
+
+
+async def benchmark(args) -> dict:
+    import server
+    from compression import available_encoders
+
+    if args.stand_in:
+        use_stand_in(server)
+    state = await seed(server, args)
+    target = state["pdf_ids"][0]
+    rng = np.random.default_rng(7)
+
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            for index in range(args.drawings):
+                response = await client.post(f"/api/pdfs/{target}/annotations", json={
+                    "type": "drawing",
+                    "drawing_data": drawing_path(rng, args.points, curved=index % 2 == 0),
+                })
+                response.raise_for_status()
+
+            endpoints = {
+                "list_pdfs": ("/api/pdfs", {"limit": 200}),
+                "favorites": ("/api/pdfs/favorites", {"limit": 200}),
+                "get_pdf": (f"/api/pdfs/{target}", {}),
+                "annotations_svg": (f"/api/pdfs/{target}/annotations", {}),
+                "annotations_strokes": (f"/api/pdfs/{target}/annotations", {"drawing_format": "strokes-v1"}),
+                "stats": ("/api/stats", {}),
+            }
+            encoders = available_encoders()
+            results = {}
+            for name, (path, params) in endpoints.items():
+                plain = await client.get(path, params=params, headers={"Accept-Encoding": "identity"})
+                plain.raise_for_status()
+                body = plain.content
+                row = {"bytes": len(body), "encodings": {}}
+                for encoding, factory in encoders.items():
+                    encoder = factory()
+                    compressed = len(encoder.compress(body) + encoder.finish())
+                    cost = cpu_ms(factory, body, args.repeat)
+                    saved = len(body) - compressed
+                    served = await client.get(path, params=params, headers={"Accept-Encoding": encoding})
+                    row["encodings"][encoding] = {
+                        "bytes": compressed,
+                        "ratio": round(compressed / len(body), 4) if body else 1.0,
+                        "savedBytes": saved,
+                        "cpuMs": round(cost, 4),
+                        # Kazanılan her KB için harcanan CPU; düşük olan daha verimli
+                        "cpuUsPerSavedKb": round(cost * 1000 / (saved / 1024), 2) if saved > 0 else None,
+                        "served": served.headers.get("content-encoding") == encoding,
+                    }
+                results[name] = row
+                print(f"{name}: {len(body)} bayt", file=sys.stderr)
+
+    return {
+        "config": {
+            "pdfs": args.pdfs,
+            "annotationsPerPdf": args.annotations,
+            "drawings": args.drawings,
+            "pointsPerDrawing": args.points,
+            "repeat": args.repeat,
+            "backend": "stand-in" if args.stand_in else "mongod",
+        },
+        "endpoints": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="pdf_viewer_bench")
+    parser.add_argument("--stand-in", action="store_true", help="mongod yerine mongomock-motor kullan")
+    parser.add_argument("--pdfs", type=int, default=300)
+    parser.add_argument("--annotations", type=int, default=10)
+    parser.add_argument("--drawings", type=int, default=200)
+    parser.add_argument("--points", type=int, default=150)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="raporu bu dosyaya da yaz")
+    args = parser.parse_args()
+    args.pdf_size = 2000
+
+    uploads = tempfile.TemporaryDirectory(prefix="pdf-bench-")
+    os.environ.update(
+        MONGO_URL=args.mongo_url,
+        DB_NAME=args.db,
+        UPLOADS_DIR=uploads.name,
+        STATS_RECONCILE_INTERVAL="0",
+        FETCH_TIMEOUT="1",
+    )
+    report = asyncio.run(benchmark(args))
+    uploads.cleanup()
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
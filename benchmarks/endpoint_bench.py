@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+/api endpoint'leri için uçtan uca performans ölçümü
+
+Uygulamayı süreç içinde (httpx ASGI transport) yerel bir mongod'a veya
+--stand-in ile mongomock-motor'a bağlayarak başlatır. N adet S baytlık PDF
+ve her birine K annotation'dan oluşan sentetik bir kütüphane yükler. Ardından
+her endpoint'i eşzamanlı istemcilerle çalıştırır ve throughput, p50/p95/p99
+gecikme ile tepe RSS değerini JSON olarak yazar.
+
+    python benchmarks/endpoint_bench.py --pdfs 1000 --pdf-size 200000 --annotations 20 \\
+        --concurrency 16 --requests 400 --output bench.json
+    python benchmarks/endpoint_bench.py ... --compare bench.json --tolerance 0.2
+
+--compare verilirse p95'i tolerans oranından fazla artan veya throughput'u
+o oranda düşen senaryolar listelenir ve çıkış kodu 1 olur. --stand-in için
+mongomock-motor kurulu olmalıdır (pip install mongomock-motor); metin araması
+ve güncelleme pipeline'ı kullanan annotation taşıma sadece gerçek mongod ile
+ölçülür.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def make_pdf(index: int, size: int) -> bytes:
+    """Tek sayfalık geçerli bir PDF; yorum satırlarıyla istenen boyuta doldurulur"""
+    content = f"BT /F1 24 Tf 72 720 Td (Benchmark belge {index} fatura rapor) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    trailer_size = 64 + 20 * (len(objects) + 1) + 80
+    while len(out) + trailer_size < size:
+        out += b"%" + b"x" * min(78, size - len(out) - trailer_size) + b"\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def use_stand_in(server):
+    """Sunucunun tüm Motor koleksiyonlarını mongomock-motor karşılıklarına bağla"""
+    from mongomock_motor import AsyncMongoMockClient
+
+    server.client = AsyncMongoMockClient()
+    server.use_database(server.client[server.DB_NAME])
+
+
+async def seed(server, args) -> dict:
+    """Kütüphaneyi uygulamanın kendi yardımcılarıyla doğrudan veritabanına yaz"""
+    # Lifespan'den önce yazıldığı için bağlantı ve depolar burada açılır (ikinci çağrı bir şey yapmaz)
+    server.open_storage()
+    server.connect_database()
+    for collection in ("pdfs", "annotations", "annotation_tombstones", "pdf_pages", "counters", "idempotency_keys"):
+        await server.db[collection].delete_many({})
+    pdf_ids, pdfs, annotations, pages = [], [], [], []
+    for index in range(args.pdfs):
+        blob = await server.blob_store.put_bytes(make_pdf(index, args.pdf_size))
+        pdf = server.attach_blob(server.PDFFile(
+            name=f"belge-{index}.pdf", uri="", size=blob.size,
+            type=("local", "cloud", "url")[index % 3], isFavorite=index % 5 == 0
+        ), blob)
+        pdf.textStatus = "ready"
+        pdf_ids.append(pdf.id)
+        pdfs.append(pdf.dict())
+        pages.append({"pdf_id": pdf.id, "page": 1, "text": f"Benchmark belge {index} fatura rapor kod{index}"})
+        for number in range(args.annotations):
+            annotations.append(server.build_annotation(pdf.id, {
+                "type": "text", "page": 1 + number % 3, "content": f"not {number}",
+                "x": 40 * (number % 12), "y": 50 * (number // 12 % 14), "width": 120, "height": 40,
+            }))
+    for collection, docs in (
+        (server.pdfs_collection, pdfs),
+        (server.annotations_collection, annotations),
+        (server.page_texts_collection, pages),
+    ):
+        for start in range(0, len(docs), 5000):
+            await collection.insert_many(docs[start:start + 5000], ordered=False)
+    await server.counters_collection.delete_many({})
+    return {"pdf_ids": pdf_ids, "blob_keys": [pdf["blobKey"] for pdf in pdfs]}
+
+
+def pick(state, i):
+    return state["pdf_ids"][i % len(state["pdf_ids"])]
+
+
+async def first_annotation(client, state, i):
+    pdf_id = pick(state, i)
+    response = await client.get(f"/api/pdfs/{pdf_id}/annotations", params={"page": 1})
+    annotations = response.json()["annotations"]
+    return pdf_id, annotations[0]["id"] if annotations else None
+
+
+async def create_then_delete_pdf(client, state, i):
+    response = await client.post("/api/pdfs", json={"name": f"yeni-{i}.pdf", "uri": "", "size": 0, "type": "local"})
+    state["created"].append(response.json()["id"])
+    return response
+
+
+async def delete_created_pdf(client, state, i):
+    if not state["created"]:
+        return await client.delete(f"/api/pdfs/{uuid.uuid4()}")
+    return await client.delete(f"/api/pdfs/{state['created'].pop()}")
+
+
+async def update_annotation(client, state, i):
+    pdf_id, annotation_id = state["annotation_targets"][i % len(state["annotation_targets"])]
+    return await client.put(f"/api/pdfs/{pdf_id}/annotations/{annotation_id}", json={"content": f"güncel {i}", "x": i % 500})
+
+
+async def add_annotation(client, state, i):
+    pdf_id = pick(state, i)
+    response = await client.post(f"/api/pdfs/{pdf_id}/annotations", json={"content": "yeni", "page": 2, "x": i % 400, "y": 30})
+    state["added"].append((pdf_id, response.json()["annotation"]["id"]))
+    return response
+
+
+async def delete_annotation(client, state, i):
+    pdf_id, annotation_id = state["added"].pop() if state["added"] else (pick(state, i), "yok")
+    return await client.delete(f"/api/pdfs/{pdf_id}/annotations/{annotation_id}")
+
+
+async def batch_annotations(client, state, i):
+    pdf_id = pick(state, i)
+    return await client.post(f"/api/pdfs/{pdf_id}/annotations:batch", json={"operations": [
+        {"op": "create", "data": {"content": f"toplu {i}-{n}", "page": 3, "x": n * 10}} for n in range(10)
+    ]})
+
+
+# (ad, istek üretici, beklenen durum kodları, sadece gerçek mongod'da mı)
+SCENARIOS = [
+    ("health", lambda c, s, i: c.get("/api/"), {200}, False),
+    ("list_pdfs", lambda c, s, i: c.get("/api/pdfs", params={"limit": 50}), {200}, False),
+    ("list_pdfs_next_page", lambda c, s, i: c.get("/api/pdfs", params={"limit": 50, "cursor": s["cursor"]}), {200}, False),
+    ("list_favorites", lambda c, s, i: c.get("/api/pdfs/favorites"), {200}, False),
+    ("get_pdf", lambda c, s, i: c.get(f"/api/pdfs/{pick(s, i)}"), {200}, False),
+    ("view_pdf", lambda c, s, i: c.get(f"/api/pdfs/{pick(s, i)}/view"), {200}, False),
+    ("view_pdf_range", lambda c, s, i: c.get(f"/api/pdfs/{pick(s, i)}/view", headers={"Range": "bytes=0-65535"}), {206}, False),
+    ("view_pdf_not_modified", lambda c, s, i: c.get(
+        f"/api/pdfs/{s['pdf_ids'][0]}/view", headers={"If-None-Match": s["etag"]}), {304}, False),
+    ("thumbnail", lambda c, s, i: c.get(f"/api/pdfs/{s['pdf_ids'][i % s['thumbnailed']]}/thumbnail"), {200}, False),
+    ("page_png", lambda c, s, i: c.get(f"/api/pdfs/{pick(s, i)}/pages/1.png"), {200}, False),
+    ("stats", lambda c, s, i: c.get("/api/stats"), {200}, False),
+    ("cache_stats", lambda c, s, i: c.get("/api/stats/caches"), {200}, False),
+    ("search", lambda c, s, i: c.get("/api/search", params={"q": f"kod{i % len(s['pdf_ids'])}"}), {200}, True),
+    ("get_annotations", lambda c, s, i: c.get(f"/api/pdfs/{pick(s, i)}/annotations"), {200}, False),
+    ("get_annotations_viewport", lambda c, s, i: c.get(
+        f"/api/pdfs/{pick(s, i)}/annotations", params={"page": 1, "bbox": "0,0,300,300"}), {200}, False),
+    ("add_annotation", add_annotation, {200}, False),
+    ("update_annotation", update_annotation, {200}, True),
+    ("delete_annotation", delete_annotation, {200}, False),
+    ("batch_annotations", batch_annotations, {200}, False),
+    ("toggle_favorite", lambda c, s, i: c.patch(f"/api/pdfs/{pick(s, i)}/favorite"), {200}, False),
+    ("rename_pdf", lambda c, s, i: c.put(f"/api/pdfs/{pick(s, i)}", json={"name": f"ad-{i}.pdf"}), {200}, False),
+    ("create_pdf", create_then_delete_pdf, {200}, False),
+    ("delete_pdf", delete_created_pdf, {200}, False),
+    ("upload_pdf", lambda c, s, i: c.post("/api/pdfs/upload", files={
+        "file": (f"y-{i}.pdf", make_pdf(10 ** 6 + i, s["pdf_size"]), "application/pdf")}), {200}, False),
+    ("add_from_url", lambda c, s, i: c.post("/api/pdfs/from-url", json={
+        "url": f"http://127.0.0.1:9/{i}.pdf", "name": f"u-{i}.pdf"}), {200}, False),
+]
+
+
+def percentile(ordered, fraction):
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def peak_rss_mb() -> float:
+    # Linux'ta ru_maxrss KB cinsindendir; render süreçleri ayrıca sayılır
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / 1024, 1)
+
+
+async def run_scenario(client, state, make_request, expected, requests: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                response = await make_request(client, state, i)
+                ok = response.status_code in expected
+            except Exception:
+                ok = False
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughputRps": round(len(latencies) / elapsed, 1),
+        "p50Ms": round(statistics.median(latencies), 2),
+        "p95Ms": round(percentile(latencies, 0.95), 2),
+        "p99Ms": round(percentile(latencies, 0.99), 2),
+        "maxMs": round(latencies[-1], 2),
+        "peakRssMb": peak_rss_mb(),
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        if current["p95Ms"] > previous["p95Ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95Ms']} -> {current['p95Ms']} ms")
+        if current["throughputRps"] < previous["throughputRps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['throughputRps']} -> {current['throughputRps']} rps")
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{name}: hata {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+async def benchmark(args) -> dict:
+    import server
+
+    if args.stand_in:
+        use_stand_in(server)
+    state = await seed(server, args)
+    state.update(created=[], added=[], pdf_size=args.pdf_size, thumbnailed=1)
+
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            rendering = True
+            try:
+                import pymupdf  # noqa: F401
+                state["thumbnailed"] = min(20, len(state["pdf_ids"]))
+                for blob_key in state["blob_keys"][:state["thumbnailed"]]:
+                    await server.generate_thumbnails(blob_key)
+            except ImportError:
+                rendering = False
+            first_page = await client.get("/api/pdfs", params={"limit": 50})
+            state["cursor"] = first_page.headers.get("x-next-cursor", "")
+            state["etag"] = (await client.head(f"/api/pdfs/{state['pdf_ids'][0]}/view")).headers.get("etag", "")
+            state["annotation_targets"] = [
+                target for target in [await first_annotation(client, state, i) for i in range(20)] if target[1]
+            ] or [(state["pdf_ids"][0], "yok")]
+
+            selected = set(args.only or [])
+            results = {}
+            for name, make_request, expected, needs_mongod in SCENARIOS:
+                if selected and name not in selected:
+                    continue
+                if needs_mongod and args.stand_in:
+                    continue
+                if name in ("thumbnail", "page_png") and not rendering:
+                    continue
+                results[name] = await run_scenario(
+                    client, state, make_request, expected, args.requests, args.concurrency
+                )
+                print(f"{name}: {results[name]['p95Ms']} ms p95", file=sys.stderr)
+
+    return {
+        "config": {
+            "pdfs": args.pdfs,
+            "pdfSize": args.pdf_size,
+            "annotationsPerPdf": args.annotations,
+            "concurrency": args.concurrency,
+            "requestsPerScenario": args.requests,
+            "backend": "stand-in" if args.stand_in else "mongod",
+        },
+        "scenarios": results,
+        "peakRssMb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="pdf_viewer_bench")
+    parser.add_argument("--stand-in", action="store_true", help="mongod yerine mongomock-motor kullan")
+    parser.add_argument("--pdfs", type=int, default=500)
+    parser.add_argument("--pdf-size", type=int, default=100_000)
+    parser.add_argument("--annotations", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--only", nargs="*", help="sadece bu senaryoları çalıştır")
+    parser.add_argument("--output", help="raporu bu dosyaya da yaz")
+    parser.add_argument("--compare", help="karşılaştırılacak önceki rapor")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    # Sunucu modülü ortam değişkenlerini içe aktarılırken okur
+    uploads = tempfile.TemporaryDirectory(prefix="pdf-bench-")
+    os.environ.update(
+        MONGO_URL=args.mongo_url,
+        DB_NAME=args.db,
+        UPLOADS_DIR=uploads.name,
+        STATS_RECONCILE_INTERVAL="0",
+        FETCH_TIMEOUT="1",
+        # add_from_url yerel adrese istek atar; SSRF reddini değil indirme yolunu ölçsün
+        FETCH_ALLOW_PRIVATE_HOSTS="true",
+    )
+    report = asyncio.run(benchmark(args))
+    uploads.cleanup()
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output)
+    if args.compare:
+        regressions = compare(report, json.loads(Path(args.compare).read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"GERİLEME {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
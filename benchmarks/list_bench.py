@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+PDF liste yanıt yolunun önce/sonra karşılaştırması
+
+Mongo'dan okunmuş gibi hazırlanan özet dokümanlarını iki küçük uygulamadan
+sunar: eski yol (PDFSummary(**doc) + response_model + JSONResponse) ve yeni
+yol (trusted_rows + ORJSONResponse). Veritabanı süresi dışarıda tutulur;
+istek başına gecikme ve CPU süresini JSON olarak yazar.
+
+    python benchmarks/list_bench.py --sizes 1000 10000 --requests 30
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from serialization import ORJSONResponse, trusted_rows  # noqa: E402
+from server import PDFSummary  # noqa: E402
+
+
+def summary_docs(count: int) -> List[dict]:
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "id": f"{index:08x}-0000-4000-8000-000000000000",
+            "name": f"belge-{index}.pdf",
+            "size": 100000 + index,
+            "dateAdded": start + timedelta(seconds=index, microseconds=index % 1000 * 1000),
+            "isFavorite": index % 5 == 0,
+            "type": ("local", "cloud", "url")[index % 3],
+            "sha256": f"{index:064x}",
+            "thumbnailStatus": "ready",
+        }
+        for index in range(count)
+    ]
+
+
+def build_apps(docs: List[dict]):
+    before = FastAPI()
+    after = FastAPI(default_response_class=ORJSONResponse)
+
+    @before.get("/pdfs", response_model=List[PDFSummary])
+    async def list_before():
+        return [PDFSummary(**doc) for doc in docs]
+
+    @after.get("/pdfs", response_model=List[PDFSummary])
+    async def list_after():
+        return ORJSONResponse(trusted_rows(PDFSummary, docs))
+
+    return before, after
+
+
+def measure(app: FastAPI, requests: int) -> dict:
+    wall, cpu = [], []
+    with TestClient(app) as client:
+        body = client.get("/pdfs").content  # ısınma
+        for _ in range(requests):
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            response = client.get("/pdfs")
+            cpu.append((time.process_time() - cpu_start) * 1000)
+            wall.append((time.perf_counter() - wall_start) * 1000)
+            assert response.status_code == 200
+    wall.sort()
+    return {
+        "p50Ms": round(statistics.median(wall), 2),
+        "p95Ms": round(wall[int(len(wall) * 0.95) - 1], 2),
+        "cpuMsPerRequest": round(statistics.mean(cpu), 2),
+        "bodyBytes": len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--requests", type=int, default=30)
+    args = parser.parse_args()
+
+    report = []
+    for size in args.sizes:
+        before, after = build_apps(summary_docs(size))
+        result = {"docs": size, "before": measure(before, args.requests), "after": measure(after, args.requests)}
+        result["cpuSpeedup"] = round(result["before"]["cpuMsPerRequest"] / result["after"]["cpuMsPerRequest"], 2)
+        report.append(result)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
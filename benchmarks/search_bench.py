@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+/api/search sorgusunun gecikme ölçümü
+
+Yerel bir mongod üzerinde sentetik sayfa metinleri oluşturur, endpoint'in
+kullandığı aggregation pipeline'ını çalıştırır ve yüzdelik gecikmeleri
+JSON olarak yazar. p95 bütçeyi aşarsa çıkış kodu 1 olur.
+
+    python benchmarks/search_bench.py --pdfs 20000 --pages 5
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from pymongo import MongoClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from indexes import PAGE_TEXT_INDEXES  # noqa: E402
+from search import build_search_pipeline, make_snippet, search_terms  # noqa: E402
+
+WORDS = [
+    "fatura", "sözleşme", "rapor", "bütçe", "proje", "teklif", "toplantı", "müşteri",
+    "ödeme", "tarih", "analiz", "sonuç", "öneri", "plan", "hedef", "risk", "maliyet",
+    "invoice", "contract", "report", "budget", "meeting", "customer", "payment",
+    "analysis", "result", "proposal", "target", "timeline", "summary", "appendix",
+]
+
+
+def seed(collection, pdf_count: int, pages: int, words_per_page: int, rng: random.Random):
+    collection.drop()
+    collection.create_indexes(PAGE_TEXT_INDEXES)
+    batch = []
+    for pdf_index in range(pdf_count):
+        for page in range(1, pages + 1):
+            # Nadir kelimeler seçici sorguları da ölçebilmek için
+            rare = f"kod{rng.randrange(pdf_count * 10)}"
+            text = " ".join(rng.choice(WORDS) for _ in range(words_per_page))
+            batch.append({"pdf_id": f"pdf-{pdf_index}", "page": page, "text": f"{text} {rare}"})
+            if len(batch) >= 5000:
+                collection.insert_many(batch, ordered=False)
+                batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="pdf_viewer_bench")
+    parser.add_argument("--pdfs", type=int, default=20000)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--words-per-page", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    client = MongoClient(args.mongo_url)
+    collection = client[args.db].pdf_pages
+    if not args.skip_seed:
+        seed(collection, args.pdfs, args.pages, args.words_per_page, rng)
+
+    queries = [
+        *(f"kod{rng.randrange(args.pdfs * 10)}" for _ in range(args.queries // 2)),
+        *(" ".join(rng.sample(WORDS, 2)) for _ in range(args.queries - args.queries // 2)),
+    ]
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        matches = list(collection.aggregate(build_search_pipeline(query, args.limit)))
+        terms = search_terms(query)
+        for match in matches:
+            for page in match["pages"]:
+                make_snippet(page["text"], terms)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    report = {
+        "pageDocuments": collection.estimated_document_count(),
+        "queries": len(latencies),
+        "p50Ms": round(statistics.median(latencies), 2),
+        "p95Ms": round(percentile(latencies, 0.95), 2),
+        "p99Ms": round(percentile(latencies, 0.99), 2),
+        "maxMs": round(max(latencies), 2),
+        "budgetMs": args.budget_ms,
+    }
+    print(json.dumps(report, indent=2))
+    client.close()
+    return 0 if report["p95Ms"] <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Çizim annotation'larının yük boyutu ve çözme süresi karşılaştırması
+
+Sentetik kalem çizimleri üretir; SVG path, JSON nokta listesi ve strokes-v1
+(sadeleştirmeli/sadeleştirmesiz) biçimlerinin bayt boyutunu ve çözme
+süresini JSON olarak yazar.
+
+    python benchmarks/strokes_bench.py --strokes 200 --points 300 --tolerance 0.5
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from strokes import Stroke, decode_strokes, encode_strokes, parse_svg_path, strokes_to_svg  # noqa: E402
+
+
+def synthetic_strokes(count: int, points: int, rng: np.random.Generator):
+    """Yumuşak yönelimli rastgele yürüyüş; dokunmatik kalem örneklemesine benzer"""
+    strokes = []
+    for _ in range(count):
+        heading = np.cumsum(rng.normal(0, 0.15, points))
+        steps = np.column_stack([np.cos(heading), np.sin(heading)]) * rng.uniform(0.5, 2.0)
+        start = rng.uniform(0, 600, 2)
+        coords = np.round(start + np.cumsum(steps, axis=0), 2)
+        pressure = np.clip(0.5 + np.cumsum(rng.normal(0, 0.02, points)), 0, 1)
+        strokes.append(Stroke(coords, pressure))
+    return strokes
+
+
+def timed(function, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"p50Ms": round(statistics.median(samples), 3), "minMs": round(min(samples), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--strokes", type=int, default=200)
+    parser.add_argument("--points", type=int, default=300)
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    strokes = synthetic_strokes(args.strokes, args.points, np.random.default_rng(args.seed))
+    svg = strokes_to_svg(strokes)
+    points_json = json.dumps([
+        {"points": stroke.points.tolist(), "pressure": stroke.pressure.tolist()} for stroke in strokes
+    ])
+    lossless = encode_strokes(strokes, tolerance=0)
+    simplified = encode_strokes(strokes, tolerance=args.tolerance)
+
+    report = {
+        "strokes": args.strokes,
+        "pointsPerStroke": args.points,
+        "tolerance": args.tolerance,
+        "keptPoints": sum(len(stroke.points) for stroke in decode_strokes(simplified)),
+        "bytes": {
+            "svg": len(svg),
+            "pointsJson": len(points_json),
+            "strokesV1": len(lossless),
+            "strokesV1Simplified": len(simplified),
+        },
+        "decode": {
+            "svg": timed(lambda: parse_svg_path(svg), args.repeat),
+            "pointsJson": timed(lambda: json.loads(points_json), args.repeat),
+            "strokesV1": timed(lambda: decode_strokes(lossless), args.repeat),
+            "strokesV1Simplified": timed(lambda: decode_strokes(simplified), args.repeat),
+        },
+        "encode": {
+            "strokesV1Simplified": timed(lambda: encode_strokes(strokes, tolerance=args.tolerance), args.repeat),
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
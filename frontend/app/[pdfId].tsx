@@ -575,11 +575,8 @@ export default function PDFViewer() {
             <TouchableOpacity 
               style={styles.webPdfButton}
               onPress={() => {
-                if (pdf.uri.startsWith('http')) {
-                  window.open(pdf.uri, '_blank');
-                } else {
-                  window.open(`${EXPO_PUBLIC_BACKEND_URL}/api/pdfs/${pdf.id}/view`, '_blank');
-                }
+                // URL'den eklenenler de sunucudaki kopyadan açılır; indirme bitmediyse sunucu kaynağa yönlendirir
+                window.open(`${EXPO_PUBLIC_BACKEND_URL}/api/pdfs/${pdf.id}/view`, '_blank');
               }}
             >
               <Text style={styles.webPdfButtonText}>🔗 PDF'i Yeni Sekmede Aç</Text>
@@ -591,7 +588,10 @@ export default function PDFViewer() {
         <WebView
           style={styles.webView}
           source={{ 
-            html: createSimplePDFViewerHTML(pdf?.uri || '', pdf?.fileData) 
+            html: createSimplePDFViewerHTML(
+              `${EXPO_PUBLIC_BACKEND_URL}/api/pdfs/${pdf?.id}/view`,
+              pdf?.fileData
+            ) 
           }}
           onMessage={handleWebViewMessage}
           javaScriptEnabled={true}
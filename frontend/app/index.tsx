@@ -29,6 +29,24 @@ interface PDFFile {
   type: 'local' | 'cloud' | 'url';
 }
 
+// Liste endpoint'leri sayfalıdır; X-Next-Cursor bitene kadar sayfalar sırayla alınır
+const PDF_PAGE_SIZE = 200;
+
+const fetchAllPages = async (path: string): Promise<PDFFile[] | null> => {
+  const items: PDFFile[] = [];
+  let cursor: string | null = null;
+  do {
+    const query = `limit=${PDF_PAGE_SIZE}` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : '');
+    const response = await fetch(`${EXPO_PUBLIC_BACKEND_URL}${path}?${query}`);
+    if (!response.ok) {
+      return null;
+    }
+    items.push(...(await response.json()));
+    cursor = response.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return items;
+};
+
 export default function Index() {
   const [pdfFiles, setPdfFiles] = useState<PDFFile[]>([]);
   const [favorites, setFavorites] = useState<PDFFile[]>([]);
@@ -44,9 +62,8 @@ export default function Index() {
 
   const loadPDFs = async () => {
     try {
-      const response = await fetch(`${EXPO_PUBLIC_BACKEND_URL}/api/pdfs`);
-      if (response.ok) {
-        const data = await response.json();
+      const data = await fetchAllPages('/api/pdfs');
+      if (data) {
         setPdfFiles(data);
       }
     } catch (error) {
@@ -56,9 +73,8 @@ export default function Index() {
 
   const loadFavorites = async () => {
     try {
-      const response = await fetch(`${EXPO_PUBLIC_BACKEND_URL}/api/pdfs/favorites`);
-      if (response.ok) {
-        const data = await response.json();
+      const data = await fetchAllPages('/api/pdfs/favorites');
+      if (data) {
         setFavorites(data);
       }
     } catch (error) {
@@ -0,0 +1,36 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from dotenv import load_dotenv
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+# Backend modülleri (server, storage, ...) düz import edilir
+sys.path.insert(0, str(BACKEND_DIR))
+load_dotenv(BACKEND_DIR / ".env")
+
+
+@pytest.fixture(scope="session")
+def mongo_client():
+    """Gerçek bir mongod gerektiren testler için; erişilemezse testler atlanır"""
+    from pymongo import MongoClient
+    from pymongo.errors import PyMongoError
+
+    client = MongoClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError as e:
+        client.close()
+        pytest.skip(f"MongoDB erişilemiyor: {e}")
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def mongo_db(mongo_client):
+    name = f"{os.environ.get('DB_NAME', 'pdf_viewer_db')}_pytest"
+    mongo_client.drop_database(name)
+    yield mongo_client[name]
+    mongo_client.drop_database(name)
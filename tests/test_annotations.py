@@ -0,0 +1,48 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from annotations import (
+    SYNC_OVERLAP,
+    annotation_update_fields,
+    build_annotation,
+    decode_sync_cursor,
+    encode_sync_cursor,
+    sync_lower_bound,
+)
+
+
+def test_build_annotation_fills_defaults():
+    annotation = build_annotation("pdf-1", {"content": "not", "x": 5}, now="2024-01-01T00:00:00")
+
+    assert annotation["pdf_id"] == "pdf-1"
+    assert annotation["content"] == "not"
+    assert annotation["x"] == 5
+    assert annotation["type"] == "text"
+    assert annotation["color"] == "#FFFF00"
+    assert annotation["created_at"] == annotation["updated_at"] == "2024-01-01T00:00:00"
+    assert annotation["id"]
+
+
+def test_build_annotation_keeps_client_id():
+    assert build_annotation("pdf-1", {}, annotation_id="client-id")["id"] == "client-id"
+
+
+def test_update_fields_are_whitelisted():
+    assert annotation_update_fields({"x": 1, "pdf_id": "other", "color": "#000"}) == {"x": 1, "color": "#000"}
+
+
+def test_sync_cursor_round_trip():
+    now = datetime(2024, 5, 1, 12, 30, 15, 123456)
+
+    assert decode_sync_cursor(encode_sync_cursor(now)) == now
+    assert sync_lower_bound(now) == (now - SYNC_OVERLAP).isoformat()
+
+
+@pytest.mark.parametrize("cursor", [
+    "@@",
+    encode_sync_cursor(datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)),
+])
+def test_invalid_sync_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_sync_cursor(cursor)
@@ -0,0 +1,89 @@
+import asyncio
+import os
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from blob_refs import (
+    acquire_blob_ref,
+    backfill_blob_refs,
+    finish_blob_release,
+    release_blob_ref,
+    storage_stats,
+)
+
+KEY = "a" * 64
+
+
+def run_with_db(mongo_db, handler):
+    async def run():
+        client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+        try:
+            return await handler(client[mongo_db.name])
+        finally:
+            client.close()
+
+    return asyncio.run(run())
+
+
+def test_second_reference_is_deduplicated_and_last_release_frees(mongo_db):
+    async def scenario(db):
+        acquired = [await acquire_blob_ref(db.blob_refs, KEY, 100) for _ in range(3)]
+        stats = await storage_stats(db.blob_refs)
+        released = [await release_blob_ref(db.blob_refs, KEY) for _ in range(3)]
+        return acquired, stats, released
+
+    acquired, stats, released = run_with_db(mongo_db, scenario)
+
+    assert acquired == [False, True, True]
+    assert stats == {
+        "blobs": 1,
+        "references": 3,
+        "storedBytes": 100,
+        "referencedBytes": 300,
+        "savedBytes": 200,
+    }
+    assert released == [False, False, True]
+    assert mongo_db.blob_refs.find_one({"_id": KEY})["deleting"]
+
+
+def test_acquire_waits_for_pending_deletion(mongo_db):
+    async def scenario(db):
+        await acquire_blob_ref(db.blob_refs, KEY, 100)
+        assert await release_blob_ref(db.blob_refs, KEY)
+        # Dosya silinirken aynı içerik yeniden yükleniyor
+        reupload = asyncio.create_task(acquire_blob_ref(db.blob_refs, KEY, 100))
+        await asyncio.sleep(0.1)
+        waited = not reupload.done()
+        await finish_blob_release(db.blob_refs, KEY)
+        return waited, await reupload
+
+    waited, deduplicated = run_with_db(mongo_db, scenario)
+
+    assert waited
+    assert deduplicated is False
+    ref = mongo_db.blob_refs.find_one({"_id": KEY})
+    assert ref["refs"] == 1 and "deleting" not in ref
+
+
+def test_concurrent_uploads_count_every_reference(mongo_db):
+    async def scenario(db):
+        return await asyncio.gather(*(acquire_blob_ref(db.blob_refs, KEY, 100) for _ in range(20)))
+
+    results = run_with_db(mongo_db, scenario)
+
+    assert results.count(False) == 1
+    assert mongo_db.blob_refs.find_one({"_id": KEY})["refs"] == 20
+
+
+def test_backfill_counts_existing_pdfs_once(mongo_db):
+    mongo_db.pdfs.insert_many([
+        {"id": "pdf-1", "blobKey": KEY, "size": 100},
+        {"id": "pdf-2", "blobKey": KEY, "size": 100},
+        {"id": "pdf-3", "blobKey": None, "size": 1},
+    ])
+
+    async def scenario(db):
+        return await backfill_blob_refs(db.pdfs, db.blob_refs), await backfill_blob_refs(db.pdfs, db.blob_refs)
+
+    assert run_with_db(mongo_db, scenario) == (1, 0)
+    assert mongo_db.blob_refs.find_one({"_id": KEY})["refs"] == 2
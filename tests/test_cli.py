@@ -0,0 +1,76 @@
+import os
+
+import pytest
+import uvicorn
+from typer.testing import CliRunner
+
+import cli
+
+POOL_VARIABLES = ("MONGO_MAX_POOL_SIZE", "MONGO_MIN_POOL_SIZE", "MONGO_WAIT_QUEUE_TIMEOUT_MS", "PROMETHEUS_MULTIPROC_DIR")
+
+
+@pytest.fixture
+def captured_run(monkeypatch):
+    for name in POOL_VARIABLES + ("WEB_CONCURRENCY", "METADATA_CACHE_URL", "PDF_EXISTS_TTL"):
+        monkeypatch.delenv(name, raising=False)
+    calls = []
+    monkeypatch.setattr(uvicorn, "run", lambda app, **options: calls.append((app, options)))
+    yield calls
+    # serve ortamı worker'lara devretmek için os.environ'a yazar; sonraki testlere sızmasın
+    for name in POOL_VARIABLES:
+        os.environ.pop(name, None)
+
+
+def test_serve_starts_workers_with_pool_settings(captured_run, tmp_path, monkeypatch):
+    metrics_dir = tmp_path / "metrics"
+    metrics_dir.mkdir()
+    (metrics_dir / "counter_1.db").write_bytes(b"eski")
+    (metrics_dir / "README").write_text("operatörün dosyası")
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(metrics_dir))
+
+    result = CliRunner().invoke(cli.cli, [
+        "serve", "--workers", "3", "--port", "9000", "--max-pool-size", "40", "--wait-queue-timeout-ms", "2000",
+    ])
+
+    assert result.exit_code == 0, result.output
+    [(app, options)] = captured_run
+    assert app == "server:app"
+    assert options["app_dir"] == str(cli.BACKEND_DIR)
+    assert options["workers"] == 3 and options["port"] == 9000
+    assert options["loop"] == cli.event_loop_choice()
+    assert options["http"] == cli.http_choice()
+    assert os.environ["MONGO_MAX_POOL_SIZE"] == "40"
+    assert os.environ["MONGO_WAIT_QUEUE_TIMEOUT_MS"] == "2000"
+    assert "MONGO_MIN_POOL_SIZE" not in os.environ
+    assert [path.name for path in metrics_dir.iterdir()] == ["README"]
+    assert "WebSocket annotation yayını süreç içidir" in result.output
+    assert "PDF varlık önbelleği worker başınadır" in result.output
+    assert "METADATA_CACHE_URL verilmedi" in result.output
+
+
+def test_serve_defaults_to_single_worker(captured_run):
+    result = CliRunner().invoke(cli.cli, ["serve"])
+
+    assert result.exit_code == 0, result.output
+    [(_, options)] = captured_run
+    assert options["workers"] == 1
+    assert "Uyarı" not in result.output
+    assert "PROMETHEUS_MULTIPROC_DIR" not in os.environ
+
+
+def test_serve_rejects_min_pool_above_max(captured_run):
+    result = CliRunner().invoke(cli.cli, ["serve", "--max-pool-size", "5", "--min-pool-size", "10"])
+
+    assert result.exit_code != 0
+    assert captured_run == []
+
+
+def test_mongo_pool_options_only_include_given_settings(monkeypatch):
+    import server
+
+    monkeypatch.delenv("MONGO_MIN_POOL_SIZE", raising=False)
+    monkeypatch.delenv("MONGO_MAX_IDLE_TIME_MS", raising=False)
+    monkeypatch.setenv("MONGO_MAX_POOL_SIZE", "25")
+    monkeypatch.setenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "")
+
+    assert server.mongo_pool_options() == {"maxPoolSize": 25}
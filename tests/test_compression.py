@@ -0,0 +1,103 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from compression import CompressionMiddleware, GzipEncoder, available_encoders, negotiate
+
+ROWS = [{"id": f"pdf-{i}", "name": f"belge-{i}.pdf", "drawing_data": "M0 0 L10 10 " * 20} for i in range(200)]
+
+
+def make_app(**options):
+    app = FastAPI()
+
+    @app.get("/rows")
+    async def rows(count: int = len(ROWS)):
+        return ORJSONResponse(ROWS[:count], headers={"ETag": '"v1"'})
+
+    @app.get("/pdf")
+    async def pdf():
+        return Response(b"%PDF-1.4 " + b"x" * 10000, media_type="application/pdf")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(50):
+                yield b'{"satir": "' + b"y" * 1000 + b'"}\n'
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    app.add_middleware(CompressionMiddleware, **options)
+    return app
+
+
+def raw_get(client, path, encoding):
+    with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("*", "zstd"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("", None),
+])
+def test_negotiation_prefers_quality_then_server_order(header, expected):
+    assert negotiate(header, ["zstd", "br", "gzip"]) == expected
+
+
+def test_large_json_is_gzipped_with_weak_etag():
+    with TestClient(make_app()) as client:
+        response, body = raw_get(client, "/rows", "gzip")
+        plain = client.get("/rows", headers={"Accept-Encoding": "identity"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert int(response.headers["content-length"]) == len(body) < len(plain.content) / 5
+    assert gzip.decompress(body) == plain.content
+    assert "content-encoding" not in plain.headers
+
+
+def test_small_bodies_and_pdfs_are_not_compressed():
+    with TestClient(make_app(minimum_size=1024)) as client:
+        small = client.get("/rows", params={"count": 1}, headers={"Accept-Encoding": "gzip"})
+        pdf, body = raw_get(client, "/pdf", "gzip")
+
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in pdf.headers
+    assert body.startswith(b"%PDF-")
+
+
+def test_streaming_and_large_bodies_are_sent_in_chunks():
+    with TestClient(make_app(stream_threshold=4096)) as client:
+        stream, stream_body = raw_get(client, "/stream", "gzip")
+        large, large_body = raw_get(client, "/rows", "gzip")
+        plain = client.get("/rows", headers={"Accept-Encoding": "identity"}).content
+
+    for response in (stream, large):
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+    assert gzip.decompress(stream_body) == b"".join(b'{"satir": "' + b"y" * 1000 + b'"}\n' for _ in range(50))
+    assert gzip.decompress(large_body) == plain
+
+
+@pytest.mark.parametrize("encoding", [name for name in available_encoders() if name != "gzip"])
+def test_optional_encoders_round_trip(encoding):
+    with TestClient(make_app()) as client:
+        response = client.get("/rows", headers={"Accept-Encoding": encoding})
+
+    assert response.headers["content-encoding"] == encoding
+    assert response.json() == ROWS
+
+
+def test_only_configured_encoders_are_offered():
+    with TestClient(make_app(encoders={"gzip": GzipEncoder})) as client:
+        response = client.get("/rows", headers={"Accept-Encoding": "br"})
+
+    assert "content-encoding" not in response.headers
@@ -0,0 +1,56 @@
+import asyncio
+
+from existence import ExistenceCache
+
+
+class CountingLookup:
+    def __init__(self, existing):
+        self.existing = set(existing)
+        self.calls = 0
+
+    async def __call__(self, key):
+        self.calls += 1
+        return key in self.existing
+
+
+def test_hits_and_negative_hits_skip_lookup():
+    cache = ExistenceCache()
+    lookup = CountingLookup({"pdf-1"})
+
+    async def run():
+        return [await cache.exists(key, lookup) for key in ("pdf-1", "pdf-1", "yok", "yok")]
+
+    assert asyncio.run(run()) == [True, True, False, False]
+    assert lookup.calls == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["negativeHits"], stats["misses"]) == (1, 1, 2)
+    assert stats["hitRatio"] == 0.5
+
+
+def test_create_and_delete_update_cache_without_lookup():
+    cache = ExistenceCache()
+    lookup = CountingLookup(set())
+
+    async def run():
+        cache.mark_present("new")
+        present = await cache.exists("new", lookup)
+        cache.mark_absent("new")
+        return present, await cache.exists("new", lookup)
+
+    assert asyncio.run(run()) == (True, False)
+    assert lookup.calls == 0
+
+
+def test_expired_and_evicted_entries_are_looked_up_again():
+    cache = ExistenceCache(max_entries=2, negative_ttl=0)
+    lookup = CountingLookup({"a", "b", "c"})
+
+    async def run():
+        for key in ("a", "b", "c", "a"):
+            await cache.exists(key, lookup)
+        await cache.exists("yok", lookup)
+        await cache.exists("yok", lookup)
+
+    asyncio.run(run())
+    assert lookup.calls == 6
+    assert cache.stats()["evictions"] >= 1
@@ -0,0 +1,203 @@
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import fetcher as fetcher_module
+from fetcher import BlockedAddress, FetchError, URLFetcher, is_public_address
+from storage import BlobStore
+
+PDF_BODY = b"%PDF-1.4 " + b"x" * 4096
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Uzak PDF sunucusu yerine geçen küçük HTTP sunucusu"""
+
+    routes = {
+        "/doc.pdf": (PDF_BODY, '"v1"'),
+        "/page.html": (b"<html></html>", None),
+        "/big.pdf": (b"%PDF-1.4 " + b"x" * 20000, None),
+    }
+    redirects = {
+        "/moved.pdf": "/doc.pdf",
+        "/metadata.pdf": "http://169.254.169.254/latest/meta-data/",
+    }
+
+    hosts = []
+
+    def log_message(self, *args):
+        pass
+
+    def _respond(self, include_body: bool):
+        self.hosts.append(self.headers.get("Host"))
+        if self.path in self.redirects:
+            self.send_response(302)
+            self.send_header("Location", self.redirects[self.path])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        route = self.routes.get(self.path)
+        if route is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body, etag = route
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self._respond(include_body=False)
+
+    def do_GET(self):
+        self._respond(include_body=True)
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(tmp_path / "blobs")
+
+
+def fetch(store, url, commit=None, allow_private=True, **kwargs):
+    # Yerine geçen sunucu loopback'te çalışır
+    async def run():
+        fetcher = URLFetcher(store, max_size=10000, timeout=5, commit=commit, allow_private=allow_private)
+        try:
+            return await fetcher.fetch(url, **kwargs)
+        finally:
+            await fetcher.aclose()
+
+    return asyncio.run(run())
+
+
+def test_fetch_stores_pdf(store, base_url):
+    result = fetch(store, f"{base_url}/doc.pdf")
+
+    assert not result.not_modified
+    assert result.blob.size == len(PDF_BODY)
+    assert result.etag == '"v1"'
+    assert store.path_for(result.blob.key).read_bytes() == PDF_BODY
+
+
+def test_commit_hook_runs_before_blob_is_stored(store, base_url):
+    seen = []
+
+    async def commit(writer):
+        seen.append((writer.sha256, store.exists(writer.sha256)))
+        return await writer.commit()
+
+    result = fetch(store, f"{base_url}/doc.pdf", commit=commit)
+
+    assert seen == [(result.blob.key, False)]
+    assert store.exists(result.blob.key)
+
+
+def test_refresh_with_etag_is_not_modified(store, base_url):
+    result = fetch(store, f"{base_url}/doc.pdf", etag='"v1"')
+
+    assert result.not_modified
+    assert result.blob is None
+
+
+def test_host_limits_are_released_after_fetch(store, base_url):
+    async def run():
+        fetcher = URLFetcher(store, max_size=10000, timeout=5, allow_private=True, per_host_concurrency=1)
+        try:
+            await asyncio.gather(*(fetcher.fetch(f"{base_url}/doc.pdf") for _ in range(3)))
+            with pytest.raises(FetchError):
+                await fetcher.fetch(f"{base_url}/missing.pdf")
+            return fetcher._host_limits, fetcher._host_users
+        finally:
+            await fetcher.aclose()
+
+    assert asyncio.run(run()) == ({}, {})
+
+
+@pytest.mark.parametrize("path, message", [
+    ("/page.html", "PDF değil"),
+    ("/big.pdf", "sınırı"),
+    ("/missing.pdf", "404"),
+])
+def test_fetch_errors(store, base_url, path, message):
+    with pytest.raises(FetchError, match=message):
+        fetch(store, f"{base_url}{path}")
+    assert list(store._tmp_dir.iterdir()) == []
+
+
+@pytest.mark.parametrize("address, public", [
+    ("93.184.216.34", True),
+    ("2606:2800:220:1::", True),
+    ("127.0.0.1", False),
+    ("10.1.2.3", False),
+    ("192.168.0.10", False),
+    ("169.254.169.254", False),
+    ("::1", False),
+    ("fe80::1%eth0", False),
+    ("::ffff:127.0.0.1", False),
+    ("0.0.0.0", False),
+])
+def test_public_address_check(address, public):
+    assert is_public_address(address) is public
+
+
+def test_redirects_are_followed(store, base_url):
+    result = fetch(store, f"{base_url}/moved.pdf")
+
+    assert result.blob.size == len(PDF_BODY)
+
+
+def test_private_hosts_are_blocked_by_default(store, base_url):
+    with pytest.raises(BlockedAddress):
+        fetch(store, f"{base_url}/doc.pdf", allow_private=False)
+
+
+def test_every_redirect_hop_is_checked(store, base_url, monkeypatch):
+    # Yerine geçen sunucuya izin ver; yönlendirilen metadata adresi yine de reddedilmeli
+    monkeypatch.setattr(fetcher_module, "is_public_address", lambda address: address == "127.0.0.1")
+
+    with pytest.raises(BlockedAddress):
+        fetch(store, f"{base_url}/metadata.pdf", allow_private=False)
+
+
+def test_connection_is_pinned_to_checked_address(store, base_url, monkeypatch):
+    # Adı yalnızca kontrol çözer; httpx ikinci kez çözseydi rebinding ile iç ağa gidebilirdi
+    port = int(base_url.rsplit(":", 1)[1])
+    lookups = []
+    resolve = asyncio.BaseEventLoop.getaddrinfo
+
+    async def getaddrinfo(self, host, *args, **kwargs):
+        if host != "pdf.example":
+            return await resolve(self, host, *args, **kwargs)
+        lookups.append(host)
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", port))]
+
+    monkeypatch.setattr(asyncio.BaseEventLoop, "getaddrinfo", getaddrinfo)
+    monkeypatch.setattr(fetcher_module, "is_public_address", lambda address: address == "127.0.0.1")
+    StandInHandler.hosts.clear()
+
+    result = fetch(store, f"http://pdf.example:{port}/doc.pdf", allow_private=False)
+
+    assert result.blob.size == len(PDF_BODY)
+    # HEAD ve GET için birer kontrol; Host başlığı özgün adı taşır
+    assert lookups == ["pdf.example"] * 2
+    assert StandInHandler.hosts == [f"pdf.example:{port}"] * 2
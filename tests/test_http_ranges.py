@@ -0,0 +1,157 @@
+import warnings
+
+import pytest
+
+from http_ranges import RangeNotSatisfiable, parse_range_header
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-9", [(0, 9)]),
+    ("bytes=10-", [(10, 99)]),
+    ("bytes=-5", [(95, 99)]),
+    ("bytes=-500", [(0, 99)]),
+    ("bytes=90-200", [(90, 99)]),
+    ("bytes=0-4, 50-59", [(0, 4), (50, 59)]),
+    ("bytes=50-59,0-4", [(0, 4), (50, 59)]),
+    ("bytes=0-10,5-20,21-30", [(0, 30)]),
+])
+def test_parse_range_header(header, expected):
+    assert parse_range_header(header, 100) == expected
+
+
+@pytest.mark.parametrize("header", [
+    "items=0-9",
+    "bytes=",
+    "bytes=a-b",
+    "bytes=9-0",
+    "bytes=-",
+])
+def test_invalid_range_is_ignored(header):
+    assert parse_range_header(header, 100) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=200-300", "bytes=-0"])
+def test_unsatisfiable_range(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range_header(header, 100)
+
+
+@pytest.mark.parametrize("path, endpoint", [
+    ("/api/pdfs/{pdf_id}/view", "view_pdf"),
+    ("/api/pdfs/{pdf_id}/thumbnail", "get_pdf_thumbnail"),
+])
+def test_get_and_head_have_distinct_operation_ids(path, endpoint):
+    import server
+
+    server.app.openapi_schema = None
+    with warnings.catch_warnings():
+        warnings.filterwarnings("error", message=f"Duplicate Operation ID {endpoint}_")
+        operations = server.app.openapi()["paths"][path]
+
+    assert set(operations) == {"get", "head"}
+    assert operations["get"]["operationId"] != operations["head"]["operationId"]
+
+
+PDF_BODY = b"%PDF-1.4 " + bytes(range(256)) * 4
+
+
+class SinglePdfCollection:
+    """view_pdf'in okuduğu tek kaydı döndüren koleksiyon yerine geçen"""
+
+    def __init__(self, document):
+        self.document = document
+
+    async def find_one(self, query, *args, **kwargs):
+        return dict(self.document) if query.get("id") == self.document["id"] else None
+
+
+@pytest.fixture
+def view(tmp_path, monkeypatch):
+    import server
+    from fastapi.testclient import TestClient
+    from storage import BlobStore
+
+    store = BlobStore(tmp_path / "blobs")
+    blob = store._put_bytes(PDF_BODY)
+    monkeypatch.setattr(server, "blob_store", store)
+    monkeypatch.setattr(server, "pdfs_collection", SinglePdfCollection(
+        {"id": "pdf-1", "name": "rapor", "blobKey": blob.key, "sha256": blob.key}
+    ))
+    return TestClient(server.app), "/api/pdfs/pdf-1/view", f'"{blob.key}"'
+
+
+def test_view_single_range(view):
+    client, url, _ = view
+
+    response = client.get(url, headers={"Range": "bytes=10-19"})
+
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 10-19/{len(PDF_BODY)}"
+    assert response.content == PDF_BODY[10:20]
+
+
+def test_view_multiple_ranges(view):
+    client, url, _ = view
+
+    response = client.get(url, headers={"Range": "bytes=0-4,100-109"})
+
+    assert response.status_code == 206
+    media_type, _, boundary = response.headers["content-type"].partition("; boundary=")
+    assert media_type == "multipart/byteranges"
+    assert int(response.headers["content-length"]) == len(response.content)
+    parts = response.content.split(f"--{boundary}".encode())
+    assert parts[-1] == b"--\r\n"
+    assert parts[1].endswith(b"\r\n\r\n" + PDF_BODY[0:5] + b"\r\n")
+    assert f"Content-Range: bytes 100-109/{len(PDF_BODY)}".encode() in parts[2]
+    assert parts[2].endswith(PDF_BODY[100:110] + b"\r\n")
+
+
+def test_view_unsatisfiable_range(view):
+    client, url, _ = view
+
+    response = client.get(url, headers={"Range": f"bytes={len(PDF_BODY)}-"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(PDF_BODY)}"
+
+
+def test_view_if_none_match(view):
+    client, url, etag = view
+
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+
+def test_view_if_range_mismatch_sends_full_file(view):
+    client, url, etag = view
+
+    response = client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"eski"'})
+    matched = client.get(url, headers={"Range": "bytes=0-9", "If-Range": etag})
+
+    assert response.status_code == 200
+    assert response.content == PDF_BODY
+    assert "content-range" not in response.headers
+    assert matched.status_code == 206
+
+
+def test_view_head_has_headers_without_body(view):
+    client, url, etag = view
+
+    response = client.head(url)
+    ranged = client.head(url, headers={"Range": "bytes=0-9"})
+
+    assert response.status_code == 200
+    assert response.headers["content-length"] == str(len(PDF_BODY))
+    assert response.headers["etag"] == etag
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.content == b""
+    assert (ranged.status_code, ranged.headers["content-length"], ranged.content) == (206, "10", b"")
+
+
+def test_view_missing_pdf(view):
+    client, _, _ = view
+
+    assert client.get("/api/pdfs/yok/view").status_code == 404
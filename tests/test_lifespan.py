@@ -0,0 +1,86 @@
+"""Uygulamanın import'ta yan etkisiz olduğunu ve lifespan/sağlık uçlarını doğrular"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+# Backend modüllerinin kendi import süresi (bağımlılıklar hariç) bu sınırı aşmamalı
+IMPORT_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", 250))
+
+
+def import_server(tmp_path, code):
+    env = {**os.environ, "UPLOADS_DIR": str(tmp_path / "uploads")}
+    env.pop("MONGO_URL", None)
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import server; {code}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+
+
+def test_import_has_no_side_effects(tmp_path):
+    result = import_server(tmp_path, "print(server.client is None, server.blob_store is None)")
+
+    assert result.stdout.split() == ["True", "True"]
+    assert not (tmp_path / "uploads").exists()
+
+
+def test_import_time_of_backend_modules_stays_low(tmp_path):
+    result = import_server(tmp_path, "pass")
+    local = {path.stem for path in BACKEND_DIR.glob("*.py")}
+    self_us = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        if name.strip() in local:
+            self_us[name.strip()] = int(own)
+
+    total_ms = sum(self_us.values()) / 1000
+    assert "server" in self_us
+    assert total_ms < IMPORT_BUDGET_MS, sorted(self_us.items(), key=lambda item: -item[1])
+
+
+def test_probes_before_startup():
+    import server
+
+    # Lifespan çalıştırılmadan: süreç canlı ama trafik almaya hazır değil
+    client = TestClient(server.app)
+
+    assert client.get("/healthz").json() == {"status": "ok"}
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["checks"] == {"startup": False}
+
+
+def test_lifespan_warms_pool_and_reports_ready(mongo_db, monkeypatch, tmp_path):
+    import server
+
+    monkeypatch.setattr(server, "client", None)
+    monkeypatch.setattr(server, "blob_store", None)
+    monkeypatch.setattr(server, "DB_NAME", mongo_db.name)
+    monkeypatch.setattr(server, "UPLOADS_DIR", tmp_path / "uploads")
+    monkeypatch.setattr(server, "STATS_RECONCILE_INTERVAL", 0)
+    monkeypatch.setattr(server, "MONGO_WARMUP_CONNECTIONS", 3)
+
+    with TestClient(server.app) as client:
+        response = client.get("/readyz")
+        index_names = mongo_db.pdfs.index_information()
+
+    assert response.status_code == 200
+    assert response.json()["checks"] == {"startup": True, "mongo": True, "storage": True}
+    assert len(index_names) > 1
+    assert (tmp_path / "uploads" / "blobs").is_dir()
+    assert server.client is None
+    assert server.app.state.ready is False
+
+
+@pytest.mark.parametrize("path", ["/healthz", "/readyz"])
+def test_probes_are_not_in_openapi(path):
+    import server
+
+    assert path not in server.app.openapi()["paths"]
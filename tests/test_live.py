@@ -0,0 +1,199 @@
+import asyncio
+
+from live import AnnotationHub, WriteBehindBuffer
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.sent = []
+        self.closed_with = None
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+class RecordingStore:
+    """Flush edilen toplu yazmaları sırasıyla kaydeder"""
+
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+
+    async def flush(self, batch):
+        await asyncio.sleep(self.delay)
+        self.batches.append(batch)
+
+    def final(self):
+        state = {}
+        for batch in self.batches:
+            for key, fields in batch.items():
+                state.setdefault(key, {}).update(fields)
+        return state
+
+
+def test_rapid_updates_are_coalesced_into_one_write():
+    store = RecordingStore()
+
+    async def run():
+        buffer = WriteBehindBuffer(store.flush, interval=60)
+        for x in range(10):
+            buffer.add(("pdf", "a"), {"x": x})
+        buffer.add(("pdf", "a"), {"color": "#000"})
+        await buffer.flush()
+
+    asyncio.run(run())
+    assert store.batches == [{("pdf", "a"): {"x": 9, "color": "#000"}}]
+
+
+def test_updates_during_flush_are_written_after_it():
+    store = RecordingStore(delay=0.02)
+
+    async def run():
+        buffer = WriteBehindBuffer(store.flush, interval=60)
+        buffer.add(("pdf", "a"), {"x": 1})
+        first = asyncio.create_task(buffer.flush())
+        await asyncio.sleep(0)
+        buffer.add(("pdf", "a"), {"x": 2})
+        await asyncio.gather(first, buffer.flush())
+
+    asyncio.run(run())
+    assert [batch[("pdf", "a")]["x"] for batch in store.batches] == [1, 2]
+    assert store.final()[("pdf", "a")] == {"x": 2}
+
+
+def test_discard_drops_stale_fields_only():
+    store = RecordingStore()
+
+    async def run():
+        buffer = WriteBehindBuffer(store.flush, interval=60)
+        buffer.add(("pdf", "a"), {"x": 1, "content": "eski"})
+        buffer.add(("pdf", "b"), {"x": 1})
+        await buffer.discard(("pdf", "a"), ["content"])
+        await buffer.discard(("pdf", "b"))
+        await buffer.close()
+
+    asyncio.run(run())
+    assert store.final() == {("pdf", "a"): {"x": 1}}
+
+
+def test_discard_drops_entry_left_with_only_timestamp():
+    store = RecordingStore()
+
+    async def run():
+        buffer = WriteBehindBuffer(store.flush, interval=60)
+        buffer.add(("pdf", "a"), {"x": 1, "updated_at": "2024-01-01T10:00:00"})
+        buffer.add(("pdf", "b"), {"x": 1, "color": "red", "updated_at": "2024-01-01T10:00:00"})
+        # Doğrudan PUT x'i yazdı; eski damga tek başına kalmamalı
+        await buffer.discard(("pdf", "a"), ["x"])
+        await buffer.discard(("pdf", "b"), ["x"])
+        await buffer.close()
+
+    asyncio.run(run())
+    assert store.final() == {("pdf", "b"): {"color": "red", "updated_at": "2024-01-01T10:00:00"}}
+
+
+def test_full_buffer_flushes_without_waiting_for_interval():
+    store = RecordingStore()
+
+    async def run():
+        buffer = WriteBehindBuffer(store.flush, interval=60, max_entries=3)
+        buffer.start()
+        for index in range(3):
+            buffer.add(("pdf", str(index)), {"x": index})
+        await asyncio.sleep(0.01)
+        written = len(store.batches)
+        await buffer.close()
+        return written
+
+    assert asyncio.run(run()) == 1
+
+
+def test_close_flushes_pending_updates():
+    store = RecordingStore()
+
+    async def run():
+        buffer = WriteBehindBuffer(store.flush, interval=60)
+        buffer.start()
+        buffer.add(("pdf", "a"), {"y": 5})
+        await buffer.close()
+        return buffer.stats()
+
+    stats = asyncio.run(run())
+    assert store.final() == {("pdf", "a"): {"y": 5}}
+    assert stats["pending"] == 0
+
+
+def test_failed_flush_keeps_newer_values():
+    attempts = []
+
+    async def flaky(batch):
+        attempts.append(dict(batch))
+        if len(attempts) == 1:
+            buffer.add(("pdf", "a"), {"x": 2})
+            raise RuntimeError("mongo yok")
+
+    async def run():
+        buffer.add(("pdf", "a"), {"x": 1, "color": "#fff"})
+        await buffer.flush()
+        await buffer.flush()
+
+    buffer = WriteBehindBuffer(flaky, interval=60)
+    asyncio.run(run())
+    assert attempts[-1] == {("pdf", "a"): {"x": 2, "color": "#fff"}}
+
+
+def test_hub_delivers_in_publish_order_with_sequence():
+    async def run():
+        hub = AnnotationHub()
+        first, second = RecordingSocket(), RecordingSocket()
+        hub.join("pdf", first)
+        connection = hub.join("pdf", second)
+        for index in range(5):
+            hub.publish("pdf", {"type": "annotation.updated", "id": str(index)})
+        hub.publish("other", {"type": "annotation.updated"})
+        await asyncio.sleep(0.01)
+        hub.leave("pdf", connection)
+        hub.publish("pdf", {"type": "annotation.deleted", "id": "0"})
+        await asyncio.sleep(0.01)
+        return first.sent, second.sent
+
+    first, second = asyncio.run(run())
+    assert first[0]["type"] == "hello"
+    assert [message["seq"] for message in first[1:]] == [1, 2, 3, 4, 5, 6]
+    assert [message["id"] for message in second[1:]] == ["0", "1", "2", "3", "4"]
+
+
+def test_hub_disconnects_slow_consumer():
+    async def run():
+        hub = AnnotationHub(max_queue=2)
+        socket = RecordingSocket()
+        hub.join("pdf", socket)
+        for index in range(3):
+            hub.publish("pdf", {"type": "annotation.updated", "id": str(index)})
+        await asyncio.sleep(0.01)
+        return hub.connection_count(), socket.closed_with
+
+    assert asyncio.run(run()) == (0, 1013)
+
+
+def test_send_failure_on_closed_socket_ends_sender_quietly():
+    class ClosedSocket(RecordingSocket):
+        async def send_json(self, message):
+            raise RuntimeError("Cannot call send once a close message has been sent")
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        unhandled = []
+        loop.set_exception_handler(lambda loop, context: unhandled.append(context))
+        hub = AnnotationHub()
+        connection = hub.join("pdf", ClosedSocket())
+        await asyncio.sleep(0.01)
+        sender = connection._sender
+        return sender.done() and sender.exception() is None, unhandled
+
+    finished, unhandled = asyncio.run(run())
+    assert finished
+    assert unhandled == []
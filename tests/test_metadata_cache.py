@@ -0,0 +1,157 @@
+import asyncio
+
+from metadata_cache import MemoryBackend, MetadataCache, RedisBackend
+
+
+class CountingLoader:
+    def __init__(self, docs, delay=0.0):
+        self.docs = docs
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self, key):
+        self.calls += 1
+        doc = self.docs.get(key)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return dict(doc) if doc is not None else None
+
+
+class FakeRedis:
+    """get/set(ex=)/delete sağlayan yerel yedek"""
+
+    def __init__(self):
+        self.data = {}
+        self.expiries = {}
+        self.closed = False
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.expiries[key] = ex
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def aclose(self):
+        self.closed = True
+
+
+class BrokenBackend(MemoryBackend):
+    async def get(self, key):
+        raise ConnectionError("bağlantı yok")
+
+    async def set(self, key, value):
+        raise ConnectionError("bağlantı yok")
+
+
+def test_hits_skip_loader_and_missing_documents_are_not_cached():
+    cache = MetadataCache(MemoryBackend())
+    loader = CountingLoader({"pdf-1": {"id": "pdf-1", "name": "a.pdf"}})
+
+    async def run():
+        return [await cache.get(key, loader) for key in ("pdf-1", "pdf-1", "yok", "yok")]
+
+    assert asyncio.run(run()) == [{"id": "pdf-1", "name": "a.pdf"}] * 2 + [None, None]
+    assert loader.calls == 3
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 3, 1)
+    assert stats["hitRatio"] == 0.25
+
+
+def test_ttl_expiry_and_lru_eviction():
+    backend = MemoryBackend(max_entries=2, ttl=60)
+
+    async def run():
+        await backend.set("a", {"id": "a"})
+        await backend.set("b", {"id": "b"})
+        await backend.get("a")  # a en son kullanılan olur
+        await backend.set("c", {"id": "c"})
+        return [await backend.get(key) is not None for key in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == [True, False, True]
+    assert backend.evictions == 1
+
+    expired = MemoryBackend(ttl=0)
+    asyncio.run(expired.set("a", {"id": "a"}))
+    assert asyncio.run(expired.get("a")) is None
+
+
+def test_concurrent_misses_share_one_load():
+    cache = MetadataCache(MemoryBackend())
+    loader = CountingLoader({"pdf-1": {"id": "pdf-1"}}, delay=0.01)
+
+    async def run():
+        return await asyncio.gather(*(cache.get("pdf-1", loader) for _ in range(10)))
+
+    assert all(doc == {"id": "pdf-1"} for doc in asyncio.run(run()))
+    assert loader.calls == 1
+    assert (cache.stats()["misses"], cache.stats()["coalesced"]) == (1, 9)
+
+
+def test_invalidation_during_load_does_not_store_stale_value():
+    cache = MetadataCache(MemoryBackend())
+    docs = {"pdf-1": {"id": "pdf-1", "isFavorite": False}}
+    loader = CountingLoader(docs, delay=0.01)
+
+    async def run():
+        pending = asyncio.create_task(cache.get("pdf-1", loader))
+        await asyncio.sleep(0.005)
+        # Yükleme sürerken yazma olur
+        docs["pdf-1"] = {"id": "pdf-1", "isFavorite": True}
+        await cache.invalidate("pdf-1")
+        stale = await pending
+        return stale, await cache.get("pdf-1", loader)
+
+    stale, fresh = asyncio.run(run())
+    assert stale["isFavorite"] is False
+    assert fresh["isFavorite"] is True
+    assert loader.calls == 2
+
+
+def test_put_replaces_entry_and_respects_cacheable():
+    cache = MetadataCache(MemoryBackend(), cacheable=lambda doc: not doc.get("fileData"))
+    loader = CountingLoader({})
+
+    async def run():
+        await cache.put("pdf-1", {"id": "pdf-1", "name": "yeni"})
+        cached = await cache.get("pdf-1", loader)
+        await cache.put("pdf-1", {"id": "pdf-1", "fileData": "JVBERi0="})
+        return cached, await cache.get("pdf-1", loader)
+
+    assert asyncio.run(run()) == ({"id": "pdf-1", "name": "yeni"}, None)
+    assert loader.calls == 1
+
+
+def test_redis_backend_round_trips_through_client():
+    client = FakeRedis()
+    cache = MetadataCache(RedisBackend(client, ttl=30))
+    loader = CountingLoader({"pdf-1": {"id": "pdf-1", "fileSize": 10}})
+
+    async def run():
+        first = await cache.get("pdf-1", loader)
+        second = await cache.get("pdf-1", loader)
+        await cache.invalidate("pdf-1")
+        await cache.aclose()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second == {"id": "pdf-1", "fileSize": 10}
+    assert loader.calls == 1
+    assert client.expiries == {"pdfmeta:pdf-1": 30}
+    assert client.data == {} and client.closed
+    assert cache.stats()["backend"] == "RedisBackend"
+
+
+def test_backend_errors_fall_back_to_loader():
+    cache = MetadataCache(BrokenBackend())
+    loader = CountingLoader({"pdf-1": {"id": "pdf-1"}})
+
+    async def run():
+        return [await cache.get("pdf-1", loader) for _ in range(2)]
+
+    assert asyncio.run(run()) == [{"id": "pdf-1"}] * 2
+    assert loader.calls == 2
+    assert cache.stats()["errors"] == 4
@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from metrics import MetricsMiddleware, MongoCommandMetrics, metrics_response
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def make_app():
+    app = FastAPI()
+
+    @app.post("/metrics-test/items/{item_id}")
+    async def echo(item_id: str, body: dict):
+        return {"id": item_id, **body}
+
+    @app.get("/metrics")
+    async def metrics():
+        return metrics_response()
+
+    app.add_middleware(MetricsMiddleware, routes=app.routes)
+    return app
+
+
+def test_requests_are_labelled_by_route_template():
+    labels = {"method": "POST", "route": "/metrics-test/items/{item_id}"}
+    before = sample("http_requests_total", status="200", **labels)
+    size_before = sample("http_request_size_bytes_sum", **labels)
+
+    with TestClient(make_app()) as client:
+        for item_id in ("a", "b"):
+            client.post(
+                f"/metrics-test/items/{item_id}", content=b'{"x": 1}',
+                headers={"Content-Type": "application/json"}
+            )
+        client.get("/metrics-test/yok")
+        text = client.get("/metrics").text
+
+    assert sample("http_requests_total", status="200", **labels) == before + 2
+    assert sample("http_request_size_bytes_sum", **labels) == size_before + 2 * len(b'{"x": 1}')
+    assert sample("http_requests_in_flight", **labels) == 0
+    assert sample("http_requests_total", method="GET", route="unmatched", status="404") >= 1
+    assert 'http_request_duration_seconds_bucket{le="0.005",method="POST",route="/metrics-test/items/{item_id}"}' in text
+
+
+def test_mongo_commands_are_timed_per_collection():
+    listener = MongoCommandMetrics()
+    labels = {"command": "find", "collection": "metrics_test"}
+    before = sample("mongodb_command_duration_seconds_count", **labels)
+
+    listener.started(SimpleNamespace(request_id=1, command_name="find", command={"find": "metrics_test"}))
+    listener.started(SimpleNamespace(request_id=2, command_name="getMore", command={"getMore": 5, "collection": "metrics_test"}))
+    listener.succeeded(SimpleNamespace(request_id=1, command_name="find", duration_micros=1500))
+    listener.failed(SimpleNamespace(request_id=2, command_name="getMore", duration_micros=10))
+
+    assert sample("mongodb_command_duration_seconds_count", **labels) == before + 1
+    assert sample("mongodb_command_failures_total", command="getMore", collection="metrics_test") >= 1
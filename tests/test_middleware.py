@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from middleware import MULTIPART_OVERHEAD, UploadSizeLimitMiddleware
+
+BOUNDARY = "sinir"
+MAX_SIZE = 1024
+
+
+def make_app(uploads):
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        data = await file.read()
+        uploads.append(len(data))
+        return {"size": len(data)}
+
+    app.add_middleware(UploadSizeLimitMiddleware, paths=("/upload",), max_size=MAX_SIZE)
+    return app
+
+
+def multipart_chunks(size: int, chunk_size: int = 4096):
+    yield (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.pdf\"\r\n"
+        "Content-Type: application/pdf\r\n\r\n%PDF-"
+    ).encode()
+    for _ in range(0, size, chunk_size):
+        yield b"x" * chunk_size
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def post_chunked(app, size):
+    """Content-Length olmadan (chunked) yükle; uygulamanın gövdeden kaç bayt okuduğunu da döndür"""
+    chunks = list(multipart_chunks(size))
+    consumed = 0
+    sent = []
+
+    async def receive():
+        nonlocal consumed
+        if not chunks:
+            return {"type": "http.disconnect"}
+        chunk = chunks.pop(0)
+        consumed += len(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/upload",
+        "raw_path": b"/upload",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode())],
+        "client": ("127.0.0.1", 1),
+        "server": ("test", 80),
+    }
+    asyncio.run(app(scope, receive, send))
+    status = next(message["status"] for message in sent if message["type"] == "http.response.start")
+    body = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+    return status, json.loads(body), consumed
+
+
+def test_chunked_upload_over_limit_is_cut_off_early():
+    uploads = []
+
+    status, body, consumed = post_chunked(make_app(uploads), 4 * 1024 * 1024)
+
+    assert status == 413
+    assert body == {"detail": "Dosya boyutu sınırı aşıldı"}
+    assert uploads == []
+    # Sınır aşıldıktan sonra gövdenin geri kalanı okunmaz
+    assert consumed <= MAX_SIZE + MULTIPART_OVERHEAD + 8192
+
+
+def test_chunked_upload_within_limit_passes():
+    uploads = []
+
+    status, body, _ = post_chunked(make_app(uploads), 512)
+
+    assert status == 200
+    assert uploads == [4096 + 5]
+
+
+def test_declared_length_over_limit_is_rejected_before_reading():
+    uploads = []
+    client = TestClient(make_app(uploads))
+
+    response = client.post("/upload", files={"file": ("a.pdf", b"%PDF-" + b"x" * (MAX_SIZE + MULTIPART_OVERHEAD))})
+
+    assert response.status_code == 413
+    assert uploads == []
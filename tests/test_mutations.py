@@ -0,0 +1,155 @@
+"""Yazma endpoint'lerinin tek atomik Mongo isteğiyle çalıştığını doğrular"""
+from datetime import datetime, timedelta
+import asyncio
+import base64
+import os
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+import server
+from metadata_cache import MemoryBackend, MetadataCache
+from stats import STATS_COUNTER_ID
+
+TOGGLES = 51
+
+
+class CommandRecorder(monitoring.CommandListener):
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        self.commands.append((event.command_name, event.command.get(event.command_name)))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def on(self, collection):
+        return [name for name, target in self.commands if target == collection]
+
+
+def run_with_db(mongo_db, monkeypatch, handler):
+    recorder = CommandRecorder()
+
+    async def run():
+        client = AsyncIOMotorClient(os.environ["MONGO_URL"], event_listeners=[recorder])
+        db = client[mongo_db.name]
+        monkeypatch.setattr(server, "pdfs_collection", db.pdfs)
+        monkeypatch.setattr(server, "counters_collection", db.counters)
+        monkeypatch.setattr(server, "annotations_collection", db.annotations)
+        monkeypatch.setattr(server, "idempotency_collection", db.idempotency_keys)
+        monkeypatch.setattr(server, "USE_STATS_COUNTERS", True)
+        monkeypatch.setattr(server, "pdf_metadata_cache", MetadataCache(MemoryBackend()))
+        try:
+            return await handler()
+        finally:
+            client.close()
+
+    return asyncio.run(run()), recorder
+
+
+def insert_pdf(mongo_db, **fields):
+    mongo_db.pdfs.insert_one({
+        "id": "pdf-1",
+        "name": "a.pdf",
+        "uri": "",
+        "size": 1,
+        "dateAdded": datetime(2024, 1, 1),
+        "isFavorite": False,
+        "type": "local",
+        **fields,
+    })
+
+
+def test_concurrent_toggles_apply_every_flip_once(mongo_db, monkeypatch):
+    insert_pdf(mongo_db)
+
+    async def toggle_all():
+        return await asyncio.gather(*(server.toggle_favorite("pdf-1") for _ in range(TOGGLES)))
+
+    responses, recorder = run_with_db(mongo_db, monkeypatch, toggle_all)
+
+    states = [orjson.loads(response.body)["isFavorite"] for response in responses]
+    # Her istek farklı bir ara durumu görür; tek sayıda çevirmeden sonra favori kalır
+    assert states.count(True) == TOGGLES // 2 + 1
+    assert states.count(False) == TOGGLES // 2
+    assert mongo_db.pdfs.find_one({"id": "pdf-1"})["isFavorite"] is True
+    assert mongo_db.counters.find_one({"_id": STATS_COUNTER_ID})["favoritePdfs"] == 1
+    # PDF koleksiyonuna çevirme başına tam bir istek
+    assert recorder.on("pdfs") == ["findAndModify"] * TOGGLES
+
+
+def test_update_returns_new_state_without_reading_payload(mongo_db, monkeypatch):
+    insert_pdf(mongo_db, fileData="JVBERi0xLjQ=")
+    update = server.PDFUpdate(name="b.pdf", isFavorite=True)
+
+    response, recorder = run_with_db(mongo_db, monkeypatch, lambda: server.update_pdf("pdf-1", update))
+
+    body = orjson.loads(response.body)
+    assert (body["name"], body["isFavorite"], body["fileData"]) == ("b.pdf", True, None)
+    assert mongo_db.counters.find_one({"_id": STATS_COUNTER_ID})["favoritePdfs"] == 1
+    assert recorder.on("pdfs") == ["findAndModify"]
+
+
+def test_annotation_move_writes_cells_in_the_same_request(mongo_db, monkeypatch):
+    mongo_db.annotations.insert_one(server.build_annotation("pdf-1", {"x": 10, "y": 10, "width": 20, "height": 20}))
+    annotation_id = mongo_db.annotations.find_one()["id"]
+
+    _, recorder = run_with_db(mongo_db, monkeypatch, lambda: server.update_pdf_annotation(
+        "pdf-1", annotation_id, {"x": 1000, "content": "taşındı"}
+    ))
+
+    stored = mongo_db.annotations.find_one({"id": annotation_id})
+    assert recorder.on("annotations") == ["findAndModify"]
+    assert (stored["x"], stored["content"]) == (1000, "taşındı")
+    assert stored["spatial"] == server.spatial_fields(stored)["spatial"]
+
+
+@pytest.mark.parametrize("age, taken_over", [(timedelta(hours=1), True), (timedelta(seconds=1), False)])
+def test_abandoned_idempotency_claim_is_taken_over(mongo_db, monkeypatch, age, taken_over):
+    # Önceki deneme sahipliği alıp yanıt yazmadan kapanmış
+    insert_pdf(mongo_db)
+    claimed = datetime.utcnow() - age
+    mongo_db.idempotency_keys.insert_one(
+        {"_id": "pdf-1:k1", "createdAt": claimed, "claimedAt": claimed, "owner": "eski"}
+    )
+    batch = server.AnnotationBatch(operations=[{"op": "create", "id": "a-1", "data": {"content": "x"}}], idempotencyKey="k1")
+
+    async def retry():
+        try:
+            return await server.batch_pdf_annotations("pdf-1", batch, None)
+        except HTTPException as e:
+            return e.status_code
+
+    result, _ = run_with_db(mongo_db, monkeypatch, retry)
+
+    stored = mongo_db.idempotency_keys.find_one({"_id": "pdf-1:k1"})
+    if taken_over:
+        assert result["results"][0]["status"] == "created"
+        assert stored["response"] == result and stored["owner"] != "eski"
+    else:
+        assert result == 409
+        assert "response" not in stored
+
+
+def test_create_rejects_non_pdf_payload_before_storing(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from storage import BlobStore
+
+    store = BlobStore(tmp_path / "blobs")
+    monkeypatch.setattr(server, "blob_store", store)
+    payload = base64.b64encode(b"<html>PDF degil</html>").decode()
+
+    response = TestClient(server.app).post("/api/pdfs", json={
+        "name": "a.pdf", "uri": "", "size": 0, "type": "local", "fileData": payload,
+    })
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Sadece PDF dosyaları yüklenebilir"}
+    assert not any(path.is_file() for path in (tmp_path / "blobs").rglob("*"))
@@ -0,0 +1,76 @@
+"""PDF listelerinin keyset sayfalamasını doğrular"""
+from datetime import datetime, timedelta
+import asyncio
+import os
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from motor.motor_asyncio import AsyncIOMotorClient
+
+import server
+from server import decode_list_cursor, encode_list_cursor
+
+START = datetime(2024, 1, 1)
+
+
+def test_cursor_round_trip_selects_older_rows():
+    cursor = encode_list_cursor({"dateAdded": START, "id": "pdf-7"})
+
+    assert "=" not in cursor
+    assert decode_list_cursor(cursor) == {"$or": [
+        {"dateAdded": {"$lt": START}},
+        {"dateAdded": START, "id": {"$lt": "pdf-7"}},
+    ]}
+
+
+@pytest.mark.parametrize("cursor", ["???", "bm90LWpzb24", "eyJkIjogIngifQ", "eyJkIjogIjIwMjQtMDEtMDEifQ"])
+def test_bad_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_list_cursor(cursor)
+
+    assert error.value.status_code == 400
+
+
+def test_bad_cursor_returns_400_before_querying():
+    response = TestClient(server.app).get("/api/pdfs", params={"cursor": "???"})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Geçersiz cursor"}
+
+
+def test_pages_cover_every_pdf_once(mongo_db, monkeypatch):
+    # Aynı dateAdded'e sahip kayıtlar sayfa sınırına denk gelir; id ikinci anahtardır
+    mongo_db.pdfs.insert_many([
+        {
+            "id": f"pdf-{index:02d}",
+            "name": f"{index}.pdf",
+            "size": 1,
+            "dateAdded": START + timedelta(minutes=index // 3),
+            "isFavorite": index % 2 == 0,
+            "type": "local",
+        }
+        for index in range(11)
+    ])
+
+    async def collect(query):
+        client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+        monkeypatch.setattr(server, "pdfs_collection", client[mongo_db.name].pdfs)
+        pages, cursor = [], None
+        try:
+            while True:
+                response = await server.list_pdf_summaries(query, 4, cursor)
+                pages.append([row["id"] for row in orjson.loads(response.body)])
+                cursor = response.headers.get("X-Next-Cursor")
+                if cursor is None:
+                    return pages
+        finally:
+            client.close()
+
+    pages = asyncio.run(collect({}))
+    favorites = asyncio.run(collect({"isFavorite": True}))
+
+    assert [len(page) for page in pages] == [4, 4, 3]
+    assert sum(pages, []) == [f"pdf-{index:02d}" for index in reversed(range(11))]
+    assert sum(favorites, []) == [f"pdf-{index:02d}" for index in reversed(range(0, 11, 2))]
@@ -0,0 +1,149 @@
+"""Endpoint sorgularının indeks kullandığını explain() ile doğrular"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from indexes import ANNOTATION_INDEXES, ANNOTATION_TOMBSTONE_INDEXES, PAGE_TEXT_INDEXES, PDF_INDEXES
+from search import build_search_pipeline
+from server import (
+    FAVORITE_PDFS_QUERY,
+    PDF_LIST_SORT,
+    PDF_SUMMARY_PROJECTION,
+    PENDING_FETCH_QUERY,
+    annotation_query,
+    blob_users_query,
+    encode_list_cursor,
+    moved_annotations_query,
+    pdf_list_query,
+)
+
+SINCE = datetime(2024, 1, 1, 12)
+
+
+def plan_stages(plan):
+    """Plan ağacındaki tüm stage adlarını topla"""
+    if isinstance(plan, dict):
+        stages = [plan["stage"]] if "stage" in plan else []
+        for value in plan.values():
+            stages += plan_stages(value)
+        return stages
+    if isinstance(plan, list):
+        return [stage for item in plan for stage in plan_stages(item)]
+    return []
+
+
+def winning_plans(explain):
+    """find ve aggregate explain çıktılarındaki seçilen planlar (reddedilenler hariç)"""
+    if isinstance(explain, dict):
+        if "winningPlan" in explain:
+            return [explain["winningPlan"]]
+        return [plan for value in explain.values() for plan in winning_plans(value)]
+    if isinstance(explain, list):
+        return [plan for item in explain for plan in winning_plans(item)]
+    return []
+
+
+def assert_uses_index(cursor_or_explain):
+    explain = cursor_or_explain if isinstance(cursor_or_explain, dict) else cursor_or_explain.explain()
+    stages = plan_stages(winning_plans(explain))
+    assert "COLLSCAN" not in stages, stages
+    assert "IXSCAN" in stages or "IDHACK" in stages or "EXPRESS_IXSCAN" in stages, stages
+
+
+@pytest.fixture
+def db(mongo_db):
+    mongo_db.pdfs.create_indexes(PDF_INDEXES)
+    mongo_db.annotations.create_indexes(ANNOTATION_INDEXES)
+    mongo_db.pdf_pages.create_indexes(PAGE_TEXT_INDEXES)
+    mongo_db.annotation_tombstones.create_indexes(ANNOTATION_TOMBSTONE_INDEXES)
+    now = datetime(2024, 1, 1)
+    mongo_db.pdfs.insert_many([
+        {
+            "id": f"pdf-{i:04d}",
+            "name": f"{i}.pdf",
+            "uri": "",
+            "size": i,
+            "dateAdded": now + timedelta(minutes=i),
+            "isFavorite": i % 3 == 0,
+            "type": ("local", "cloud", "url")[i % 3],
+            "blobKey": f"{i:064x}",
+            **({"fetchStatus": "ready"} if i % 3 == 2 else {}),
+        }
+        for i in range(200)
+    ])
+    mongo_db.annotations.insert_many([
+        {"id": f"ann-{i}", "pdf_id": f"pdf-{i % 20:04d}", "updated_at": now.isoformat()}
+        for i in range(400)
+    ])
+    mongo_db.pdf_pages.insert_many([
+        {"pdf_id": f"pdf-{i % 50:04d}", "page": i // 50 + 1, "text": f"fatura {i} sözleşme"}
+        for i in range(200)
+    ])
+    return mongo_db
+
+
+def test_get_pdf_by_id(db):
+    assert_uses_index(db.pdfs.find({"id": "pdf-0001"}))
+
+
+def list_page(db, query, cursor=None):
+    return db.pdfs.find(pdf_list_query(query, cursor), PDF_SUMMARY_PROJECTION).sort(PDF_LIST_SORT).limit(51)
+
+
+def test_list_pdfs_first_page(db):
+    assert_uses_index(list_page(db, {}))
+
+
+def test_list_pdfs_next_page(db):
+    assert_uses_index(list_page(db, {}, encode_list_cursor(db.pdfs.find_one({"id": "pdf-0150"}))))
+
+
+def test_list_favorites(db):
+    assert_uses_index(list_page(db, FAVORITE_PDFS_QUERY))
+
+
+def test_list_favorites_next_page(db):
+    assert_uses_index(list_page(db, FAVORITE_PDFS_QUERY, encode_list_cursor(db.pdfs.find_one({"id": "pdf-0150"}))))
+
+
+def test_blob_users_lookup(db):
+    assert_uses_index(db.pdfs.find(blob_users_query(f"{1:064x}")))
+
+
+def test_pending_url_fetches(db):
+    assert_uses_index(db.pdfs.find(PENDING_FETCH_QUERY, {"id": 1}))
+
+
+def test_annotations_for_pdf(db):
+    assert_uses_index(db.annotations.find(annotation_query("pdf-0001")))
+
+
+def test_annotation_by_id(db):
+    assert_uses_index(db.annotations.find({"id": "ann-1", "pdf_id": "pdf-0001"}))
+
+
+def test_moved_annotations_for_live_flush(db):
+    keys = [(f"pdf-{i % 20:04d}", f"ann-{i}") for i in range(0, 400, 37)]
+    assert_uses_index(db.annotations.find(moved_annotations_query(keys)))
+
+
+def test_annotations_updated_since(db):
+    assert_uses_index(db.annotations.find(annotation_query("pdf-0001", SINCE)))
+
+
+def test_annotations_in_viewport(db):
+    assert_uses_index(db.annotations.find(annotation_query("pdf-0001", page=3, viewport=(0, 0, 600, 800))))
+
+
+def test_tombstones_since(db):
+    assert_uses_index(db.annotation_tombstones.find(annotation_query("pdf-0001", SINCE), {"_id": 0, "id": 1}))
+
+
+def test_search_uses_text_index(db):
+    assert_uses_index(db.command(
+        "explain", {"aggregate": "pdf_pages", "pipeline": build_search_pipeline("fatura", 20), "cursor": {}}
+    ))
+
+
+def test_page_texts_for_pdf(db):
+    assert_uses_index(db.pdf_pages.find({"pdf_id": "pdf-0001"}))
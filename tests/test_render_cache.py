@@ -0,0 +1,87 @@
+import asyncio
+
+from render_cache import RenderCache
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = RenderCache(tmp_path, max_bytes=25)
+
+    async def run():
+        await cache.put("a", b"a" * 10)
+        await cache.put("b", b"b" * 10)
+        cache.get("a")
+        await cache.put("c", b"c" * 10)
+
+    asyncio.run(run())
+
+    assert cache.get("b") is None
+    assert cache.get("a").read_bytes() == b"a" * 10
+    assert cache.get("c").read_bytes() == b"c" * 10
+    assert not (tmp_path / "b").exists()
+    assert cache.stats()["evictions"] == 1
+
+
+def test_concurrent_requests_render_once(tmp_path):
+    cache = RenderCache(tmp_path, max_bytes=1024)
+    calls = 0
+
+    async def render():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return b"png"
+
+    async def run():
+        return await asyncio.gather(*[cache.get_or_render("page", render) for _ in range(5)])
+
+    paths = asyncio.run(run())
+
+    assert calls == 1
+    assert len(set(paths)) == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_reloads_entries_from_disk(tmp_path):
+    asyncio.run(RenderCache(tmp_path, max_bytes=1024).put("page", b"png"))
+
+    cache = RenderCache(tmp_path, max_bytes=1024)
+
+    assert cache.get("page").read_bytes() == b"png"
+    assert cache.stats()["bytes"] == 3
+
+
+def test_file_evicted_by_another_worker_is_rendered_again(tmp_path):
+    first = RenderCache(tmp_path, max_bytes=15, sync_interval=3600)
+    second = RenderCache(tmp_path, max_bytes=15, sync_interval=3600)
+    calls = 0
+
+    async def render():
+        nonlocal calls
+        calls += 1
+        return b"p" * 10
+
+    async def run():
+        await first.get_or_render("page", render)
+        # İkinci worker kendi yazdığı dosya için ilkinin girdisini tahliye eder
+        await second.put("page", b"p" * 10)
+        await second.put("other", b"o" * 10)
+        return await first.get_or_render("page", render)
+
+    path = asyncio.run(run())
+
+    assert calls == 2
+    assert path.read_bytes() == b"p" * 10
+
+
+def test_size_limit_applies_to_shared_directory(tmp_path):
+    first = RenderCache(tmp_path, max_bytes=25, sync_interval=0)
+    second = RenderCache(tmp_path, max_bytes=25, sync_interval=0)
+
+    async def run():
+        for index in range(3):
+            await first.put(f"a{index}", b"a" * 10)
+            await second.put(f"b{index}", b"b" * 10)
+
+    asyncio.run(run())
+
+    assert sum(path.stat().st_size for path in tmp_path.iterdir() if path.is_file()) <= 25
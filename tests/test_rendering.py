@@ -0,0 +1,39 @@
+import pytest
+
+import rendering
+from rendering import render_page, render_thumbnails
+
+pymupdf = pytest.importorskip("pymupdf")
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    document = pymupdf.open()
+    document.new_page(width=600, height=800).insert_text((72, 72), "Merhaba")
+    path = tmp_path / "sample.pdf"
+    document.save(path)
+    return path
+
+
+def test_render_thumbnails_scales_first_page(pdf_path):
+    thumbnails = render_thumbnails(str(pdf_path), {"small": 150, "medium": 300})
+
+    assert set(thumbnails) == {"small", "medium"}
+    for name, width in (("small", 150), ("medium", 300)):
+        assert thumbnails[name].startswith(b"\xff\xd8")
+        pixmap = pymupdf.Pixmap(thumbnails[name])
+        assert pixmap.width == width
+        assert pixmap.height == width * 800 // 600
+
+
+def test_render_page_caps_pixel_count(tmp_path, monkeypatch):
+    document = pymupdf.open()
+    document.new_page(width=5000, height=5000)
+    path = tmp_path / "poster.pdf"
+    document.save(path)
+    monkeypatch.setattr(rendering, "MAX_RENDER_PIXELS", 1000 * 1000)
+
+    pixmap = pymupdf.Pixmap(render_page(str(path), 1, 4.0))
+
+    assert pixmap.width * pixmap.height <= 1000 * 1000
+    assert pixmap.width == pixmap.height
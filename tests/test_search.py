@@ -0,0 +1,19 @@
+from search import make_snippet, search_terms
+
+
+def test_search_terms_keeps_phrases_and_drops_negations():
+    assert search_terms('fatura "ödeme planı" -taslak') == ["ödeme planı", "fatura"]
+
+
+def test_snippet_centers_on_first_match():
+    text = "a" * 200 + " Fatura tutarı " + "b" * 200
+
+    snippet = make_snippet(text, ["fatura"])
+
+    assert "Fatura tutarı" in snippet
+    assert snippet.startswith("…") and snippet.endswith("…")
+    assert len(snippet) <= 2 * 80 + 2
+
+
+def test_snippet_without_match_uses_page_start():
+    assert make_snippet("kısa metin", ["yok"]) == "kısa metin"
@@ -0,0 +1,35 @@
+from datetime import datetime
+import json
+
+from serialization import ORJSONResponse, model_projection, trusted_rows
+from server import PDFFile, PDFSummary
+
+
+def test_trusted_rows_match_validated_models():
+    docs = [
+        {"id": "a", "name": "a.pdf", "size": 3, "dateAdded": datetime(2024, 1, 2, 3, 4, 5, 678000)},
+        {
+            "id": "b", "name": "b.pdf", "size": 1, "dateAdded": datetime(2024, 1, 1),
+            "isFavorite": True, "type": "url", "sha256": "f" * 64, "fetchStatus": "ready",
+        },
+    ]
+
+    rows = trusted_rows(PDFSummary, docs)
+
+    assert rows == [PDFSummary(**doc).model_dump() for doc in docs]
+    assert [list(row) for row in rows] == [list(PDFSummary.model_fields)] * 2
+    # Eski yol (response_model + JSON) ile aynı gövde
+    assert json.loads(ORJSONResponse(rows).body) == [
+        json.loads(PDFSummary(**doc).model_dump_json()) for doc in docs
+    ]
+
+
+def test_trusted_rows_do_not_generate_factory_defaults():
+    row = trusted_rows(PDFFile, [{"id": "a", "name": "a.pdf", "uri": "", "size": 0, "dateAdded": None}])[0]
+
+    assert row["id"] == "a"
+    assert row["fileData"] is None
+
+
+def test_projection_reads_only_model_fields():
+    assert model_projection(PDFSummary) == {"_id": 0, **{field: 1 for field in PDFSummary.model_fields}}
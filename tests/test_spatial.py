@@ -0,0 +1,103 @@
+import pytest
+
+from annotations import build_annotation, present_annotation
+from spatial import (
+    GRID_AXIS_CELLS,
+    GRID_CELL_SIZE,
+    OVERSIZED_CELL,
+    annotation_bounds,
+    grid_cells,
+    moved_spatial_fields,
+    parse_bbox,
+    spatial_fields,
+    spatial_query,
+    spatial_update_stage,
+)
+
+
+def intersects(spatial, bbox):
+    """spatial_query ile aynı kesişim kuralı; Mongo olmadan doğrulamak için"""
+    query = spatial_query(bbox=bbox)
+    cells = query.get("spatial.cells", {}).get("$in")
+    if cells is not None and not set(cells) & set(spatial["cells"]):
+        return False
+    return (
+        spatial["x0"] <= bbox[2] and spatial["x1"] >= bbox[0]
+        and spatial["y0"] <= bbox[3] and spatial["y1"] >= bbox[1]
+    )
+
+
+def test_bounds_normalize_negative_size_and_include_ink():
+    assert annotation_bounds({"x": 50, "y": 40, "width": -20, "height": 10}) == (30, 40, 50, 50)
+    assert annotation_bounds({"x": 0, "y": 0, "width": 1, "height": 1}, ink=(10, -5, 20, 30)) == (0, -5, 20, 30)
+    assert annotation_bounds({"x": 0, "y": 0}, ink=(10, -5, 20, 30)) == (10, -5, 20, 30)
+    assert annotation_bounds({"x": "bozuk"}) == (0, 0, 0, 0)
+
+
+def test_grid_cells_cover_box():
+    cells = grid_cells((GRID_CELL_SIZE - 1, 0, GRID_CELL_SIZE + 1, 0))
+
+    assert cells == [0, GRID_AXIS_CELLS]
+
+
+def test_large_annotation_goes_to_overflow_cell():
+    spatial = spatial_fields({"x": 0, "y": 0, "width": 100000, "height": 100000})["spatial"]
+
+    assert spatial["cells"] == [OVERSIZED_CELL]
+    assert intersects(spatial, (5000, 5000, 5100, 5100))
+
+
+def test_viewport_intersection():
+    spatial = spatial_fields({"x": 300, "y": 300, "width": 40, "height": 40})["spatial"]
+
+    assert intersects(spatial, (0, 0, 320, 320))
+    assert not intersects(spatial, (0, 0, 299, 1000))
+    assert not intersects(spatial, (500, 500, 900, 900))
+
+
+def test_move_recomputes_spatial_with_stored_ink():
+    existing = {"x": 0, "y": 0, "width": 10, "height": 10, "spatial": {"ink": [0, 0, 5, 5]}}
+
+    moved = moved_spatial_fields(existing, {"x": 1000, "y": 1000})["spatial"]
+
+    assert (moved["x0"], moved["y0"], moved["x1"], moved["y1"]) == (0, 0, 1010, 1010)
+    assert moved_spatial_fields(existing, {"color": "#000"}) == {}
+
+
+@pytest.mark.parametrize("stored, moved", [
+    ({"x": 0, "y": 0, "width": 10, "height": 10}, {"x": 1000, "y": 260}),
+    ({"x": 5, "y": 5, "width": -300, "height": 20}, {"x": 700}),
+    ({"x": 0, "y": 0, "width": 5000, "height": 5000}, {"y": 1}),
+    ({"x": "a", "y": None, "width": "12", "height": 0}, {"x": -50.5}),
+    ({"x": 0, "y": 0, "width": 10, "height": 10, "spatial": {"ink": [0, 0, 300, 5]}}, {"x": 1000, "y": 1000}),
+    ({"x": 0, "y": 0, "width": 0, "height": 0, "spatial": {"ink": [10, 10, 20, 20]}}, {"x": 400}),
+])
+def test_update_stage_matches_spatial_fields(mongo_db, stored, moved):
+    ink = (stored.get("spatial") or {}).get("ink")
+    mongo_db.annotations.insert_one({"id": "a", **stored})
+
+    mongo_db.annotations.update_one({"id": "a"}, [
+        {"$set": {field: {"$literal": value} for field, value in moved.items()}},
+        spatial_update_stage(),
+    ])
+
+    document = mongo_db.annotations.find_one({"id": "a"}, {"_id": 0})
+    assert document["spatial"] == spatial_fields({**stored, **moved}, tuple(ink) if ink else None)["spatial"]
+
+
+def test_parse_bbox():
+    assert parse_bbox("10,20,0,5") == (0, 5, 10, 20)
+    with pytest.raises(ValueError):
+        parse_bbox("1,2,3")
+    with pytest.raises(ValueError):
+        parse_bbox("1,2,3,nan")
+
+
+def test_drawing_annotation_indexed_by_ink_extent():
+    annotation = build_annotation("pdf-1", {"type": "drawing", "strokes": [[[400, 500], [420, 560]]]})
+
+    spatial = annotation["spatial"]
+    assert (spatial["x0"], spatial["y0"], spatial["x1"], spatial["y1"]) == (400, 500, 420, 560)
+    assert intersects(spatial, (410, 550, 430, 570))
+    assert not intersects(spatial, (0, 0, 100, 100))
+    assert "spatial" not in present_annotation(annotation)
@@ -0,0 +1,52 @@
+import asyncio
+import os
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from stats import apply_counter_delta, counter_delta, read_stats
+
+
+def test_counter_delta_for_new_pdf():
+    assert counter_delta({"type": "url", "isFavorite": False}) == {"totalPdfs": 1, "urlPdfs": 1}
+
+
+def test_counter_delta_for_deleted_favorite():
+    assert counter_delta({"type": "local", "isFavorite": True}, sign=-1) == {
+        "totalPdfs": -1,
+        "favoritePdfs": -1,
+        "localPdfs": -1,
+    }
+
+
+def test_counter_delta_ignores_unknown_type():
+    assert counter_delta({"type": "other"}) == {"totalPdfs": 1}
+
+
+def run_with_db(mongo_db, handler):
+    async def run():
+        client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+        try:
+            return await handler(client[mongo_db.name])
+        finally:
+            client.close()
+
+    return asyncio.run(run())
+
+
+def test_first_change_on_existing_library_counts_existing_pdfs(mongo_db):
+    mongo_db.pdfs.insert_many([{"id": f"pdf-{i}", "type": "local", "isFavorite": False} for i in range(5)])
+
+    async def scenario(db):
+        # Sayaç dokümanı yokken yeni bir PDF ekleniyor
+        new_pdf = {"id": "pdf-5", "type": "url", "isFavorite": True}
+        await db.pdfs.insert_one(dict(new_pdf))
+        await apply_counter_delta(db.counters, counter_delta(new_pdf))
+        return await read_stats(db.pdfs, db.counters)
+
+    assert run_with_db(mongo_db, scenario) == {
+        "totalPdfs": 6,
+        "favoritePdfs": 1,
+        "localPdfs": 5,
+        "cloudPdfs": 0,
+        "urlPdfs": 1,
+    }
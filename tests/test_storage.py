@@ -0,0 +1,94 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from storage import BlobStore, BlobTooLarge
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(tmp_path / "blobs")
+
+
+def test_put_bytes_is_content_addressed(store):
+    data = b"%PDF-1.4 test"
+    blob = asyncio.run(store.put_bytes(data))
+
+    assert blob.key == blob.sha256 == hashlib.sha256(data).hexdigest()
+    assert blob.size == len(data)
+    assert store.path_for(blob.key).read_bytes() == data
+    assert asyncio.run(store.read_bytes(blob.key)) == data
+
+
+def test_same_content_is_stored_once(store):
+    first = asyncio.run(store.put_bytes(b"%PDF-1.4 same"))
+    second = asyncio.run(store.put_bytes(b"%PDF-1.4 same"))
+
+    assert first == second
+    assert len([p for p in store.root.rglob("*") if p.is_file()]) == 1
+
+
+def test_writer_knows_key_before_commit(store):
+    async def run():
+        writer = store.writer()
+        await writer.write(b"%PDF-1.4 ")
+        await writer.write(b"streamed")
+        key = writer.sha256
+        exists_before = store.exists(key)
+        return key, exists_before, await writer.commit()
+
+    key, exists_before, blob = asyncio.run(run())
+    assert not exists_before
+    assert blob.key == key == hashlib.sha256(b"%PDF-1.4 streamed").hexdigest()
+
+
+def test_delete(store):
+    blob = asyncio.run(store.put_bytes(b"%PDF-1.4 gone"))
+
+    assert asyncio.run(store.delete(blob.key)) is True
+    assert not store.exists(blob.key)
+    assert asyncio.run(store.delete(blob.key)) is False
+
+
+def test_rejects_invalid_keys(store):
+    with pytest.raises(ValueError):
+        store.path_for("../../etc/passwd")
+
+
+def test_writer_streams_chunks(store):
+    async def run():
+        writer = store.writer()
+        for chunk in (b"%PDF-", b"1.4 ", b"streamed"):
+            await writer.write(chunk)
+        return await writer.commit()
+
+    blob = asyncio.run(run())
+
+    assert blob.sha256 == hashlib.sha256(b"%PDF-1.4 streamed").hexdigest()
+    assert blob.size == 17
+    assert store.path_for(blob.key).read_bytes() == b"%PDF-1.4 streamed"
+    assert list(store._tmp_dir.iterdir()) == []
+
+
+def test_writer_enforces_max_size(store):
+    async def run():
+        writer = store.writer(max_size=8)
+        await writer.write(b"%PDF-")
+        try:
+            await writer.write(b"too long")
+        finally:
+            await writer.abort()
+
+    with pytest.raises(BlobTooLarge):
+        asyncio.run(run())
+    assert list(store._tmp_dir.iterdir()) == []
+
+
+def test_delete_removes_derived_files(store):
+    blob = asyncio.run(store.put_bytes(b"%PDF-1.4 derived"))
+    derived = asyncio.run(store.put_derived(blob.key, "thumb_small.jpg", b"jpeg"))
+
+    assert derived.read_bytes() == b"jpeg"
+    asyncio.run(store.delete(blob.key))
+    assert not derived.exists()
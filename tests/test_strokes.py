@@ -0,0 +1,161 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+import strokes as strokes_module
+from annotations import CHARS_PER_POINT, build_annotation, drawing_point_count, present_annotation
+from strokes import (
+    STROKES_FORMAT,
+    SVG_FORMAT,
+    Stroke,
+    decode_strokes,
+    encode_strokes,
+    parse_svg_path,
+    simplify,
+    strokes_from_json,
+    strokes_to_svg,
+)
+
+
+def test_round_trip_with_pressure_and_negative_deltas():
+    strokes = [
+        Stroke(np.array([[10.0, 20.0], [9.5, 25.3], [-4.2, 0.1]]), np.array([0.2, 0.8, 1.0])),
+        Stroke(np.array([[100000.0, 3.0]]), np.array([0.5])),
+    ]
+
+    decoded = decode_strokes(encode_strokes(strokes))
+
+    assert len(decoded) == 2
+    for original, result in zip(strokes, decoded):
+        np.testing.assert_allclose(result.points, original.points, atol=0.05)
+        np.testing.assert_allclose(result.pressure, original.pressure, atol=1 / 255)
+
+
+def test_round_trip_without_pressure_and_empty():
+    decoded = decode_strokes(encode_strokes([Stroke(np.array([[1.0, 2.0], [3.0, 4.0]]))]))
+
+    assert decoded[0].pressure is None
+    np.testing.assert_allclose(decoded[0].points, [[1.0, 2.0], [3.0, 4.0]])
+    assert decode_strokes(encode_strokes([])) == []
+
+
+def test_simplify_drops_collinear_points_and_keeps_corners():
+    line = np.column_stack([np.arange(50.0), np.zeros(50)])
+    corner = np.vstack([line, [[49.0, 30.0]]])
+
+    assert simplify(line, 0.5).tolist() == [0, 49]
+    assert simplify(corner, 0.5).tolist() == [0, 49, 50]
+    assert len(simplify(line, 0)) == 50
+
+
+def test_corrupt_payload_is_rejected():
+    encoded = encode_strokes([Stroke(np.array([[1.0, 2.0], [3.0, 4.0]]))])
+
+    with pytest.raises(ValueError):
+        decode_strokes(encoded[:-2])
+
+
+def test_svg_path_parsing():
+    strokes = parse_svg_path("M10 10 L20 10 l0 5 H0 M1,1 2,2 z")
+
+    assert [stroke.points.tolist() for stroke in strokes] == [
+        [[10, 10], [20, 10], [20, 15], [0, 15]],
+        [[1, 1], [2, 2], [1, 1]],
+    ]
+    assert strokes_to_svg(strokes[:1]) == "M10 10 L20 10 L20 15 L0 15"
+    assert parse_svg_path("M0 0 C1 1 2 2 3 3") is None
+
+
+def test_build_annotation_stores_compact_and_presents_svg():
+    annotation = build_annotation("pdf-1", {
+        "type": "drawing",
+        "strokes": [{"points": [[0, 0], [1, 0.01], [2, 0], [2, 5]], "pressure": [0.1, 0.2, 0.3, 0.4]}],
+    }, stroke_tolerance=0.5)
+
+    assert annotation["drawing_format"] == STROKES_FORMAT
+    assert len(decode_strokes(annotation["drawing_data"])[0].points) == 3
+
+    presented = present_annotation(annotation)
+    assert presented["drawing_format"] == SVG_FORMAT
+    assert presented["drawing_data"] == "M0 0 L2 0 L2 5"
+    assert present_annotation(annotation, STROKES_FORMAT)["drawing_data"] == annotation["drawing_data"]
+
+
+def test_build_annotation_keeps_curved_svg_and_rejects_bad_strokes():
+    curve = "M0 0 Q5 5 10 0"
+
+    assert build_annotation("pdf-1", {"drawing_data": curve})["drawing_data"] == curve
+    with pytest.raises(ValueError):
+        build_annotation("pdf-1", {"strokes": [{"points": [1, 2, 3]}]})
+    for data in (123, ["x"], {"a": 1}):
+        with pytest.raises(ValueError, match="metin"):
+            build_annotation("pdf-1", {"drawing_data": data, "drawing_format": STROKES_FORMAT})
+
+
+@pytest.mark.parametrize("pressure", [[0.1, float("nan")], [float("inf"), 0.2], ["a", 0.2]])
+def test_bad_pressure_is_rejected(pressure):
+    with pytest.raises(ValueError, match="Basınç"):
+        strokes_from_json([{"points": [[0, 0], [1, 1]], "pressure": pressure}])
+
+
+def test_point_limits(monkeypatch):
+    monkeypatch.setattr(strokes_module, "MAX_STROKE_POINTS", 3)
+    monkeypatch.setattr(strokes_module, "MAX_DRAWING_POINTS", 5)
+    square = [[0, 0], [1, 0], [1, 1]]
+
+    with pytest.raises(ValueError, match="stroke en fazla"):
+        strokes_from_json([{"points": square + [[0, 1]]}])
+    with pytest.raises(ValueError, match="çizim en fazla"):
+        build_annotation("pdf-1", {"strokes": [square, square]})
+    with pytest.raises(ValueError, match="çizim en fazla"):
+        build_annotation("pdf-1", {"drawing_data": "M0 0 L1 0 L1 1 M2 2 L3 3 L4 4"})
+    assert len(strokes_from_json([square, square[:2]])) == 2
+
+
+def test_drawing_point_count_estimates_without_parsing():
+    assert drawing_point_count({"strokes": [{"points": [[0, 0]] * 3}, [[1, 1]] * 2, {"points": "x"}]}) == 5
+    assert drawing_point_count({"drawing_data": "x" * 40}) == 40 // CHARS_PER_POINT
+    assert drawing_point_count({"drawing_data": 123}) == 0
+
+
+def test_large_drawings_are_built_off_the_event_loop(monkeypatch):
+    import server
+
+    threads = []
+
+    def build(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return build_annotation(*args, **kwargs)
+
+    monkeypatch.setattr(server, "build_annotation", build)
+    monkeypatch.setattr(server, "STROKE_EXECUTOR_POINTS", 3)
+    small = {"strokes": [[[0, 0], [1, 1]]]}
+    large = {"strokes": [[[0, 0], [1, 1], [2, 2]]]}
+
+    async def run():
+        await server.build_drawing_annotation("pdf-1", small)
+        await server.build_drawing_annotation("pdf-1", large)
+
+    asyncio.run(run())
+
+    assert threads[0] is threading.main_thread()
+    assert threads[1] is not threading.main_thread()
+
+
+def test_request_point_limit_returns_413(monkeypatch):
+    import server
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(server, "MAX_REQUEST_DRAWING_POINTS", 4)
+    client = TestClient(server.app)
+    drawing = {"strokes": [[[0, 0], [1, 1], [2, 2]]]}
+
+    single = client.post("/api/pdfs/pdf-1/annotations", json={**drawing, "strokes": drawing["strokes"] * 2})
+    batch = client.post("/api/pdfs/pdf-1/annotations:batch", json={"operations": [
+        {"op": "create", "data": drawing}, {"op": "create", "data": drawing},
+    ]})
+
+    assert single.status_code == 413
+    assert batch.status_code == 413